@@ -0,0 +1,104 @@
+"""
+Compare the Json decoders available to the client on large build list pages
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_json_decoding.py [recorded_page.json ...]
+
+Without arguments a synthetic page of 100 builds with retried jobs is used. Pages recorded
+from `list_all_for_org(..., include_retried_jobs=True)` can be passed instead.
+"""
+import json
+import sys
+import timeit
+
+from pybuildkite.decoding import DECODERS
+
+
+def synthetic_page(builds=100, jobs=60):
+    """
+    Build a page shaped like the builds API returns with include_retried_jobs=True
+    """
+    page = []
+    for number in range(builds):
+        page.append(
+            {
+                "id": "f62a1b4d-10f9-4790-bc1c-e2c3a0c80983",
+                "url": "https://api.buildkite.com/v2/organizations/org/pipelines/pipe/builds/%d"
+                % number,
+                "number": number,
+                "state": "passed",
+                "blocked": False,
+                "message": "Merge pull request #%d from org/branch" % number,
+                "commit": "a65572555600c07c7ae4e3b6b2f2eb3d2bb8ff4b",
+                "branch": "main",
+                "env": {"DEPLOY": "false"},
+                "source": "webhook",
+                "creator": {
+                    "id": "3d3c3bf0-7d58-4afe-8fe7-b3017d5504de",
+                    "name": "Keith Pitt",
+                    "email": "keith@buildkite.com",
+                    "avatar_url": "https://www.gravatar.com/avatar/e14f55d3f939977cecbf51b64ff6f861",
+                    "created_at": "2015-05-22T12:36:45.309Z",
+                },
+                "jobs": [
+                    {
+                        "id": "b63254c0-3271-4a98-8270-7cfbd6c2f14e",
+                        "type": "script",
+                        "name": ":package: Build %d" % job,
+                        "step_key": "build-%d" % job,
+                        "agent_query_rules": ["queue=default"],
+                        "state": "passed",
+                        "web_url": "https://buildkite.com/org/pipe/builds/%d#%d"
+                        % (number, job),
+                        "log_url": "https://api.buildkite.com/v2/organizations/org/pipelines/pipe/builds/%d/jobs/%d/log"
+                        % (number, job),
+                        "command": "scripts/build.sh --shard %d" % job,
+                        "exit_status": 0,
+                        "artifact_paths": "pkg/*",
+                        "agent": {
+                            "id": "0b461f65-e7be-4c80-888a-ef11d81fd971",
+                            "name": "agent-%d" % job,
+                        },
+                        "created_at": "2015-05-09T21:05:59.874Z",
+                        "scheduled_at": "2015-05-09T21:05:59.874Z",
+                        "started_at": "2015-05-09T21:06:00.874Z",
+                        "finished_at": "2015-05-09T21:07:12.874Z",
+                        "retried": job % 10 == 0,
+                        "retries_count": 1 if job % 10 == 0 else 0,
+                    }
+                    for job in range(jobs)
+                ],
+                "created_at": "2015-05-09T21:05:59.874Z",
+                "scheduled_at": "2015-05-09T21:05:59.874Z",
+                "started_at": "2015-05-09T21:06:00.874Z",
+                "finished_at": "2015-05-09T21:07:12.874Z",
+                "meta_data": {},
+                "pipeline": {
+                    "id": "849411f9-9e6d-4739-a0d8-e247088e9b52",
+                    "slug": "pipe",
+                },
+            }
+        )
+    return json.dumps(page).encode()
+
+
+def main(paths):
+    if paths:
+        pages = [open(path, "rb").read() for path in paths]
+    else:
+        pages = [synthetic_page()]
+    size = sum(len(page) for page in pages)
+    print("%d page(s), %.1f MB" % (len(pages), size / 1e6))
+
+    for name, decode in DECODERS.items():
+        runs = 10
+        seconds = (
+            timeit.timeit(lambda: [decode(page) for page in pages], number=runs) / runs
+        )
+        print(
+            "%-8s %8.2f ms  %8.1f MB/s" % (name, seconds * 1000, size / 1e6 / seconds)
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,88 @@
+"""
+Measure the throughput of LogNormaliser on a large synthetic text log
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_log_normaliser.py [megabytes]
+
+The log is shaped like Buildkite text logs: every line starts with a timestamp marker
+and about a third of them are coloured. It is fed in 64 KiB chunks, like a streamed
+download, and compared with a per-line regular expression over the decoded log.
+"""
+import re
+import sys
+import time
+
+from pybuildkite.logs import LogNormaliser
+
+CHUNK_SIZE = 64 * 1024
+
+
+def synthetic_log(megabytes):
+    lines = []
+    size = 0
+    number = 0
+    while size < megabytes * 1024 * 1024:
+        timestamp = b"\x1b_bk;t=%d\x07" % (1700000000000 + number * 7)
+        if number % 3 == 0:
+            text = b"\x1b[32m[%d/9000]\x1b[0m Compiling src/module_%d.c\n" % (
+                number,
+                number,
+            )
+        else:
+            text = b"  test_case_%d ... \x1b[1mok\x1b[0m (%d ms)\n" % (
+                number,
+                number % 97,
+            )
+        line = timestamp + text
+        lines.append(line)
+        size += len(line)
+        number += 1
+    return b"".join(lines)
+
+
+def chunked(log):
+    return (log[start : start + CHUNK_SIZE] for start in range(0, len(log), CHUNK_SIZE))
+
+
+def per_line_baseline(log):
+    escapes = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|_[^\x07]*\x07)")
+    return [escapes.sub("", line) for line in log.decode().splitlines()]
+
+
+def measure(name, func, log):
+    started = time.perf_counter()
+    func(log)
+    seconds = time.perf_counter() - started
+    print("%-28s %8.1f MB/s" % (name, len(log) / 1e6 / seconds))
+
+
+def main(megabytes):
+    log = synthetic_log(megabytes)
+    print("%.1f MB synthetic log" % (len(log) / 1e6))
+    measure("per-line regex (decoded)", per_line_baseline, log)
+    measure(
+        "normalise",
+        lambda log: sum(
+            len(chunk) for chunk in LogNormaliser().normalise(chunked(log))
+        ),
+        log,
+    )
+    measure(
+        "normalise, keep timestamps",
+        lambda log: sum(
+            len(chunk)
+            for chunk in LogNormaliser(timestamps="keep").normalise(chunked(log))
+        ),
+        log,
+    )
+    measure(
+        "iter_lines, extract",
+        lambda log: sum(
+            1 for _ in LogNormaliser(timestamps="extract").iter_lines(chunked(log))
+        ),
+        log,
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,50 @@
+"""
+Time building the query strings of a paginated build scan
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_query_string.py [pages]
+
+Every page of a scan sends the same filters with a new page number, which is the
+case the encoded parameters cache is built for.
+"""
+import sys
+import timeit
+
+from pybuildkite.query import _encode_param, encode_query_params
+
+
+def scan_params(page):
+    return {
+        "creator": "3d3c3bf0-7d58-4afe-8fe7-b3017d5504de",
+        "created_from": "2023-01-01T00:00:00Z",
+        "created_to": "2023-02-01T00:00:00Z",
+        "state": ["running", "scheduled", "failing"],
+        "branch": ["main", "release/1.0", "feature#123"],
+        "include_retried_jobs": True,
+        "meta_data[release]": "v1.0",
+        "page": page,
+        "per_page": "100",
+    }
+
+
+def main(pages):
+    params = [scan_params(page) for page in range(1, pages + 1)]
+
+    def cold():
+        _encode_param.cache_clear()
+        for query_params in params:
+            encode_query_params(query_params)
+            _encode_param.cache_clear()
+
+    def warm():
+        for query_params in params:
+            encode_query_params(query_params)
+
+    for name, func in (("uncached", cold), ("cached", warm)):
+        runs = 20
+        seconds = timeit.timeit(func, number=runs) / runs
+        print("%-9s %8.2f us per page" % (name, seconds / pages * 1e6))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -21,7 +21,7 @@ class AccessTokens(Client):
         """
         Get data on the token used for the request
         """
-        return self.client.get(self.path)
+        return self.client.get(self.path, cache_resource="access_tokens")
 
     def revoke_token(self):
         """
@@ -1,5 +1,9 @@
+from functools import partial
 from posixpath import join as urljoin
 from pybuildkite.client import Client
+from pybuildkite.decorators import requires_sync_client
+from pybuildkite.models import Agent
+from pybuildkite.pagination import iter_items
 
 
 class Agents(Client):
@@ -25,6 +29,8 @@ class Agents(Client):
         version=None,
         page=0,
         with_pagination=False,
+        fields=None,
+        as_model=False,
     ):
         """
         Returns a paginated list of an organization’s agents.
@@ -35,6 +41,8 @@ class Agents(Client):
         :param version: Filters the results by the given exact version number
         :param page: Int to determine which page to read from (See Pagination in README)
         :param with_pagination: Bool to return a response with pagination attributes
+        :param fields: List of fields to keep, with dots for nested ones such as "job.state", None for all
+        :param as_model: Bool to return Agent objects instead of dicts
         :return: Returns a paginated list of an organization’s agents
         """
         query_params = {
@@ -47,17 +55,68 @@ class Agents(Client):
             self.path.format(organization),
             query_params,
             with_pagination=with_pagination,
+            fields=fields,
+            model=Agent if as_model else None,
         )
 
-    def get_agent(self, organization, agent_id):
+    @requires_sync_client
+    def iter_all(
+        self,
+        organization,
+        name=None,
+        hostname=None,
+        version=None,
+        max_items=None,
+        workers=None,
+        ordered=True,
+        fields=None,
+        as_model=False,
+    ):
+        """
+        Lazily iterate over all of an organization’s agents, one page at a time.
+
+        :param organization: Organization slug
+        :param name: Filters the results by the given agent name
+        :param hostname: Filters the results by the given hostname
+        :param version: Filters the results by the given exact version number
+        :param max_items: Maximum number of agents to return, None for all of them
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        :param ordered: Bool to keep page order when fetching concurrently
+        :param fields: List of fields to keep, with dots for nested ones such as "job.state", None for all
+        :param as_model: Bool to return Agent objects instead of dicts
+        :return: Generator of agents
+        """
+        return iter_items(
+            partial(
+                self.list_all,
+                organization,
+                name=name,
+                hostname=hostname,
+                version=version,
+                with_pagination=True,
+                fields=fields,
+                as_model=as_model,
+            ),
+            max_items,
+            workers,
+            ordered,
+        )
+
+    def get_agent(self, organization, agent_id, fields=None, as_model=False):
         """
         Get an agent
 
         :param organization: Organization slug
         :param agent_id: Agent id
+        :param fields: List of fields to keep, with dots for nested ones such as "job.state", None for all
+        :param as_model: Bool to return an Agent object instead of a dict
         :return: Single agent
         """
-        return self.client.get(self.path.format(organization) + agent_id)
+        return self.client.get(
+            self.path.format(organization) + agent_id,
+            fields=fields,
+            model=Agent if as_model else None,
+        )
 
     def stop_agent(self, organization, agent_id, force=True):
         """
@@ -1,4 +1,9 @@
+from functools import partial
+
 from pybuildkite.client import Client
+from pybuildkite.decorators import requires_sync_client
+from pybuildkite.models import Annotation
+from pybuildkite.pagination import iter_items
 
 
 class Annotations(Client):
@@ -17,7 +22,14 @@ class Annotations(Client):
         self.path = base_url + "organizations/{}/pipelines/{}/builds/{}/annotations/"
 
     def list_annotations(
-        self, organization, pipeline, build, page=0, with_pagination=False
+        self,
+        organization,
+        pipeline,
+        build,
+        page=0,
+        with_pagination=False,
+        fields=None,
+        as_model=False,
     ):
         """
         Returns a paginated list of the user’s annotations.
@@ -25,6 +37,8 @@ class Annotations(Client):
         :param organization: organization slug
         :param pipeline: pipeline slug
         :param build: build number
+        :param fields: List of fields to keep, None for all
+        :param as_model: Bool to return Annotation objects instead of dicts
         :return: Returns a paginated list of the user’s annotations.
         """
         query_params = {"page": page}
@@ -32,4 +46,46 @@ class Annotations(Client):
             self.path.format(organization, pipeline, build),
             query_params=query_params,
             with_pagination=with_pagination,
+            fields=fields,
+            model=Annotation if as_model else None,
+        )
+
+    @requires_sync_client
+    def iter_annotations(
+        self,
+        organization,
+        pipeline,
+        build,
+        max_items=None,
+        workers=None,
+        ordered=True,
+        fields=None,
+        as_model=False,
+    ):
+        """
+        Lazily iterate over a build’s annotations, one page at a time.
+
+        :param organization: organization slug
+        :param pipeline: pipeline slug
+        :param build: build number
+        :param max_items: Maximum number of annotations to return, None for all of them
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        :param ordered: Bool to keep page order when fetching concurrently
+        :param fields: List of fields to keep, None for all
+        :param as_model: Bool to return Annotation objects instead of dicts
+        :return: Generator of annotations
+        """
+        return iter_items(
+            partial(
+                self.list_annotations,
+                organization,
+                pipeline,
+                build,
+                with_pagination=True,
+                fields=fields,
+                as_model=as_model,
+            ),
+            max_items,
+            workers,
+            ordered,
         )
@@ -1,5 +1,9 @@
+from functools import partial
 from posixpath import join as urljoin
 from pybuildkite.client import Client
+from pybuildkite.decorators import requires_sync_client
+from pybuildkite.models import Artifact
+from pybuildkite.pagination import iter_items
 
 
 class Artifacts(Client):
@@ -18,7 +22,14 @@ class Artifacts(Client):
         self.path = urljoin(base_url, "organizations/{}/pipelines/{}/builds/{}/")
 
     def list_artifacts_for_build(
-        self, organization, pipeline, build, page=0, with_pagination=False
+        self,
+        organization,
+        pipeline,
+        build,
+        page=0,
+        with_pagination=False,
+        fields=None,
+        as_model=False,
     ):
         """
         Returns a paginated list of a build's artifacts across all of its jobs.
@@ -28,6 +39,8 @@ class Artifacts(Client):
         :param build: build number
         :param page: Int to determine which page to read from (See Pagination in README)
         :param with_pagination: Bool to return a response with pagination attributes
+        :param fields: List of fields to keep, None for all
+        :param as_model: Bool to return Artifact objects instead of dicts
         :return: Returns a paginated list of a build’s artifacts across all of its jobs.
         """
         url = self.path + "artifacts/"
@@ -36,10 +49,20 @@ class Artifacts(Client):
             url.format(organization, pipeline, build),
             query_params=query_params,
             with_pagination=with_pagination,
+            fields=fields,
+            model=Artifact if as_model else None,
         )
 
     def list_artifacts_for_job(
-        self, organization, pipeline, build, job, page=0, with_pagination=False
+        self,
+        organization,
+        pipeline,
+        build,
+        job,
+        page=0,
+        with_pagination=False,
+        fields=None,
+        as_model=False,
     ):
         """
         Returns a paginated list of a jobs's artifacts.
@@ -50,6 +73,8 @@ class Artifacts(Client):
         :param job: job id
         :param page: Int to determine which page to read from (See Pagination in README)
         :param with_pagination: Bool to return a response with pagination attributes
+        :param fields: List of fields to keep, None for all
+        :param as_model: Bool to return Artifact objects instead of dicts
         :return: Returns a paginated list of a job’s artifacts.
         """
         url = self.path + "jobs/{}/artifacts/"
@@ -58,9 +83,96 @@ class Artifacts(Client):
             url.format(organization, pipeline, build, job),
             query_params=query_params,
             with_pagination=with_pagination,
+            fields=fields,
+            model=Artifact if as_model else None,
         )
 
-    def get_artifact(self, organization, pipeline, build, job, artifact):
+    @requires_sync_client
+    def iter_artifacts_for_build(
+        self,
+        organization,
+        pipeline,
+        build,
+        max_items=None,
+        workers=None,
+        ordered=True,
+        fields=None,
+        as_model=False,
+    ):
+        """
+        Lazily iterate over a build's artifacts across all of its jobs, one page at a time.
+
+        :param organization: organization slug
+        :param pipeline: pipeline slug
+        :param build: build number
+        :param max_items: Maximum number of artifacts to return, None for all of them
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        :param ordered: Bool to keep page order when fetching concurrently
+        :param fields: List of fields to keep, None for all
+        :param as_model: Bool to return Artifact objects instead of dicts
+        :return: Generator of artifacts
+        """
+        return iter_items(
+            partial(
+                self.list_artifacts_for_build,
+                organization,
+                pipeline,
+                build,
+                with_pagination=True,
+                fields=fields,
+                as_model=as_model,
+            ),
+            max_items,
+            workers,
+            ordered,
+        )
+
+    @requires_sync_client
+    def iter_artifacts_for_job(
+        self,
+        organization,
+        pipeline,
+        build,
+        job,
+        max_items=None,
+        workers=None,
+        ordered=True,
+        fields=None,
+        as_model=False,
+    ):
+        """
+        Lazily iterate over a job's artifacts, one page at a time.
+
+        :param organization: organization slug
+        :param pipeline: pipeline slug
+        :param build: build number
+        :param job: job id
+        :param max_items: Maximum number of artifacts to return, None for all of them
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        :param ordered: Bool to keep page order when fetching concurrently
+        :param fields: List of fields to keep, None for all
+        :param as_model: Bool to return Artifact objects instead of dicts
+        :return: Generator of artifacts
+        """
+        return iter_items(
+            partial(
+                self.list_artifacts_for_job,
+                organization,
+                pipeline,
+                build,
+                job,
+                with_pagination=True,
+                fields=fields,
+                as_model=as_model,
+            ),
+            max_items,
+            workers,
+            ordered,
+        )
+
+    def get_artifact(
+        self, organization, pipeline, build, job, artifact, fields=None, as_model=False
+    ):
         """
         Returns an artifact.
 
@@ -69,10 +181,16 @@ class Artifacts(Client):
         :param build: build number
         :param job: job id
         :param artifact: artifact id
+        :param fields: List of fields to keep, None for all
+        :param as_model: Bool to return an Artifact object instead of a dict
         :return: Returns an artifact.
         """
         url = self.path + "jobs/{}/artifacts/{}/"
-        return self.client.get(url.format(organization, pipeline, build, job, artifact))
+        return self.client.get(
+            url.format(organization, pipeline, build, job, artifact),
+            fields=fields,
+            model=Artifact if as_model else None,
+        )
 
     def download_artifact(
         self, organization, pipeline, build, job, artifact, as_stream=False
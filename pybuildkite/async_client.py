@@ -0,0 +1,492 @@
+import asyncio
+from functools import partial
+from typing import Optional, Set, cast
+
+from pybuildkite.cache import CachedResponse
+from pybuildkite.client import Client, Response
+from pybuildkite.decoding import JsonArrayParser, get_json_decoder
+from pybuildkite.retry import RetryPolicy
+from pybuildkite.singleflight import AsyncSingleFlight
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:  # pragma: no cover
+    aiohttp = None  # type: ignore[assignment]
+
+
+class AsyncClient(Client):
+    """
+    Internal asyncio API Client
+
+    Works like Client, but every request method is a coroutine. All requests share
+    one aiohttp connection pool, and the number of requests in flight is bounded.
+    A request counts as in flight until its response body has been read or its
+    stream has been exhausted or closed.
+    """
+
+    def __init__(
+        self,
+        per_page=100,
+        pool_limit=100,
+        pool_maxsize=10,
+        keep_alive=True,
+        max_concurrency=None,
+        retry_policy=None,
+        rate_limiter=None,
+        http_cache=None,
+        response_cache=None,
+        coalesce_requests=False,
+        json_decoder=None,
+    ):
+        """
+        Create class
+
+        :param per_page: Number of items per page for API requests (default: 100)
+        :param pool_limit: Maximum number of open connections over all hosts (default: 100)
+        :param pool_maxsize: Maximum number of open connections per host (default: 10)
+        :param keep_alive: Bool to keep connections open between requests
+        :param max_concurrency: Maximum number of requests in flight, bodies included (default: pool_limit)
+        :param retry_policy: RetryPolicy for failed requests (default: RetryPolicy())
+        :param rate_limiter: RateLimiter pacing every request sent, None to send them right away
+        :param http_cache: HTTPCache for conditional GET requests, None to disable them
+        :param response_cache: ResponseCache for slow-changing resources, None to disable it
+        :param coalesce_requests: Bool to share one response between identical GET requests in flight
+        :param json_decoder: "orjson", "msgspec", "json" or a decoding function, None for the fastest installed
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncClient requires aiohttp, install it with `pip install pybuildkite[async]`"
+            )
+        self.access_token = ""
+        self.per_page = per_page
+        self.pool_limit = pool_limit
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.max_concurrency = max_concurrency or pool_limit
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.http_cache = http_cache
+        self.response_cache = response_cache
+        self.single_flight = AsyncSingleFlight() if coalesce_requests else None
+        self.json_decoder = get_json_decoder(json_decoder)
+        self.session = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._permits: Set[aiohttp.ClientResponse] = set()
+
+    def _get_session(self):
+        """
+        Get the pooled aiohttp session, creating it on first use inside the running loop
+
+        :return: aiohttp ClientSession
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_maxsize,
+                force_close=not self.keep_alive,
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._permits = set()
+        return self.session
+
+    async def close(self):
+        """
+        Close the pooled aiohttp session and all of its connections
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def __enter__(self):
+        raise TypeError("Use `async with` with AsyncClient")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass  # pragma: no cover
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def request(
+        self,
+        method,
+        url,
+        query_params=None,
+        body=None,
+        headers=None,
+        with_pagination=False,
+        as_stream=False,
+        cache_resource=None,
+        fields=None,
+        model=None,
+    ):
+        """
+        Make a request to the API
+
+        Behaves like Client.request. With as_stream=True you get an async iterator
+        of bytes chunks, or of the items of a Json array, which holds its connection
+        and its max_concurrency slot until it is exhausted or closed.
+
+        :param method: HTTP method to use
+        :param url: URL to call
+        :param query_params: Query parameters to use
+        :param body: Body of the request
+        :param headers: Dictionary of headers to use in HTTP request
+        :param with_pagination: Bool to return a response with pagination attributes
+        :param as_stream: Bool to stream the bytes response
+        :param cache_resource: Name of the resource for the response cache, None to not cache the response
+        :param fields: List of field paths to keep in the parsed Json objects, None to keep all fields
+        :param model: Model class to convert the parsed Json objects to, None to return dicts
+        :return: response return as parsed json, bytes or async bytes chunks iterator
+        """
+        headers, body, query_string = self._prepare_request(headers, body, query_params)
+        request = partial(
+            self._request,
+            method,
+            url,
+            headers,
+            query_string,
+            body,
+            with_pagination,
+            as_stream,
+            cache_resource,
+        )
+        if self.single_flight is not None and method == "GET" and not as_stream:
+            key = self._cache_key(method, url, query_string, headers)
+            result = await self.single_flight.do((key, with_pagination), request)
+        else:
+            result = await request()
+        if fields is not None or model is not None:
+            result = self._map_items(result, self._item_converter(fields, model))
+        return result
+
+    async def _request(
+        self,
+        method,
+        url,
+        headers,
+        query_string,
+        body,
+        with_pagination,
+        as_stream,
+        cache_resource,
+    ):
+        """
+        Make a prepared request to the API
+
+        :return: response return as parsed json, bytes or async bytes chunks iterator
+        """
+        if self._is_cacheable(method, headers, as_stream, cache_resource):
+            return await self._cached_get(
+                url, headers, query_string, with_pagination, cache_resource
+            )
+
+        response = await self._send(method, url, headers, query_string, body)
+        if self.response_cache is not None and method != "GET" and response.ok:
+            self.response_cache.invalidate_url(url)
+        if as_stream and response.ok:
+            if with_pagination:
+                if self._accepts_json(headers):
+                    body = self._iter_json_items(response)
+                else:
+                    body = self._iter_stream(response)
+                response_object = Response(body, response.status, response.headers)
+                return response_object.append_pagination_data(response.headers)
+            if not self._accepts_json(headers):
+                return self._iter_stream(response)
+            if response.status != 204 and response.headers.get("content-type"):
+                return self._iter_json_items(response)
+        try:
+            response.raise_for_status()
+            return await self._read_response(method, response, headers, with_pagination)
+        finally:
+            self._release(response)
+
+    async def _cached_get(
+        self, url, headers, query_string, with_pagination, cache_resource
+    ):
+        """
+        Make a Json GET request through the response cache and the http cache
+
+        :return: response return as parsed json
+        """
+        key = self._cache_key("GET", url, query_string, headers)
+        use_response_cache = self.response_cache is not None and cache_resource
+        if use_response_cache:
+            cached_response = self.response_cache.get(key)
+            if cached_response is not None:
+                return self._cached_result(cached_response, with_pagination)
+
+        if self.http_cache is not None:
+            cached_response = await self._get_with_http_cache(
+                key, url, headers, query_string
+            )
+        else:
+            response = await self._send("GET", url, headers, query_string, None)
+            cached_response = await self._read_cacheable_response(response)
+        if not isinstance(cached_response, CachedResponse):
+            return cached_response
+
+        if use_response_cache:
+            self.response_cache.set(key, cached_response, cache_resource, url)
+        return self._cached_result(cached_response, with_pagination)
+
+    async def _get_with_http_cache(self, key, url, headers, query_string):
+        """
+        Make a conditional GET request, answering from the http cache on a 304
+
+        :return: CachedResponse, or a bool for responses without content
+        """
+        cached_response = self.http_cache.get(key)
+        request_headers = self.http_cache.add_validators(headers, cached_response)
+        response = await self._send("GET", url, request_headers, query_string, None)
+
+        if cached_response is not None and response.status == 304:
+            self._release(response)
+            self.http_cache.record_hit()
+            return cached_response
+
+        cached_response = await self._read_cacheable_response(response)
+        self.http_cache.record_miss()
+        if isinstance(cached_response, CachedResponse) and (
+            cached_response.etag or cached_response.last_modified
+        ):
+            self.http_cache.set(key, cached_response)
+        return cached_response
+
+    async def _read_cacheable_response(self, response):
+        """
+        Read a Json response into a CachedResponse
+
+        :param response: aiohttp response
+        :return: CachedResponse, or a bool for responses without content
+        """
+        try:
+            response.raise_for_status()
+            if response.status == 204 or not response.headers.get("content-type"):
+                return response.ok
+            return CachedResponse(
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                self.json_decoder(await response.read()),
+                response.headers.get("Link"),
+            )
+        finally:
+            self._release(response)
+
+    async def _send(self, method, url, headers, query_string, body):
+        """
+        Send a request, retrying it as allowed by the retry policy
+
+        :return: aiohttp response of the last attempt
+        """
+        session = self._get_session()
+        semaphore = cast(asyncio.Semaphore, self._semaphore)
+        self.retry_policy.record_request()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve())
+            await semaphore.acquire()
+            try:
+                response = await session.request(
+                    method,
+                    URL(url + "?" + query_string, encoded=True),
+                    headers=headers,
+                    json=body,
+                )
+            except aiohttp.ClientConnectionError:
+                semaphore.release()
+                if not self.retry_policy.is_retryable(method, attempt):
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+            except BaseException:
+                semaphore.release()
+                raise
+            else:
+                self._permits.add(response)
+                if not self.retry_policy.is_retryable(method, attempt, response.status):
+                    return response
+                delay = self.retry_policy.get_delay(attempt, response.headers)
+                self._release(response)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _release(self, response):
+        """
+        Release the connection of a response and its max_concurrency slot
+
+        :param response: aiohttp response returned by _send
+        """
+        response.release()
+        if response in self._permits:
+            self._permits.discard(response)
+            cast(asyncio.Semaphore, self._semaphore).release()
+
+    async def _read_response(self, method, response, headers, with_pagination):
+        """
+        Read the body of a response the same way Client.request does
+
+        :return: response return as parsed json or bytes
+        """
+        if with_pagination:
+            body = await response.read()
+            if self._accepts_json(headers):
+                body = self.json_decoder(body)
+            response_object = Response(body, response.status, response.headers)
+            response_object.append_pagination_data(response.headers)
+            return response_object
+        if (
+            method == "DELETE"
+            or response.status == 204
+            or response.headers.get("content-type") is None
+        ):
+            return response.ok
+        if self._accepts_json(headers):
+            return self.json_decoder(await response.read())
+        return await response.read()
+
+    async def _iter_stream(self, response):
+        """
+        Iterate over the bytes chunks of a response as they arrive
+
+        :param response: aiohttp response
+        :return: async iterator of bytes chunks
+        """
+        try:
+            async for chunk in response.content.iter_any():
+                yield chunk
+        finally:
+            self._release(response)
+
+    async def _iter_json_items(self, response):
+        """
+        Decode the items of a streamed Json array as they arrive
+
+        :param response: aiohttp response
+        :return: async iterator of items
+        """
+        parser = JsonArrayParser(self.json_decoder)
+        try:
+            async for chunk in response.content.iter_any():
+                for item in parser.feed(chunk):
+                    yield item
+            for item in parser.close():
+                yield item
+        finally:
+            self._release(response)
+
+    async def get(
+        self,
+        url,
+        query_params=None,
+        headers=None,
+        with_pagination=False,
+        as_stream=False,
+        cache_resource=None,
+        fields=None,
+        model=None,
+    ):
+        """
+        Make a GET request to the API
+
+        :param url: URL to call
+        :param query_params: Query parameters to append to URL
+        :param headers: Dictionary of headers to use in HTTP request
+        :param with_pagination: Bool to return a response with pagination attributes
+        :param as_stream: Bool to stream the response, item by item for Json responses
+        :param cache_resource: Name of the resource for the response cache, None to not cache the response
+        :param fields: List of field paths to keep in the parsed Json objects, None to keep all fields
+        :param model: Model class to convert the parsed Json objects to, None to return dicts
+        :return: If headers are set response text is returned, otherwise parsed response is returned
+        """
+        return await self.request(
+            "GET",
+            url=url,
+            query_params=query_params,
+            headers=headers,
+            with_pagination=with_pagination,
+            as_stream=as_stream,
+            cache_resource=cache_resource,
+            fields=fields,
+            model=model,
+        )
+
+    async def get_response(self, url, query_params=None, headers=None):
+        """
+        Make a GET request to the API and return the whole response
+
+        Behaves like Client.get_response.
+
+        :param url: URL to call
+        :param query_params: Query parameters to append to URL
+        :param headers: Dictionary of headers to use in HTTP request
+        :return: Response object with the bytes body, status code and headers
+        """
+        headers, _, query_string = self._prepare_request(headers, None, query_params)
+        response = await self._send("GET", url, headers, query_string, None)
+        try:
+            response.raise_for_status()
+            return Response(await response.read(), response.status, response.headers)
+        finally:
+            self._release(response)
+
+    async def post(self, url, body=None, headers=None, query_params=None):
+        """
+        Make a POST request to the API
+
+        :param url: URL to call
+        :param body: Body of the request
+        :param query_params: Query parameters to append to URL
+        :param headers: Dictionary of headers to use in HTTP request
+        :return: If headers are set response text is returned, otherwise parsed response is returned
+        """
+        return await self.request(
+            "POST", url=url, query_params=query_params, body=body, headers=headers
+        )
+
+    async def put(self, url, body=None, headers=None, query_params=None):
+        """
+        Make a PUT request to the API
+
+        :param url: URL to call
+        :param body: Body of the request
+        :param headers: Dictionary of headers to use in HTTP request
+        :param query_params: Query parameters to append to URL
+        :return: If headers are set response text is returned, otherwise parsed response is returned
+        """
+        return await self.request(
+            "PUT", url=url, query_params=query_params, body=body, headers=headers
+        )
+
+    async def delete(self, url, body=None, headers=None, query_params=None):
+        """
+        Make a DELETE request to the API
+
+        :param url: URL to call
+        :param body: Body of the request
+        :param query_params: Query parameters to append to URL
+        :param headers: Dictionary of headers to use in HTTP request
+        :return: If headers are set response text is returned, otherwise parsed response is returned
+        """
+        return await self.request(
+            "DELETE", url=url, query_params=query_params, body=body, headers=headers
+        )
+
+    async def patch(self, url, body=None, headers=None, query_params=None):
+        """
+        Make a PATCH request to the API
+
+        :param url: URL to call
+        :param body: Body of the request
+        :param query_params: Query parameters to append to URL
+        :param headers: Dictionary of headers to use in HTTP request
+        :return: If headers are set response text is returned, otherwise parsed response is returned
+        """
+        return await self.request(
+            "PATCH", url=url, query_params=query_params, body=body, headers=headers
+        )
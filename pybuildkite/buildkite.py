@@ -1,8 +1,10 @@
 from pybuildkite.client import Client
+from pybuildkite.async_client import AsyncClient
 from pybuildkite.organizations import Organizations
 from pybuildkite.pipelines import Pipelines
 from pybuildkite.builds import Builds, BuildState
 from pybuildkite.jobs import Jobs, LogFormat
+from pybuildkite.logs import LogSearch
 from pybuildkite.agents import Agents
 from pybuildkite.emojis import Emojis
 from pybuildkite.annotations import Annotations
@@ -19,15 +21,75 @@ class Buildkite(object):
     Public API for Buildkite
     """
 
-    def __init__(self, per_page=100):
+    def __init__(
+        self,
+        per_page=100,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        keep_alive=True,
+        retry_policy=None,
+        rate_limiter=None,
+        http_cache=None,
+        response_cache=None,
+        coalesce_requests=False,
+        json_decoder=None,
+        log_cache=None,
+    ):
         """
         Create a new client
-        
+
+        The client and its connection pool are shared by every resource returned by this object.
+
         :param per_page: Number of items per page for API requests (default: 100)
+        :param pool_connections: Number of per-host connection pools to cache (default: 10)
+        :param pool_maxsize: Maximum number of connections kept open per host (default: 10)
+        :param pool_block: Bool to block when all connections of a host are in use
+        :param keep_alive: Bool to keep connections open between requests
+        :param retry_policy: RetryPolicy for failed requests (default: RetryPolicy())
+        :param rate_limiter: RateLimiter pacing every request sent, None to send them right away
+        :param http_cache: HTTPCache for conditional GET requests, None to disable them
+        :param response_cache: ResponseCache for slow-changing resources, None to disable it
+        :param coalesce_requests: Bool to share one response between identical GET requests in flight
+        :param json_decoder: "orjson", "msgspec", "json" or a decoding function, None for the fastest installed
+        :param log_cache: LogCache for the logs of finished jobs, None to disable it
         """
-        self.client = Client(per_page)
+        self.client = Client(
+            per_page,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            http_cache=http_cache,
+            response_cache=response_cache,
+            coalesce_requests=coalesce_requests,
+            json_decoder=json_decoder,
+        )
+        self.log_cache = log_cache
         self.base_url = "https://api.buildkite.com/v2/"
 
+    def invalidate_cache(self, resource=None):
+        """
+        Drop cached responses of a resource, e.g. "teams", from the response cache
+
+        :param resource: Name of the resource, None for all resources
+        """
+        self.client.invalidate_cache(resource)
+
+    def close(self):
+        """
+        Close the connection pool of the client
+        """
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def set_access_token(self, access_token):
         """
         Set the access token to be used to authenticate the requests
@@ -69,7 +131,7 @@ class Buildkite(object):
 
         :return: Client
         """
-        return Jobs(self.client, self.base_url)
+        return Jobs(self.client, self.base_url, log_cache=self.log_cache)
 
     @requires_token
     def agents(self):
@@ -131,3 +193,86 @@ class Buildkite(object):
         :return: Client
         """
         return Meta(self.client, self.base_url)
+
+    @requires_token
+    def log_search(self, workers=8, context=0, max_hits=None):
+        """
+        Get a search over the job logs of many builds
+
+        :param workers: Number of logs downloaded concurrently (default: 8)
+        :param context: Number of lines kept before and after each matching line (default: 0)
+        :param max_hits: Number of matches to stop after, None to search every log
+        :return: LogSearch
+        """
+        return LogSearch(self.builds(), self.jobs(), workers, context, max_hits)
+
+
+class AsyncBuildkite(Buildkite):
+    """
+    Public asyncio API for Buildkite
+
+    Exposes the same resources as Buildkite, but every API call returns an awaitable.
+    """
+
+    def __init__(
+        self,
+        per_page=100,
+        pool_limit=100,
+        pool_maxsize=10,
+        keep_alive=True,
+        max_concurrency=None,
+        retry_policy=None,
+        rate_limiter=None,
+        http_cache=None,
+        response_cache=None,
+        coalesce_requests=False,
+        json_decoder=None,
+    ):
+        """
+        Create a new asyncio client
+
+        :param per_page: Number of items per page for API requests (default: 100)
+        :param pool_limit: Maximum number of open connections over all hosts (default: 100)
+        :param pool_maxsize: Maximum number of open connections per host (default: 10)
+        :param keep_alive: Bool to keep connections open between requests
+        :param max_concurrency: Maximum number of requests in flight (default: pool_limit)
+        :param retry_policy: RetryPolicy for failed requests (default: RetryPolicy())
+        :param rate_limiter: RateLimiter pacing every request sent, None to send them right away
+        :param http_cache: HTTPCache for conditional GET requests, None to disable them
+        :param response_cache: ResponseCache for slow-changing resources, None to disable it
+        :param coalesce_requests: Bool to share one response between identical GET requests in flight
+        :param json_decoder: "orjson", "msgspec", "json" or a decoding function, None for the fastest installed
+        """
+        self.client = AsyncClient(
+            per_page,
+            pool_limit=pool_limit,
+            pool_maxsize=pool_maxsize,
+            keep_alive=keep_alive,
+            max_concurrency=max_concurrency,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            http_cache=http_cache,
+            response_cache=response_cache,
+            coalesce_requests=coalesce_requests,
+            json_decoder=json_decoder,
+        )
+        self.log_cache = None
+        self.base_url = "https://api.buildkite.com/v2/"
+
+    async def close(self):
+        """
+        Close the connection pool of the client
+        """
+        await self.client.close()
+
+    def __enter__(self):
+        raise TypeError("Use `async with` with AsyncBuildkite")
+
+    def log_search(self, workers=8, context=0, max_hits=None):
+        raise TypeError("Searching logs needs the synchronous Buildkite client")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
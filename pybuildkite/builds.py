@@ -1,9 +1,13 @@
 import datetime
 from enum import Enum
+from functools import partial
 from typing import List
-import urllib.parse
 
+from pybuildkite.bulk import run_bulk
 from pybuildkite.client import Client
+from pybuildkite.decorators import requires_sync_client
+from pybuildkite.models import Build
+from pybuildkite.pagination import iter_items, map_concurrently
 from pybuildkite.exceptions import (
     BuildStateNotAList,
     NotValidBuildState,
@@ -31,6 +35,25 @@ class BuildState(Enum):
     FINISHED = "finished"
 
 
+ACTIVE_STATES = [
+    BuildState.SCHEDULED,
+    BuildState.RUNNING,
+    BuildState.FAILING,
+    BuildState.CANCELING,
+]
+
+TERMINAL_STATES = [
+    BuildState.PASSED,
+    BuildState.FAILED,
+    BuildState.BLOCKED,
+    BuildState.CANCELED,
+    BuildState.SKIPPED,
+    BuildState.NOT_RUN,
+]
+
+CANCELABLE_STATES = [BuildState.SCHEDULED, BuildState.RUNNING, BuildState.FAILING]
+
+
 # TODO needed?
 class BuildQueryParams(Enum):
     """
@@ -80,6 +103,9 @@ class Builds(Client):
         include_retried_jobs=None,
         page=0,
         with_pagination=False,
+        as_stream=False,
+        fields=None,
+        as_model=False,
     ):
         """
         Returns a paginated list of all builds across all the user's organizations and pipelines. If using
@@ -98,6 +124,9 @@ class Builds(Client):
                Without this parameter, you'll see only the most recently run job for each step.
         :param page: Int to determine which page to read from (See Pagination in README)
         :param with_pagination: Bool to return a response with pagination attributes
+        :param as_stream: Bool to decode builds one by one as they arrive instead of the whole page at once
+        :param fields: List of fields to keep, with dots for nested ones such as "jobs.state", None for all
+        :param as_model: Bool to return Build objects instead of dicts
         :return: Returns a paginated list of all builds across all the user's organizations and pipelines
         """
         self.__validate_dates([created_from, created_to, finished_from])
@@ -117,7 +146,12 @@ class Builds(Client):
         query_params.update(self.__process_meta_data(meta_data))
 
         return self.client.get(
-            self.path_for_all, query_params, with_pagination=with_pagination
+            self.path_for_all,
+            query_params,
+            with_pagination=with_pagination,
+            as_stream=as_stream,
+            fields=fields,
+            model=Build if as_model else None,
         )
 
     def list_all_for_org(
@@ -134,6 +168,9 @@ class Builds(Client):
         include_retried_jobs=None,
         page=0,
         with_pagination=False,
+        as_stream=False,
+        fields=None,
+        as_model=False,
     ):
         """
         Returns a paginated list of an organization's builds across all of an organization's pipelines. Builds are
@@ -152,6 +189,9 @@ class Builds(Client):
                Without this parameter, you'll see only the most recently run job for each step.
         :param page: Int to determine which page to read from (See Pagination in README)
         :param with_pagination: Bool to return a response with pagination attributes
+        :param as_stream: Bool to decode builds one by one as they arrive instead of the whole page at once
+        :param fields: List of fields to keep, with dots for nested ones such as "jobs.state", None for all
+        :param as_model: Bool to return Build objects instead of dicts
         :return: Returns a paginated list of an organization's builds across all of an organization's pipelines.
         """
 
@@ -175,6 +215,9 @@ class Builds(Client):
             self.path_by_org.format(organization),
             query_params,
             with_pagination=with_pagination,
+            as_stream=as_stream,
+            fields=fields,
+            model=Build if as_model else None,
         )
 
     def list_all_for_pipeline(
@@ -192,6 +235,9 @@ class Builds(Client):
         include_retried_jobs=None,
         page=0,
         with_pagination=False,
+        as_stream=False,
+        fields=None,
+        as_model=False,
     ):
         """
         Returns a paginated list of a pipeline's builds. Builds are listed in the order they were created (newest
@@ -211,6 +257,9 @@ class Builds(Client):
                Without this parameter, you'll see only the most recently run job for each step.
         :param page: Int to determine which page to read from (See Pagination in README)
         :param with_pagination: Bool to return a response with pagination attributes
+        :param as_stream: Bool to decode builds one by one as they arrive instead of the whole page at once
+        :param fields: List of fields to keep, with dots for nested ones such as "jobs.state", None for all
+        :param as_model: Bool to return Build objects instead of dicts
         :return: Returns a paginated list of a pipeline's builds.
         """
 
@@ -234,10 +283,144 @@ class Builds(Client):
             self.path_by_pipeline.format(organization, pipeline),
             query_params,
             with_pagination=with_pagination,
+            as_stream=as_stream,
+            fields=fields,
+            model=Build if as_model else None,
+        )
+
+    @requires_sync_client
+    def iter_all(self, max_items=None, workers=None, ordered=True, **filters):
+        """
+        Lazily iterate over all builds across all the user's organizations and pipelines, one page at a time.
+        Builds are returned newest first.
+
+        :param max_items: Maximum number of builds to return, None for all of them
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        :param ordered: Bool to keep page order when fetching concurrently
+        :param filters: Any of the filters accepted by list_all
+        :return: Generator of builds
+        """
+        return iter_items(
+            partial(self.list_all, with_pagination=True, **filters),
+            max_items,
+            workers,
+            ordered,
+        )
+
+    @requires_sync_client
+    def iter_all_for_org(
+        self, organization, max_items=None, workers=None, ordered=True, **filters
+    ):
+        """
+        Lazily iterate over an organization's builds across all of its pipelines, one page at a time.
+        Builds are returned newest first.
+
+        :param organization: Organization slug
+        :param max_items: Maximum number of builds to return, None for all of them
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        :param ordered: Bool to keep page order when fetching concurrently
+        :param filters: Any of the filters accepted by list_all_for_org
+        :return: Generator of builds
+        """
+        return iter_items(
+            partial(
+                self.list_all_for_org, organization, with_pagination=True, **filters
+            ),
+            max_items,
+            workers,
+            ordered,
+        )
+
+    @requires_sync_client
+    def iter_all_for_pipeline(
+        self,
+        organization,
+        pipeline,
+        max_items=None,
+        workers=None,
+        ordered=True,
+        **filters,
+    ):
+        """
+        Lazily iterate over a pipeline's builds, one page at a time. Builds are returned newest first.
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug
+        :param max_items: Maximum number of builds to return, None for all of them
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        :param ordered: Bool to keep page order when fetching concurrently
+        :param filters: Any of the filters accepted by list_all_for_pipeline
+        :return: Generator of builds
+        """
+        return iter_items(
+            partial(
+                self.list_all_for_pipeline,
+                organization,
+                pipeline,
+                with_pagination=True,
+                **filters,
+            ),
+            max_items,
+            workers,
+            ordered,
+        )
+
+    @requires_sync_client
+    def scan_all_for_org(
+        self,
+        organization,
+        created_from,
+        created_to=None,
+        window=datetime.timedelta(days=1),
+        workers=4,
+        max_items=None,
+        **filters,
+    ):
+        """
+        Scan an organization's builds created in a date range, split into time windows scanned in parallel.
+
+        Deep page numbers are slow and shift while new builds are created. Each window is paged through on its
+        own, so pages stay shallow, and `workers` windows are scanned at once. Builds are returned newest first,
+        without duplicates, one window at a time.
+
+        :param organization: Organization slug
+        :param created_from: Scan builds created on or after the given datetime.date
+        :param created_to: Scan builds created before the given datetime.date, None for now
+        :param window: datetime.timedelta covered by each window (default: 1 day)
+        :param workers: Number of windows to scan concurrently (default: 4)
+        :param max_items: Maximum number of builds to return, None for all of them
+        :param filters: Any other filter accepted by list_all_for_org. With fields, "id" is always kept.
+        :return: Generator of builds
+        """
+        self.__validate_dates([created_from, created_to])
+        if window <= datetime.timedelta(0):
+            raise ValueError("window must be positive")
+        if filters.get("fields") and "id" not in filters["fields"]:
+            filters["fields"] = list(filters["fields"]) + ["id"]
+        windows = self.__time_windows(created_from, created_to, window)
+
+        def scan_window(bounds):
+            return list(
+                self.iter_all_for_org(
+                    organization,
+                    created_from=bounds[0],
+                    created_to=bounds[1],
+                    **filters,
+                )
+            )
+
+        return self.__merge_windows(
+            map_concurrently(scan_window, windows, workers), max_items
         )
 
     def get_build_by_number(
-        self, organization, pipeline, build_number, include_retried_jobs=None
+        self,
+        organization,
+        pipeline,
+        build_number,
+        include_retried_jobs=None,
+        fields=None,
+        as_model=False,
     ):
         """
         Get build by build number
@@ -247,6 +430,8 @@ class Builds(Client):
         :param build_number: Build number
         :param include_retried_jobs: Include all retried job executions in each build's jobs list if True.
                Without this parameter, you'll see only the most recently run job for each step.
+        :param fields: List of fields to keep, with dots for nested ones such as "jobs.state", None for all
+        :param as_model: Bool to return a Build object instead of a dict
         :return: A build
         """
         query_params = {
@@ -255,8 +440,51 @@ class Builds(Client):
         return self.client.get(
             self.path_for_build_number.format(organization, pipeline, build_number),
             query_params=query_params,
+            fields=fields,
+            model=Build if as_model else None,
         )
 
+    @requires_sync_client
+    def wait_for_build(
+        self, organization, pipeline, build_number, timeout=None, **watcher_options
+    ):
+        """
+        Wait for a build to finish
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug
+        :param build_number: Build number
+        :param timeout: Maximum seconds to wait, None to wait forever
+        :param watcher_options: Any option accepted by BuildWatcher, such as on_transition or max_interval
+        :return: The finished build
+        """
+        from pybuildkite.watch import BuildWatcher
+
+        watcher = BuildWatcher(self, **watcher_options)
+        watcher.add(organization, pipeline, build_number)
+        return watcher.wait(timeout)[(organization, pipeline, int(build_number))]
+
+    @requires_sync_client
+    def watch_builds(self, builds, timeout=None, **watcher_options):
+        """
+        Wait for many builds to finish, polling each pipeline once per round
+
+        :param builds: Builds returned by the API, such as results of create_build,
+               or (organization, pipeline, build number) tuples
+        :param timeout: Maximum seconds to wait, None to wait forever
+        :param watcher_options: Any option accepted by BuildWatcher, such as on_transition or max_interval
+        :return: Dictionary of (organization, pipeline, build number) to finished build
+        """
+        from pybuildkite.watch import BuildWatcher
+
+        watcher = BuildWatcher(self, **watcher_options)
+        for build in builds:
+            if isinstance(build, tuple):
+                watcher.add(*build)
+            else:
+                watcher.add_build(build)
+        return watcher.wait(timeout)
+
     def create_build(
         self,
         organization,
@@ -311,6 +539,31 @@ class Builds(Client):
             self.path_by_pipeline.format(organization, pipeline), body
         )
 
+    @requires_sync_client
+    def create_builds(self, builds, workers=8, on_progress=None):
+        """
+        Create many builds concurrently
+
+        A failed build does not stop the others: every build gets a BulkResult with either
+        the created build or the exception raised. Builds rejected by the rate limit are
+        created again by the client's retry policy once the wait asked for by the API has
+        passed. Keep workers at or below the client's pool_maxsize so that every request
+        reuses a pooled connection.
+
+        :param builds: List of dictionaries of create_build arguments, such as
+               {"organization": ..., "pipeline": ..., "commit": ..., "branch": ...}
+        :param workers: Number of builds created concurrently (default: 8)
+        :param on_progress: Callable called with the number of builds done, the total and
+               the latest BulkResult, every time a build is created or fails
+        :return: List of BulkResult of each dictionary, in the order of builds
+        """
+        return run_bulk(
+            lambda build: self.create_build(**build),
+            builds,
+            workers,
+            on_progress,
+        )
+
     def cancel_build(self, organization, pipeline, build_number):
         cancel = "/cancel"
         return self.client.put(
@@ -325,6 +578,160 @@ class Builds(Client):
             + rebuild
         )
 
+    @requires_sync_client
+    def cancel_matching(
+        self,
+        organization,
+        pipeline=None,
+        dry_run=False,
+        workers=8,
+        on_progress=None,
+        **filters,
+    ):
+        """
+        Cancel every build matching the filters
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug, None for builds of all the organization's pipelines
+        :param dry_run: Bool to only return the matching builds, without cancelling them
+        :param workers: Number of builds cancelled concurrently (default: 8)
+        :param on_progress: Callable called with the number of builds done, the total and
+               the latest BulkResult, every time a build is cancelled or fails
+        :param filters: Any of the filters accepted by list_all_for_org or list_all_for_pipeline.
+               states defaults to the states a build can be cancelled in.
+        :return: List of BulkResult of each matching build, or the matching builds with dry_run
+        """
+        filters.setdefault("states", CANCELABLE_STATES)
+        return self.__run_matching(
+            self.cancel_build,
+            organization,
+            pipeline,
+            dry_run,
+            workers,
+            on_progress,
+            filters,
+        )
+
+    @requires_sync_client
+    def rebuild_matching(
+        self,
+        organization,
+        pipeline=None,
+        dry_run=False,
+        workers=8,
+        on_progress=None,
+        **filters,
+    ):
+        """
+        Rebuild every build matching the filters
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug, None for builds of all the organization's pipelines
+        :param dry_run: Bool to only return the matching builds, without rebuilding them
+        :param workers: Number of builds rebuilt concurrently (default: 8)
+        :param on_progress: Callable called with the number of builds done, the total and
+               the latest BulkResult, every time a build is rebuilt or fails
+        :param filters: Any of the filters accepted by list_all_for_org or list_all_for_pipeline
+        :return: List of BulkResult of each matching build, or the matching builds with dry_run
+        """
+        return self.__run_matching(
+            self.rebuild_build,
+            organization,
+            pipeline,
+            dry_run,
+            workers,
+            on_progress,
+            filters,
+        )
+
+    def __run_matching(
+        self, action, organization, pipeline, dry_run, workers, on_progress, filters
+    ):
+        """
+        Apply a build action to every build matching the filters
+
+        All matching builds are listed before the first action, because acting on a
+        build can move it out of the filters and shift the pages still to be read.
+
+        :param action: Method taking the organization, pipeline and build number
+        :return: List of BulkResult, or the matching builds with dry_run
+        """
+        if filters.get("fields"):
+            filters["fields"] = list(filters["fields"]) + ["number", "pipeline.slug"]
+        if pipeline is None:
+            builds = self.iter_all_for_org(organization, **filters)
+        else:
+            builds = self.iter_all_for_pipeline(organization, pipeline, **filters)
+        matching = list(builds)
+        if dry_run:
+            return matching
+
+        def run(build):
+            slug = pipeline if pipeline is not None else build["pipeline"]["slug"]
+            return action(organization, slug, build["number"])
+
+        return run_bulk(run, matching, workers, on_progress)
+
+    @staticmethod
+    def __time_windows(created_from, created_to, window):
+        """
+        Split a date range into windows, newest first
+
+        Bounds are naive UTC datetimes, as the API's timestamps are formatted in UTC.
+
+        :return: List of (start, end) datetime tuples
+        """
+
+        def as_utc(value):
+            if not isinstance(value, datetime.datetime):
+                return datetime.datetime(value.year, value.month, value.day)
+            if value.tzinfo is not None:
+                value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+            return value
+
+        start = as_utc(created_from)
+        if created_to is None:
+            end = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        else:
+            end = as_utc(created_to)
+
+        windows = []
+        while end > start:
+            windows.append((max(start, end - window), end))
+            end -= window
+        return windows
+
+    @staticmethod
+    def __merge_windows(scans, max_items):
+        """
+        Chain the builds of consecutive windows, dropping builds already returned
+
+        A build can only be returned twice by the same or an adjacent window, so only
+        the ids of the current and previous windows are remembered.
+
+        :param scans: Generator of lists of builds, one per window
+        :param max_items: Maximum number of builds to return, None for all of them
+        :return: Generator of builds
+        """
+        remaining = max_items
+        previous = set()
+        try:
+            for builds in scans:
+                current = set()
+                for build in builds:
+                    if remaining is not None and remaining <= 0:
+                        return
+                    build_id = build["id"]
+                    if build_id in current or build_id in previous:
+                        continue
+                    current.add(build_id)
+                    if remaining is not None:
+                        remaining -= 1
+                    yield build
+                previous = current
+        finally:
+            scans.close()
+
     @staticmethod
     def __process_meta_data(meta_data):
         if not meta_data:
@@ -362,24 +769,11 @@ class Builds(Client):
         if not states:
             return None
         if len(states) == 1:
-            return "state=" + states[0].value
-        else:
-            param_string = ""
-            for state in states:
-                param_string += "state[]={}&".format(state.value)
-            return param_string[:-1]
+            return states[0].value
+        return [state.value for state in states]
 
     @staticmethod
     def __get_branches_query_param(branches):
         if not branches:
             return None
-
-        if isinstance(branches, List):
-            param_string = ""
-            for branch in branches:
-                encoded_branch = urllib.parse.quote_plus(branch)
-                param_string += f"branch[]={{}}&".format(encoded_branch)
-            return param_string[:-1]
-        else:
-            encoded_branch = urllib.parse.quote_plus(branches)
-            return f"branch={{}}".format(encoded_branch)
+        return branches
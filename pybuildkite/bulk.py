@@ -0,0 +1,45 @@
+from collections import namedtuple
+
+from pybuildkite.pagination import map_concurrently
+
+
+class BulkResult(namedtuple("BulkResult", ["item", "result", "error"])):
+    """
+    Outcome of one item of a bulk operation: its result, or the exception it raised
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def run_bulk(func, items, workers=8, on_progress=None):
+    """
+    Call func for every item concurrently, collecting results and errors instead of raising
+
+    Retries are left to the client, whose retry policy repeats calls rejected with 429 Too
+    Many Requests, even for a POST.
+
+    :param func: Callable taking one item
+    :param items: Iterable of items
+    :param workers: Number of concurrent calls (default: 8)
+    :param on_progress: Callable called with the number of items done, the total and the
+           latest BulkResult, every time an item finishes
+    :return: List of BulkResult, in the order of items
+    """
+    items = list(items)
+
+    def run(item):
+        try:
+            return BulkResult(item, func(item), None)
+        except Exception as error:
+            return BulkResult(item, None, error)
+
+    results = []
+    for result in map_concurrently(run, items, min(workers, len(items)) or 1):
+        results.append(result)
+        if on_progress is not None:
+            on_progress(len(results), len(items), result)
+    return results
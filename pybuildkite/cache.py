@@ -0,0 +1,241 @@
+import abc
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+DEFAULT_TTLS = {
+    "access_tokens": 300,
+    "emojis": 3600,
+    "meta": 3600,
+    "organizations": 600,
+    "teams": 300,
+    "users": 600,
+}
+
+CachedResponse = namedtuple("CachedResponse", ["etag", "last_modified", "body", "link"])
+
+
+class HTTPCache(abc.ABC):
+    """
+    Base class of the conditional request caches
+
+    Stores the validators and parsed body of GET responses. The client sends the
+    validators with the next identical request and reuses the body on a 304.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def get(self, key):
+        """
+        Get a cached response
+
+        :param key: Cache key of the request
+        :return: CachedResponse or None
+        """
+
+    @abc.abstractmethod
+    def set(self, key, cached_response):
+        """
+        Store a response
+
+        :param key: Cache key of the request
+        :param cached_response: CachedResponse
+        """
+
+    def record_hit(self):
+        """
+        Count a response served from the cache
+        """
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        """
+        Count a response downloaded in full
+        """
+        with self._lock:
+            self.misses += 1
+
+    @staticmethod
+    def add_validators(headers, cached_response):
+        """
+        Add the conditional request headers for a cached response
+
+        :param headers: Dictionary of headers to use in HTTP request
+        :param cached_response: CachedResponse or None
+        :return: New dictionary of headers
+        """
+        headers = dict(headers)
+        if cached_response is not None:
+            if cached_response.etag:
+                headers["If-None-Match"] = cached_response.etag
+            if cached_response.last_modified:
+                headers["If-Modified-Since"] = cached_response.last_modified
+        return headers
+
+
+class MemoryHTTPCache(HTTPCache):
+    """
+    Conditional request cache held in memory, evicting the least recently used responses
+    """
+
+    def __init__(self, max_entries=1024):
+        """
+        Create class
+
+        :param max_entries: Maximum number of responses kept (default: 1024)
+        """
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            cached_response = self._entries.get(key)
+            if cached_response is not None:
+                self._entries.move_to_end(key)
+            return cached_response
+
+    def set(self, key, cached_response):
+        with self._lock:
+            self._entries[key] = cached_response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskHTTPCache(HTTPCache):
+    """
+    Conditional request cache stored as Json files in a directory
+
+    The cache survives restarts and can be shared by processes on the same host. It has
+    no size bound: files are never removed, so clear the directory to reclaim space.
+    """
+
+    def __init__(self, directory):
+        """
+        Create class
+
+        :param directory: Directory holding the cached responses, created if missing
+        """
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(
+            self.directory, hashlib.sha256(key.encode()).hexdigest() + ".json"
+        )
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        return CachedResponse(**data)
+
+    def set(self, key, cached_response):
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "w") as cache_file:
+            json.dump(cached_response._asdict(), cache_file)
+        os.replace(temporary_path, self._path(key))
+
+
+class ResponseCache(object):
+    """
+    Memoizes responses of slow-changing resources in memory
+
+    Entries expire after the time to live of their resource, and the least recently
+    used entries are evicted once the cache is full. Cached calls make no request at all.
+    """
+
+    def __init__(self, max_entries=256, ttl=300, ttls=None, clock=time.monotonic):
+        """
+        Create class
+
+        :param max_entries: Maximum number of responses kept (default: 256)
+        :param ttl: Time to live in seconds of resources without their own (default: 300)
+        :param ttls: Dictionary of time to live in seconds per resource, merged with DEFAULT_TTLS
+        :param clock: Function returning the current time in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Get a cached response that has not expired
+
+        :param key: Cache key of the request
+        :return: CachedResponse or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, _, cached_response = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return cached_response
+
+    def set(self, key, cached_response, resource, url):
+        """
+        Store a response
+
+        :param key: Cache key of the request
+        :param cached_response: CachedResponse
+        :param resource: Name of the resource, which sets the time to live
+        :param url: URL of the request, used for invalidation
+        """
+        expires_at = self.clock() + self.ttls.get(resource, self.ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, resource, url, cached_response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, resource=None):
+        """
+        Drop the cached responses of a resource
+
+        :param resource: Name of the resource, None for all resources
+        """
+        with self._lock:
+            if resource is None:
+                self._entries.clear()
+                return
+            for key, entry in list(self._entries.items()):
+                if entry[1] == resource:
+                    del self._entries[key]
+
+    def invalidate_url(self, url):
+        """
+        Drop the cached responses of a URL and of the URLs below it
+
+        :param url: URL that was changed
+        """
+        prefix = url.rstrip("/") + "/"
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry[2] == url or entry[2].startswith(prefix):
+                    del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,20 +1,111 @@
+import copy
+import hashlib
+import time
+from functools import partial
+from typing import Optional, Union
+
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
 
+from pybuildkite.cache import CachedResponse
+from pybuildkite.decoding import (
+    get_json_decoder,
+    get_projection,
+    iter_json_array,
+    map_items,
+)
+from pybuildkite.query import encode_query_params
+from pybuildkite.retry import RetryPolicy
+from pybuildkite.singleflight import AsyncSingleFlight, SingleFlight
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 class Client(object):
     """
     Internal API Client
     """
 
-    def __init__(self, per_page=100):
+    def __init__(
+        self,
+        per_page=100,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        keep_alive=True,
+        retry_policy=None,
+        rate_limiter=None,
+        http_cache=None,
+        response_cache=None,
+        coalesce_requests=False,
+        json_decoder=None,
+    ):
         """
         Create class
-        
+
+        All requests made by this client go through one pooled HTTP session, so
+        connections to the API are reused instead of being re-established on every call.
+        The session is safe to share between threads.
+
         :param per_page: Number of items per page for API requests (default: 100)
+        :param pool_connections: Number of per-host connection pools to cache (default: 10)
+        :param pool_maxsize: Maximum number of connections kept open per host (default: 10)
+        :param pool_block: Bool to block when all connections of a host are in use
+               instead of opening an extra, non-pooled connection
+        :param keep_alive: Bool to keep connections open between requests
+        :param retry_policy: RetryPolicy for failed requests (default: RetryPolicy())
+        :param rate_limiter: RateLimiter pacing every request sent, None to send them right away
+        :param http_cache: HTTPCache for conditional GET requests, None to disable them
+        :param response_cache: ResponseCache for slow-changing resources, None to disable it
+        :param coalesce_requests: Bool to share one response between identical GET requests in flight
+        :param json_decoder: "orjson", "msgspec", "json" or a decoding function, None for the fastest installed
         """
         self.access_token = ""
         self.per_page = per_page
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.http_cache = http_cache
+        self.response_cache = response_cache
+        self.single_flight: Optional[Union[SingleFlight, AsyncSingleFlight]] = (
+            SingleFlight() if coalesce_requests else None
+        )
+        self.json_decoder = get_json_decoder(json_decoder)
+        self.session = self._build_session()
+
+    def _build_session(self):
+        """
+        Build the pooled HTTP session used for all requests
+
+        :return: requests Session
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self):
+        """
+        Close the pooled HTTP session and all of its connections
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def is_access_token_set(self):
         """
@@ -40,6 +131,9 @@ class Client(object):
         headers=None,
         with_pagination=False,
         as_stream=False,
+        cache_resource=None,
+        fields=None,
+        model=None,
     ):
         """
         Make a request to the API
@@ -49,7 +143,24 @@ class Client(object):
         With no accept header set or if set to "application/json",
         the response will be parsed as Json and returned as a dict.
         With any other accept header, the response will be returned as bytes.
-        With as_stream=True you will get an iterator of bytes chunks instead.
+        With as_stream=True you will get an iterator of bytes chunks instead, or for
+        Json responses an iterator of the items of the top-level array, each decoded as
+        soon as it has arrived. The connection is held until the iterator is exhausted.
+
+        With an http_cache set, Json GET requests are made conditional. When the API answers
+        304 Not Modified, the cached body is returned and must be treated as read-only.
+
+        With a response_cache set, Json GET requests naming a cache_resource are answered
+        from memory until their time to live for that resource expires. Any other request
+        to a cached URL invalidates it.
+
+        With fields set, Json objects only keep the listed fields, such as "number" or
+        "pipeline.slug". Streamed items are reduced as soon as each one is decoded.
+        With a model set, Json objects are returned as instances of that Model class
+        instead of dicts, including the items of streamed and paginated responses.
+
+        With coalesce_requests set, a GET request identical to one already in flight waits
+        for it and returns the same, shared, result instead of making its own request.
 
         :param method: HTTP method to use
         :param url: URL to call
@@ -58,34 +169,62 @@ class Client(object):
         :param headers: Dictionary of headers to use in HTTP request
         :param with_pagination: Bool to return a response with pagination attributes
         :param as_stream: Bool to stream the bytes response
+        :param cache_resource: Name of the resource for the response cache, None to not cache the response
+        :param fields: List of field paths to keep in the parsed Json objects, None to keep all fields
+        :param model: Model class to convert the parsed Json objects to, None to return dicts
         :return: response return as parsed json, bytes or bytes chunks iterator
         """
-        if headers is None:
-            headers = {}
-
-        if self.access_token:
-            headers["Authorization"] = "Bearer {}".format(self.access_token)
-
-        if body:
-            body = self._clean_query_params(body)
-
-        query_params = self._clean_query_params(query_params or {})
-        query_params["per_page"] = str(self.per_page)
-
-        query_params = self._convert_query_params_to_string_for_bytes(query_params)
-        response = requests.request(
+        headers, body, query_string = self._prepare_request(headers, body, query_params)
+        request = partial(
+            self._request,
             method,
             url,
-            headers=headers,
-            params=str.encode(query_params),
-            json=body,
-            stream=as_stream,
+            headers,
+            query_string,
+            body,
+            with_pagination,
+            as_stream,
+            cache_resource,
         )
+        if self.single_flight is not None and method == "GET" and not as_stream:
+            key = self._cache_key(method, url, query_string, headers)
+            result = self.single_flight.do((key, with_pagination), request)
+        else:
+            result = request()
+        if fields is not None or model is not None:
+            result = self._map_items(result, self._item_converter(fields, model))
+        return result
+
+    def _request(
+        self,
+        method,
+        url,
+        headers,
+        query_string,
+        body,
+        with_pagination,
+        as_stream,
+        cache_resource,
+    ):
+        """
+        Make a prepared request to the API
+
+        :return: response return as parsed json, bytes or bytes chunks iterator
+        """
+        if self._is_cacheable(method, headers, as_stream, cache_resource):
+            return self._cached_get(
+                url, headers, query_string, with_pagination, cache_resource
+            )
 
+        response = self._send(method, url, headers, query_string, body, as_stream)
         response.raise_for_status()
+        if self.response_cache is not None and method != "GET":
+            self.response_cache.invalidate_url(url)
 
         if with_pagination:
-            response = self._get_paginated_response(response)
+            response = self._get_paginated_response(
+                response, as_stream, self._accepts_json(headers)
+            )
             return response
         if (
             method == "DELETE"
@@ -93,25 +232,297 @@ class Client(object):
             or response.headers.get("content-type") is None
         ):
             return response.ok
-        if headers.get("Accept") is None or headers.get("Accept") == "application/json":
-            return response.json()
+        if self._accepts_json(headers):
+            if as_stream:
+                return self._iter_json_items(response)
+            return self.json_decoder(response.content)
         elif as_stream:
             return response.iter_content(chunk_size=None, decode_unicode=False)
         else:
             return response.content
 
-    def _get_paginated_response(self, response):
+    def _cached_get(self, url, headers, query_string, with_pagination, cache_resource):
+        """
+        Make a Json GET request through the response cache and the http cache
+
+        :return: response return as parsed json
+        """
+        key = self._cache_key("GET", url, query_string, headers)
+        use_response_cache = self.response_cache is not None and cache_resource
+        if use_response_cache:
+            cached_response = self.response_cache.get(key)
+            if cached_response is not None:
+                return self._cached_result(cached_response, with_pagination)
+
+        if self.http_cache is not None:
+            cached_response = self._get_with_http_cache(key, url, headers, query_string)
+        else:
+            response = self._send("GET", url, headers, query_string, None, False)
+            cached_response = self._read_cacheable_response(response)
+        if not isinstance(cached_response, CachedResponse):
+            return cached_response
+
+        if use_response_cache:
+            self.response_cache.set(key, cached_response, cache_resource, url)
+        return self._cached_result(cached_response, with_pagination)
+
+    def _get_with_http_cache(self, key, url, headers, query_string):
+        """
+        Make a conditional GET request, answering from the http cache on a 304
+
+        :return: CachedResponse, or a bool for responses without content
+        """
+        cached_response = self.http_cache.get(key)
+        request_headers = self.http_cache.add_validators(headers, cached_response)
+        response = self._send("GET", url, request_headers, query_string, None, False)
+
+        if cached_response is not None and response.status_code == 304:
+            self.http_cache.record_hit()
+            return cached_response
+
+        cached_response = self._read_cacheable_response(response)
+        self.http_cache.record_miss()
+        if isinstance(cached_response, CachedResponse) and (
+            cached_response.etag or cached_response.last_modified
+        ):
+            self.http_cache.set(key, cached_response)
+        return cached_response
+
+    def _read_cacheable_response(self, response):
+        """
+        Read a Json response into a CachedResponse
+
+        :param response: requests Response
+        :return: CachedResponse, or a bool for responses without content
+        """
+        response.raise_for_status()
+        if response.status_code == 204 or not response.headers.get("content-type"):
+            return response.ok
+        return CachedResponse(
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            self.json_decoder(response.content),
+            response.headers.get("Link"),
+        )
+
+    def _is_cacheable(self, method, headers, as_stream, cache_resource):
+        """
+        Whether a request goes through the response cache or the http cache
+
+        :return: true or false
+        """
+        return (
+            (
+                self.http_cache is not None
+                or (self.response_cache is not None and cache_resource is not None)
+            )
+            and method == "GET"
+            and not as_stream
+            and self._accepts_json(headers)
+        )
+
+    @staticmethod
+    def _cached_result(cached_response, with_pagination):
+        """
+        Build the result of a request from a cached response
+
+        :param cached_response: CachedResponse
+        :param with_pagination: Bool to return a response with pagination attributes
+        :return: parsed json or Response object
+        """
+        if with_pagination:
+            response_object = Response(cached_response.body)
+            link = cached_response.link
+            return response_object.append_pagination_data(
+                {"Link": link} if link else {}
+            )
+        return cached_response.body
+
+    @staticmethod
+    def _item_converter(fields, model):
+        """
+        Build the function applied to every Json object of a result
+
+        :param fields: List of field paths to keep, or None
+        :param model: Model class, or None
+        :return: Function taking a decoded Json object
+        """
+        if not fields:
+            return model
+        projection = get_projection(fields)
+        if model is None:
+            return projection
+        return lambda item: model(projection(item))
+
+    @staticmethod
+    def _map_items(result, func):
+        """
+        Apply func to the Json objects of a result
+
+        Paginated responses are copied rather than changed, as coalesced requests share them.
+
+        :param result: parsed json, Response object or iterator of items
+        :param func: Function taking a decoded Json object
+        :return: Mapped result
+        """
+        if isinstance(result, Response):
+            response_object = copy.copy(result)
+            response_object.body = map_items(result.body, func)
+            return response_object
+        return map_items(result, func)
+
+    @staticmethod
+    def _cache_key(method, url, query_string, headers):
+        """
+        Key identifying a request in caches
+
+        Every request header is part of the key, so that a request with a Range
+        header, for instance, never shares a response with one without it. The
+        access token is part of the key too, so that responses are never shared
+        between tokens, but only as a hash.
+
+        :return: str
+        """
+        authorization = headers.get("Authorization", "").encode()
+        other_headers = sorted(
+            (name.lower(), value)
+            for name, value in headers.items()
+            if name not in ("Accept", "Authorization")
+        )
+        return "{} {}?{} {} {} {}".format(
+            method,
+            url,
+            query_string,
+            headers.get("Accept", "application/json"),
+            hashlib.sha256(authorization).hexdigest()[:16],
+            "&".join("{}={}".format(name, value) for name, value in other_headers),
+        )
+
+    def invalidate_cache(self, resource=None):
+        """
+        Drop cached responses of a resource from the response cache
+
+        :param resource: Name of the resource, None for all resources
+        """
+        if self.response_cache is not None:
+            self.response_cache.invalidate(resource)
+
+    def _send(self, method, url, headers, query_string, body, as_stream):
+        """
+        Send a request, retrying it as allowed by the retry policy
+
+        :return: requests Response of the last attempt
+        """
+        self.retry_policy.record_request()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=str.encode(query_string),
+                    json=body,
+                    stream=as_stream,
+                )
+            except requests.ConnectionError:
+                if not self.retry_policy.is_retryable(method, attempt):
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+            else:
+                if not self.retry_policy.is_retryable(
+                    method, attempt, response.status_code
+                ):
+                    return response
+                delay = self.retry_policy.get_delay(attempt, response.headers)
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _prepare_request(self, headers, body, query_params):
+        """
+        Add the authorisation header, clean the body and build the query string of a request
+
+        :param headers: Dictionary of headers to use in HTTP request
+        :param body: Body of the request
+        :param query_params: Query parameters to use
+        :return: Tuple of headers, body and query string
+        """
+        if headers is None:
+            headers = {}
+
+        if self.access_token:
+            headers["Authorization"] = "Bearer {}".format(self.access_token)
+
+        if body:
+            body = self._clean_query_params(body)
+
+        query_params = self._clean_query_params(query_params or {})
+        query_params["per_page"] = str(self.per_page)
+
+        query_string = encode_query_params(query_params)
+        return headers, body, query_string
+
+    @staticmethod
+    def _accepts_json(headers):
+        """
+        Whether the response of a request with these headers should be parsed as Json
+
+        :param headers: Dictionary of headers used in the HTTP request
+        :return: true or false
+        """
+        return (
+            headers.get("Accept") is None or headers.get("Accept") == "application/json"
+        )
+
+    def _get_paginated_response(self, response, as_stream=False, as_json=True):
         """
         Return a Response object with pagination data
 
+        :param response: requests Response
+        :param as_stream: Bool to decode the items of the body lazily as they arrive
+        :param as_json: Bool to decode the body as Json rather than return bytes
         :return: Response object
         """
-        response_object = Response(response.json())
+        if not as_json:
+            if as_stream:
+                body = response.iter_content(chunk_size=None, decode_unicode=False)
+            else:
+                body = response.content
+        elif as_stream:
+            body = self._iter_json_items(response)
+        else:
+            body = self.json_decoder(response.content)
+        response_object = Response(body, response.status_code, response.headers)
         response_object.append_pagination_data(response.headers)
         return response_object
 
+    def _iter_json_items(self, response):
+        """
+        Decode the items of a streamed Json array as they arrive
+
+        :param response: requests Response opened with stream=True
+        :return: Generator of items
+        """
+        try:
+            yield from iter_json_array(
+                response.iter_content(chunk_size=STREAM_CHUNK_SIZE), self.json_decoder
+            )
+        finally:
+            response.close()
+
     def get(
-        self, url, query_params=None, headers=None, with_pagination=False, as_stream=False
+        self,
+        url,
+        query_params=None,
+        headers=None,
+        with_pagination=False,
+        as_stream=False,
+        cache_resource=None,
+        fields=None,
+        model=None,
     ):
         """
         Make a GET request to the API
@@ -122,7 +533,10 @@ class Client(object):
         :param query_params: Query parameters to append to URL
         :param headers: Dictionary of headers to use in HTTP request
         :param with_pagination: Bool to return a response with pagination attributes
-        :param as_stream: Bool to stream the response
+        :param as_stream: Bool to stream the response, item by item for Json responses
+        :param cache_resource: Name of the resource for the response cache, None to not cache the response
+        :param fields: List of field paths to keep in the parsed Json objects, None to keep all fields
+        :param model: Model class to convert the parsed Json objects to, None to return dicts
         :return: If headers are set response text is returned, otherwise parsed response is returned
         """
         return self.request(
@@ -132,8 +546,28 @@ class Client(object):
             headers=headers,
             with_pagination=with_pagination,
             as_stream=as_stream,
+            cache_resource=cache_resource,
+            fields=fields,
+            model=model,
         )
 
+    def get_response(self, url, query_params=None, headers=None):
+        """
+        Make a GET request to the API and return the whole response
+
+        Bypasses the caches and request coalescing, for requests whose status code and
+        headers matter, such as range requests.
+
+        :param url: URL to call
+        :param query_params: Query parameters to append to URL
+        :param headers: Dictionary of headers to use in HTTP request
+        :return: Response object with the bytes body, status code and headers
+        """
+        headers, _, query_string = self._prepare_request(headers, None, query_params)
+        response = self._send("GET", url, headers, query_string, None, False)
+        response.raise_for_status()
+        return Response(response.content, response.status_code, response.headers)
+
     def post(self, url, body=None, headers=None, query_params=None):
         """
         Make a POST request to the API
@@ -210,34 +644,16 @@ class Client(object):
         """
         return {key: value for key, value in query_params.items() if value is not None}
 
-    @staticmethod
-    def _convert_query_params_to_string_for_bytes(query_params):
-        """
-        Required to set multiple build states i.e ?state[]=running&state[]=scheduled
-
-        :param query_params: query parameters
-        :return: bytes of query param
-        """
-        query_string = ""
-        for key, value in query_params.items():
-            if query_string != "":
-                query_string += "&"
-            if key == "state":
-                query_string += value
-            elif key == "branch":
-                query_string += value
-            else:
-                query_string += key + "=" + str(value)
-        return query_string
-
 
 class Response:
     """
-    Response object used for pagination requests
+    Response object used for pagination requests, with the status and headers of the response
     """
 
-    def __init__(self, body):
+    def __init__(self, body, status_code=None, headers=None):
         self.body = body
+        self.status_code = status_code
+        self.headers = headers
         self.next_page = None
         self.last_page = None
         self.first_page = None
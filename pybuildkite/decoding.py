@@ -0,0 +1,271 @@
+import json
+import re
+from functools import lru_cache, partial
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+
+def _get_decoders():
+    """
+    Json decoders that are installed, fastest first
+
+    :return: Dictionary of backend name to decoding function
+    """
+    decoders = {}
+    if orjson is not None:
+        decoders["orjson"] = orjson.loads
+    if msgspec is not None:
+        decoders["msgspec"] = msgspec.json.Decoder().decode
+    decoders["json"] = json.loads
+    return decoders
+
+
+DECODERS = _get_decoders()
+
+
+def get_json_decoder(backend=None):
+    """
+    Get a function decoding Json bytes
+
+    :param backend: "orjson", "msgspec" or "json", a decoding function, or None for the fastest installed
+    :return: Function taking bytes and returning the decoded value
+    """
+    if callable(backend):
+        return backend
+    if backend is None:
+        return next(iter(DECODERS.values()))
+    if backend not in DECODERS:
+        raise ValueError(
+            "Json backend {} is not installed, available backends: {}".format(
+                backend, ", ".join(DECODERS)
+            )
+        )
+    return DECODERS[backend]
+
+
+_STRUCTURAL = re.compile(rb'[][{}",]')
+_STRING_END = re.compile(rb'["\\]')
+_WHITESPACE = b" \t\r\n"
+
+
+class JsonArrayParser(object):
+    """
+    Incremental parser splitting a top-level Json array into its items
+
+    Feed it the bytes of a response as they arrive, and it returns every item that is
+    complete so far. Only the bytes of the item being received are kept, so memory
+    stays at about one item whatever the size of the array. A top-level value that is
+    not an array is returned whole by close().
+    """
+
+    def __init__(self, decoder=None):
+        """
+        Create class
+
+        :param decoder: Function decoding the bytes of one item (default: fastest installed)
+        """
+        self.decoder = get_json_decoder(decoder)
+        self._buffer = bytearray()
+        self._position = 0
+        self._item_start = None
+        self._depth = 0
+        self._in_string = False
+        self._is_array = None
+        self._done = False
+
+    def feed(self, data):
+        """
+        Parse the next bytes of the document
+
+        :param data: bytes
+        :return: List of the items completed by these bytes
+        """
+        if self._done:
+            return []
+        self._buffer += data
+        if self._is_array is None:
+            stripped = self._buffer.lstrip(_WHITESPACE)
+            if not stripped:
+                return []
+            self._is_array = stripped[:1] == b"["
+        if not self._is_array:
+            return []
+
+        items = self._scan()
+        if self._item_start:
+            del self._buffer[: self._item_start]
+            self._position -= self._item_start
+            self._item_start = 0
+        return items
+
+    def close(self):
+        """
+        Finish parsing once all bytes have been fed
+
+        :return: List holding the whole document if it was not an array, otherwise empty
+        """
+        if self._is_array is False:
+            return [self.decoder(bytes(self._buffer))]
+        if self._is_array and not self._done:
+            raise ValueError("Incomplete Json array")
+        return []
+
+    def _scan(self):
+        """
+        Move through the buffer, cutting out the items closed at depth 1
+
+        :return: List of decoded items
+        """
+        buffer = self._buffer
+        items = []
+        while not self._done:
+            if self._in_string:
+                match = _STRING_END.search(buffer, self._position)
+                if match is None:
+                    self._position = len(buffer)
+                    break
+                if match.group() == b"\\":
+                    if match.end() >= len(buffer):
+                        self._position = match.start()
+                        break
+                    self._position = match.end() + 1
+                    continue
+                self._in_string = False
+                self._position = match.end()
+                continue
+
+            match = _STRUCTURAL.search(buffer, self._position)
+            if match is None:
+                self._position = len(buffer)
+                break
+            self._position = match.end()
+            token = match.group()
+            if token == b'"':
+                self._in_string = True
+            elif token in b"[{":
+                self._depth += 1
+                if self._depth == 1:
+                    self._item_start = self._position
+            elif self._depth == 1 and token in b",]":
+                item = bytes(buffer[self._item_start : match.start()]).strip()
+                if item:
+                    items.append(self.decoder(item))
+                self._item_start = self._position
+                if token == b"]":
+                    self._depth = 0
+                    self._done = True
+            elif token in b"]}":
+                self._depth -= 1
+        return items
+
+
+def iter_json_array(chunks, decoder=None):
+    """
+    Lazily decode the items of a Json array from an iterable of bytes chunks
+
+    :param chunks: Iterable of bytes chunks of the document
+    :param decoder: Function decoding the bytes of one item (default: fastest installed)
+    :return: Generator of items, or of the whole document if it is not an array
+    """
+    parser = JsonArrayParser(decoder)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+@lru_cache(maxsize=64)
+def _compile_projection(fields):
+    """
+    Turn field paths into a tree of the keys to keep
+
+    :param fields: Tuple of field paths such as "pipeline.slug"
+    :return: Dictionary of key to sub-tree, None for keys kept whole
+    """
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        *parents, leaf = field.split(".")
+        for key in parents:
+            child = node.get(key, {})
+            if child is None:
+                break
+            node = node.setdefault(key, child)
+        else:
+            node[leaf] = None
+    return tree
+
+
+def _project(value, tree):
+    if isinstance(value, dict):
+        return {
+            key: value[key] if subtree is None else _project(value[key], subtree)
+            for key, subtree in tree.items()
+            if key in value
+        }
+    if isinstance(value, list):
+        return [_project(item, tree) for item in value]
+    return value
+
+
+def get_projection(fields):
+    """
+    Get a function keeping only some fields of a decoded Json object
+
+    Paths go through nested objects and lists with dots, so "jobs.state" keeps the
+    state of every job of a build. The returned objects are new, the input is not changed.
+
+    :param fields: List of field paths
+    :return: Function taking and returning a decoded Json object
+    """
+    return partial(_project, tree=_compile_projection(tuple(fields)))
+
+
+def map_items(value, func):
+    """
+    Apply func to the Json objects of a decoded body
+
+    Dicts are passed to func, lists and iterators of streamed items have func applied
+    to each item, lazily for iterators.
+
+    :param value: Decoded body of a response
+    :param func: Function taking a decoded Json object
+    :return: Mapped body, or value itself when it holds no Json objects
+    """
+    if isinstance(value, dict):
+        return func(value)
+    if isinstance(value, list):
+        return [func(item) for item in value]
+    if hasattr(value, "__anext__"):
+        return _amap_items(value, func)
+    if hasattr(value, "__next__"):
+        return _map_items(value, func)
+    return value
+
+
+def _map_items(items, func):
+    try:
+        for item in items:
+            yield func(item)
+    finally:
+        close = getattr(items, "close", None)
+        if close is not None:
+            close()
+
+
+async def _amap_items(items, func):
+    try:
+        async for item in items:
+            yield func(item)
+    finally:
+        aclose = getattr(items, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -1,3 +1,5 @@
+import inspect
+from functools import wraps
 from typing import Callable
 from pybuildkite.exceptions import NoAcccessTokenException
 
@@ -28,3 +30,44 @@ def requires_token(func: Callable):
             return func(self, *args, **kwargs)
 
     return wrapper
+
+
+def requires_sync_client(func: Callable):
+    """
+    This annotation protects helpers that read responses themselves, such as iterators over pages.
+
+    It will cause them to raise TypeError when called with an AsyncClient, whose calls
+    return awaitables rather than responses.
+
+    :return: Function decorated with the protection
+    """
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        """
+        Call func or raise TypeError if the client is asynchronous
+
+        :param self:
+        :param args: Optional
+        :param kwargs: Optional
+
+        :raises TypeError: If the client is an AsyncClient
+        :return:
+        """
+        if is_async_client(self.client):
+            raise TypeError(
+                "{} needs the synchronous Buildkite client".format(func.__name__)
+            )
+        return func(self, *args, **kwargs)
+
+    return wrapper
+
+
+def is_async_client(client):
+    """
+    Whether the requests of a client return awaitables
+
+    :param client: API Client
+    :return: true or false
+    """
+    return inspect.iscoroutinefunction(client.get)
@@ -1,4 +1,8 @@
+from functools import partial
+
 from pybuildkite.client import Client
+from pybuildkite.decorators import requires_sync_client
+from pybuildkite.pagination import iter_items
 
 
 class Emojis(Client):
@@ -30,4 +34,23 @@ class Emojis(Client):
             self.path.format(organization),
             query_params=query_parms,
             with_pagination=with_pagination,
+            cache_resource="emojis",
+        )
+
+    @requires_sync_client
+    def iter_emojis(self, organization, max_items=None, workers=None, ordered=True):
+        """
+        Lazily iterate over all the emojis for a given organization, one page at a time.
+
+        :param organization: organization slug
+        :param max_items: Maximum number of emojis to return, None for all of them
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        :param ordered: Bool to keep page order when fetching concurrently
+        :return: Generator of emojis
+        """
+        return iter_items(
+            partial(self.list_emojis, organization, with_pagination=True),
+            max_items,
+            workers,
+            ordered,
         )
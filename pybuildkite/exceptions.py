@@ -28,3 +28,19 @@ class BuildStateNotAList(Exception):
     """
 
     pass
+
+
+class BuildWatchTimeout(Exception):
+    """
+    Raised when watched builds did not finish before the timeout
+    """
+
+    pass
+
+
+class WebhookVerificationError(Exception):
+    """
+    Raised when a webhook request has no valid token or signature
+    """
+
+    pass
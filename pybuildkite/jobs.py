@@ -2,6 +2,7 @@ from enum import Enum
 from posixpath import join as urljoin
 
 from pybuildkite.client import Client
+from pybuildkite.decorators import is_async_client, requires_sync_client
 
 
 class LogFormat(Enum):
@@ -17,39 +18,232 @@ class LogFormat(Enum):
         return self.value
 
 
+class JobState(Enum):
+    """
+    Valid job states
+    """
+
+    PENDING = "pending"
+    WAITING = "waiting"
+    WAITING_FAILED = "waiting_failed"
+    BLOCKED = "blocked"
+    BLOCKED_FAILED = "blocked_failed"
+    UNBLOCKED = "unblocked"
+    UNBLOCKED_FAILED = "unblocked_failed"
+    LIMITING = "limiting"
+    LIMITED = "limited"
+    SCHEDULED = "scheduled"
+    ASSIGNED = "assigned"
+    ACCEPTED = "accepted"
+    RUNNING = "running"
+    PASSED = "passed"
+    FAILED = "failed"
+    CANCELING = "canceling"
+    CANCELED = "canceled"
+    TIMING_OUT = "timing_out"
+    TIMED_OUT = "timed_out"
+    SKIPPED = "skipped"
+    BROKEN = "broken"
+    EXPIRED = "expired"
+    FINISHED = "finished"
+    NOT_RUN = "not_run"
+
+
+TERMINAL_JOB_STATES = [
+    JobState.PASSED,
+    JobState.FAILED,
+    JobState.CANCELED,
+    JobState.TIMED_OUT,
+    JobState.SKIPPED,
+    JobState.BROKEN,
+    JobState.EXPIRED,
+    JobState.FINISHED,
+    JobState.NOT_RUN,
+]
+
+TERMINAL_JOB_STATE_VALUES = frozenset(state.value for state in TERMINAL_JOB_STATES)
+
+
 class Jobs(Client):
     """
     Job operations for the Buildkite API
     """
 
-    def __init__(self, client, base_url):
+    def __init__(self, client, base_url, log_cache=None):
         """
         Construct the class
 
         :param client: API Client
         :param base_url: Base Url
+        :param log_cache: LogCache for the text and HTML logs of finished jobs, None to disable it
         """
         self.client = client
+        self.log_cache = log_cache
         self.path = urljoin(base_url, "organizations/{}/pipelines/{}/builds/{}/jobs/{}")
+        self.build_path = urljoin(base_url, "organizations/{}/pipelines/{}/builds/{}")
 
     def get_job_log(
-        self, organization, pipeline, build, job, log_format=LogFormat.HTML
+        self,
+        organization,
+        pipeline,
+        build,
+        job,
+        log_format=LogFormat.HTML,
+        as_stream=False,
+        write_to=None,
+        normaliser=None,
+        job_state=None,
     ):
         """
         Get a job’s log output
 
+        With as_stream=True you get an iterator of bytes chunks as they arrive instead.
+
+        With a log cache, text and HTML logs are read from the cache when they are in it.
+        Otherwise the state of the job is checked first, unless job_state is given, and the
+        log is copied into the cache as it is read if the job has finished.
+
         :param organization: Organization slug
         :param pipeline: Pipeline slug
         :param build: Build number
         :param job: Job id
         :param log_format: Mime type to return log in
-        :return: Job log output
+        :param as_stream: Bool to stream a text or HTML log output
+        :param write_to: Path or binary file object to copy a text or HTML log to, chunk by chunk,
+               without holding it in memory
+        :param normaliser: LogNormaliser cleaning a text log as it is read, None to return it as is
+        :param job_state: State of the job when already known, None to look it up before caching its log
+        :return: Job log output, or the number of bytes written with write_to
+        :raises ValueError: If a JSON log is streamed, written or normalised
+        :raises TypeError: If the log would be written, normalised or cached with an AsyncClient
         """
+        from pybuildkite.logs import write_chunks
+
+        if str(log_format) == str(LogFormat.JSON) and (
+            as_stream or write_to is not None or normaliser is not None
+        ):
+            raise ValueError(
+                "JSON logs are parsed whole, use the text or HTML format to stream, write or normalise them"
+            )
+        if is_async_client(self.client) and (
+            write_to is not None or normaliser is not None or self.log_cache is not None
+        ):
+            raise TypeError(
+                "Writing, normalising or caching logs needs the synchronous Buildkite client"
+            )
         header = {"Accept": str(log_format)}
-        return self.client.get(
-            self.path.format(organization, pipeline, build, job) + "/log",
-            headers=header,
+        url = self.path.format(organization, pipeline, build, job) + "/log"
+        key = (organization, pipeline, build, job, str(log_format))
+        chunks = None
+        if self.log_cache is not None and str(log_format) != str(LogFormat.JSON):
+            chunks = self.log_cache.iter_chunks(*key)
+            if isinstance(job_state, JobState):
+                job_state = job_state.value
+            if chunks is None and job_state is None:
+                job_state = self.get_job_state(organization, pipeline, build, job)
+            if chunks is None and job_state in TERMINAL_JOB_STATE_VALUES:
+                chunks = self.log_cache.store(
+                    *key, self.client.get(url, headers=header, as_stream=True)
+                )
+
+        if chunks is None:
+            if write_to is None and normaliser is None:
+                return self.client.get(url, headers=header, as_stream=as_stream)
+            chunks = self.client.get(url, headers=header, as_stream=True)
+        if normaliser is not None:
+            chunks = normaliser.normalise(chunks)
+        if write_to is not None:
+            return write_chunks(chunks, write_to)
+        if as_stream:
+            return iter(chunks)
+        return b"".join(chunks)
+
+    @requires_sync_client
+    def iter_job_log(
+        self,
+        organization,
+        pipeline,
+        build,
+        job,
+        log_format=LogFormat.TEXT,
+        lines=False,
+        normaliser=None,
+        job_state=None,
+    ):
+        """
+        Iterate over a job’s log output as it is received
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug
+        :param build: Build number
+        :param job: Job id
+        :param log_format: Mime type to return log in (default: text)
+        :param lines: Bool to yield whole lines, ending with b"\\n", instead of chunks as they arrive
+        :param normaliser: LogNormaliser cleaning the log as it is read, None to return it as is
+        :param job_state: State of the job when already known, None to look it up before caching its log
+        :return: Generator of bytes chunks or lines, or of LogLine tuples with lines and a
+                 normaliser extracting timestamps
+        """
+        from pybuildkite.logs import iter_lines
+
+        chunks = self.get_job_log(
+            organization,
+            pipeline,
+            build,
+            job,
+            log_format,
+            as_stream=True,
+            job_state=job_state,
         )
+        if normaliser is not None:
+            return (
+                normaliser.iter_lines(chunks) if lines else normaliser.normalise(chunks)
+            )
+        return iter_lines(chunks) if lines else iter(chunks)
+
+    @requires_sync_client
+    def follow_job_log(
+        self, organization, pipeline, build, job, lines=False, **follower_options
+    ):
+        """
+        Follow a running job’s log output, downloading only what was added since the last poll
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug
+        :param build: Build number
+        :param job: Job id
+        :param lines: Bool to yield whole lines, ending with b"\\n", instead of the new bytes of each poll
+        :param follower_options: Any option accepted by LogFollower, such as offset or max_interval
+        :return: Generator of bytes chunks or lines, ending once the job has finished
+        """
+        from pybuildkite.logs import LogFollower, iter_lines
+
+        follower = LogFollower(
+            self, organization, pipeline, build, job, **follower_options
+        )
+        chunks = follower.follow()
+        return iter_lines(chunks) if lines else chunks
+
+    @requires_sync_client
+    def get_job_state(self, organization, pipeline, build, job):
+        """
+        Get the state of a job, as listed in its build
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug
+        :param build: Build number
+        :param job: Job id
+        :return: State of the job, None if the build has no such job
+        """
+        jobs = self.client.get(
+            self.build_path.format(organization, pipeline, build),
+            query_params={"include_retried_jobs": True},
+            fields=["jobs.id", "jobs.state"],
+        )["jobs"]
+        for build_job in jobs:
+            if build_job.get("id") == job:
+                return build_job.get("state")
+        return None
 
     def get_job_environment_variables(self, organization, pipeline, build, job):
         """
@@ -98,7 +292,7 @@ class Jobs(Client):
 
     def delete_job_log(self, organization, pipeline, build, job):
         """
-        Delete a job’s log output
+        Delete a job’s log output, and its copies in the log cache
         :param organization: organization slug
         :param pipeline: pipeline slug
         :param build: Build number
@@ -106,6 +300,9 @@ class Jobs(Client):
         :return: success response 204 No content
         """
         log = "/log"
-        return self.client.delete(
+        response = self.client.delete(
             self.path.format(organization, pipeline, build, job) + log
         )
+        if self.log_cache is not None:
+            self.log_cache.remove(organization, pipeline, build, job)
+        return response
@@ -0,0 +1,665 @@
+import gzip
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from collections import deque, namedtuple
+from contextlib import ExitStack
+from typing import Deque, List, Optional, Pattern
+
+import requests
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore[assignment]
+
+from pybuildkite.jobs import TERMINAL_JOB_STATE_VALUES, LogFormat
+from pybuildkite.pagination import map_concurrently
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-\d+/(?:\d+|\*)")
+
+RANGE_NOT_SATISFIABLE = 416
+
+CACHE_CHUNK_SIZE = 64 * 1024
+
+_ZSTD_ERRORS = (zstandard.ZstdError,) if zstandard is not None else ()
+
+_CSI = rb"\[[0-?]*[ -/]*[@-~]"
+_OSC = rb"\][^\x07\x1b\n]*(?:\x07|\x1b\\)"
+_APC = rb"_[^\x07\n]*\x07"
+_NF = rb"[ -/]+[0-~]"
+_ANSI = re.compile(rb"\x1b(?:" + b"|".join([_CSI, _OSC, _NF, rb"[@-Z\\-^]"]) + b")")
+_ANSI_AND_MARKERS = re.compile(
+    rb"\x1b(?:" + b"|".join([_CSI, _OSC, _APC, _NF, rb"[@-Z\\-_]"]) + b")"
+)
+_MARKER = re.compile(rb"\x1b_bk;t=(\d+)\x07")
+_MARKED_LINE = re.compile(rb"(?:\x1b_bk;t=(\d+)\x07)?([^\n]*\n|[^\n]+)")
+
+LogLine = namedtuple("LogLine", ["timestamp", "line"])
+
+LogMatch = namedtuple(
+    "LogMatch", ["build", "job", "line_number", "line", "before", "after"]
+)
+
+SEARCH_FIELDS = [
+    "number",
+    "branch",
+    "commit",
+    "state",
+    "web_url",
+    "pipeline.slug",
+    "jobs.id",
+    "jobs.type",
+    "jobs.name",
+    "jobs.step_key",
+    "jobs.state",
+]
+
+
+def iter_lines(chunks):
+    """
+    Split a stream of bytes chunks into lines
+
+    Lines keep their b"\\n" ending, and a last line without one is returned too. A line
+    spread over many chunks is joined once, when its end arrives.
+
+    :param chunks: Iterable of bytes chunks
+    :return: Generator of bytes lines
+    """
+    parts = []
+    for chunk in chunks:
+        start = 0
+        end = chunk.find(b"\n")
+        while end != -1:
+            parts.append(chunk[start : end + 1])
+            yield b"".join(parts)
+            parts = []
+            start = end + 1
+            end = chunk.find(b"\n", start)
+        if start < len(chunk):
+            parts.append(chunk[start:])
+    if parts:
+        yield b"".join(parts)
+
+
+def write_chunks(chunks, write_to):
+    """
+    Copy a stream of bytes chunks to a file, one chunk at a time
+
+    :param chunks: Iterable of bytes chunks
+    :param write_to: Path of the file, or a binary file object
+    :return: Number of bytes written
+    """
+    if not hasattr(write_to, "write"):
+        with open(write_to, "wb") as file:
+            return write_chunks(chunks, file)
+    written = 0
+    for chunk in chunks:
+        write_to.write(chunk)
+        written += len(chunk)
+    return written
+
+
+class LogFollower(object):
+    """
+    Follows the log of a running job, downloading only the bytes added since the last poll
+
+    Every poll asks for the log from the number of bytes already seen with a Range header.
+    When the server ignores it and sends the whole log again, the bytes already seen are
+    dropped locally, so only new bytes are ever returned. The state of the job is only
+    looked up when a poll brings no new bytes, and once the job has finished the rest of
+    the log is read and following stops.
+    """
+
+    def __init__(
+        self,
+        jobs,
+        organization,
+        pipeline,
+        build,
+        job,
+        offset=0,
+        min_interval=1,
+        max_interval=10,
+        backoff=1.5,
+        sleep=time.sleep,
+    ):
+        """
+        Create class
+
+        :param jobs: Jobs resource used to fetch the log and the job state
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug
+        :param build: Build number
+        :param job: Job id
+        :param offset: Number of bytes of the log already seen, to resume following (default: 0)
+        :param min_interval: Seconds between polls while the log grows (default: 1)
+        :param max_interval: Maximum seconds between polls while the log does not grow (default: 10)
+        :param backoff: Factor the interval grows by after a poll without new bytes (default: 1.5)
+        :param sleep: Function sleeping for a number of seconds
+        """
+        self.jobs = jobs
+        self.organization = organization
+        self.pipeline = pipeline
+        self.build = build
+        self.job = job
+        self.offset = offset
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.sleep = sleep
+        self.interval = min_interval
+        self.finished = False
+        self.bytes_received = 0
+
+    def poll(self):
+        """
+        Fetch the bytes added to the log since the previous poll
+
+        :return: bytes, empty when the log did not grow
+        """
+        if self.finished:
+            return b""
+        data = self._fetch()
+        if not data:
+            state = self.jobs.get_job_state(
+                self.organization, self.pipeline, self.build, self.job
+            )
+            if state is None or state in TERMINAL_JOB_STATE_VALUES:
+                data = self._fetch()
+                self.finished = True
+        return data
+
+    def follow(self):
+        """
+        Poll until the job has finished
+
+        :return: Generator of the bytes added to the log, poll after poll
+        """
+        while True:
+            data = self.poll()
+            if data:
+                self.interval = self.min_interval
+                yield data
+            else:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+            if self.finished:
+                return
+            self.sleep(self.interval)
+
+    def _fetch(self):
+        """
+        Download the log from the current offset
+
+        :return: New bytes of the log
+        """
+        headers = {"Accept": str(LogFormat.TEXT)}
+        if self.offset:
+            headers["Range"] = "bytes={}-".format(self.offset)
+        try:
+            response = self.jobs.client.get_response(
+                self.jobs.path.format(
+                    self.organization, self.pipeline, self.build, self.job
+                )
+                + "/log",
+                headers=headers,
+            )
+        except requests.HTTPError as error:
+            if (
+                error.response is not None
+                and error.response.status_code == RANGE_NOT_SATISFIABLE
+            ):
+                return b""
+            raise
+
+        body = response.body
+        self.bytes_received += len(body)
+        start = 0
+        if response.status_code == 206:
+            match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+            if match is not None:
+                start = int(match.group(1))
+        data = body[max(0, self.offset - start) :]
+        self.offset += len(data)
+        return data
+
+
+class LogCache(object):
+    """
+    Cache of the logs of finished jobs, stored compressed in a directory
+
+    Logs are compressed with zstd when zstandard is installed, otherwise with gzip, and
+    decompressed chunk by chunk from a memory map of the file when read back. Once the
+    files take more than max_size bytes, the least recently used ones are removed, reads
+    counting as uses. Only logs of jobs in a terminal state are stored, since they never
+    change.
+    """
+
+    def __init__(self, directory, max_size=1024**3, compression=None, level=None):
+        """
+        Create class
+
+        :param directory: Directory holding the cached logs, created if missing
+        :param max_size: Maximum number of compressed bytes kept (default: 1 GiB)
+        :param compression: "zstd" or "gzip", None for zstd when zstandard is installed
+        :param level: Compression level, None for the default of the codec
+        """
+        if compression is None:
+            compression = "zstd" if zstandard is not None else "gzip"
+        if compression not in ("zstd", "gzip"):
+            raise ValueError("Unknown compression {}".format(compression))
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        self.directory = directory
+        self.max_size = max_size
+        self.compression = compression
+        self.level = level
+        self.extension = ".log.zst" if compression == "zstd" else ".log.gz"
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, organization, pipeline, build, job, log_format=LogFormat.TEXT):
+        """
+        Get a cached log
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug
+        :param build: Build number
+        :param job: Job id
+        :param log_format: Mime type of the log
+        :return: bytes, or None if the log is not cached
+        """
+        chunks = self.iter_chunks(organization, pipeline, build, job, log_format)
+        return None if chunks is None else b"".join(chunks)
+
+    def iter_chunks(
+        self,
+        organization,
+        pipeline,
+        build,
+        job,
+        log_format=LogFormat.TEXT,
+        chunk_size=CACHE_CHUNK_SIZE,
+    ):
+        """
+        Read a cached log chunk by chunk, decompressing it from a memory map of the file
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug
+        :param build: Build number
+        :param job: Job id
+        :param log_format: Mime type of the log
+        :param chunk_size: Number of decompressed bytes per chunk (default: 64 KiB)
+        :return: Generator of bytes chunks, or None if the log is not cached
+        """
+        path = self._path(organization, pipeline, build, job, log_format)
+        stack = ExitStack()
+        try:
+            cache_file = stack.enter_context(open(path, "rb"))
+            data = stack.enter_context(
+                mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+            )
+            reader = stack.enter_context(self._decompressor(data))
+            chunk = reader.read(chunk_size)
+            os.utime(path)
+        except (OSError, EOFError, ValueError, zlib.error) + _ZSTD_ERRORS:
+            stack.close()
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return self._read_chunks(stack, reader, chunk, chunk_size)
+
+    @staticmethod
+    def _read_chunks(stack, reader, chunk, chunk_size):
+        """
+        Yield the chunks of a decompressing reader, closing it and its file at the end
+
+        :return: Generator of bytes chunks
+        """
+        with stack:
+            while chunk:
+                yield chunk
+                chunk = reader.read(chunk_size)
+
+    def store(self, organization, pipeline, build, job, log_format, chunks):
+        """
+        Copy a log into the cache while it is being read
+
+        The log is compressed chunk by chunk into a temporary file, which becomes the
+        cache entry only once every chunk has gone through.
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug
+        :param build: Build number
+        :param job: Job id
+        :param log_format: Mime type of the log
+        :param chunks: Iterable of bytes chunks of the log
+        :return: Generator of the same chunks
+        """
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        complete = False
+        try:
+            with os.fdopen(fd, "wb") as cache_file:
+                writer = self._compressor(cache_file)
+                for chunk in chunks:
+                    writer.write(chunk)
+                    yield chunk
+                writer.close()
+            complete = True
+        finally:
+            if complete:
+                os.replace(
+                    temporary_path,
+                    self._path(organization, pipeline, build, job, log_format),
+                )
+                self._evict()
+            else:
+                os.remove(temporary_path)
+
+    def remove(self, organization, pipeline, build, job, log_format=None):
+        """
+        Remove a cached log, for instance once it has been deleted through the API
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug
+        :param build: Build number
+        :param job: Job id
+        :param log_format: Mime type of the log, None to remove the log in every format
+        """
+        log_formats = list(LogFormat) if log_format is None else [log_format]
+        for each_format in log_formats:
+            try:
+                os.remove(self._path(organization, pipeline, build, job, each_format))
+            except FileNotFoundError:
+                pass
+
+    @property
+    def size(self):
+        """
+        Number of compressed bytes in the cache
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def __len__(self):
+        return len(self._entries())
+
+    def clear(self):
+        """
+        Remove every cached log
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _path(self, organization, pipeline, build, job, log_format):
+        key = "/".join(
+            str(part) for part in (organization, pipeline, build, job, log_format)
+        )
+        return os.path.join(
+            self.directory, hashlib.sha256(key.encode()).hexdigest() + self.extension
+        )
+
+    def _entries(self):
+        """
+        List the cached logs
+
+        :return: List of (mtime, size, path) tuples
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.extension):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        """
+        Remove the least recently used logs until the cache fits in max_size
+        """
+        with self._lock:
+            entries = sorted(self._entries())
+            size = sum(entry[1] for entry in entries)
+            for _, entry_size, path in entries:
+                if size <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                size -= entry_size
+
+    def _compressor(self, cache_file):
+        if self.compression == "zstd":
+            compressor = zstandard.ZstdCompressor(
+                level=3 if self.level is None else self.level
+            )
+            return compressor.stream_writer(cache_file, closefd=False)
+        return gzip.GzipFile(
+            fileobj=cache_file,
+            mode="wb",
+            compresslevel=6 if self.level is None else self.level,
+        )
+
+    def _decompressor(self, data):
+        if self.compression == "zstd":
+            return zstandard.ZstdDecompressor().stream_reader(data)
+        return gzip.GzipFile(fileobj=data, mode="rb")
+
+
+class LogSearch(object):
+    """
+    Searches the logs of the jobs of many builds for a regular expression
+
+    Logs are downloaded concurrently and matched line by line as they arrive, so no
+    log is ever held whole in memory. Matches are returned as soon as the log of their
+    job has been searched, and the search stops early once max_hits matches are found.
+    """
+
+    def __init__(self, builds, jobs, workers=8, context=0, max_hits=None):
+        """
+        Create class
+
+        :param builds: Builds resource used to find the builds to search
+        :param jobs: Jobs resource used to download the logs, with its log cache if any
+        :param workers: Number of logs downloaded concurrently (default: 8)
+        :param context: Number of lines kept before and after each matching line (default: 0)
+        :param max_hits: Number of matches to stop after, None to search every log
+        """
+        self.builds = builds
+        self.jobs = jobs
+        self.workers = workers
+        self.context = context
+        self.max_hits = max_hits
+        self.errors = []
+
+    def search(self, organization, pattern, pipeline=None, **filters):
+        """
+        Search the logs of the builds matching the filters
+
+        Logs that cannot be downloaded are skipped, with the job and the error added to errors.
+
+        :param organization: Organization slug
+        :param pattern: Regular expression, as a str or a compiled pattern
+        :param pipeline: Pipeline slug, None for builds of all the organization's pipelines
+        :param filters: Any of the filters accepted by list_all_for_org or list_all_for_pipeline,
+               such as branch, states, created_from or created_to
+        :return: Generator of LogMatch, in the order their logs were searched
+        """
+        regex = re.compile(pattern)
+        filters.setdefault("fields", SEARCH_FIELDS)
+        if pipeline is None:
+            builds = self.builds.iter_all_for_org(organization, **filters)
+        else:
+            builds = self.builds.iter_all_for_pipeline(
+                organization, pipeline, **filters
+            )
+        jobs = (
+            (build, job)
+            for build in builds
+            for job in build.get("jobs") or []
+            if job.get("type", "script") == "script"
+        )
+        stop = threading.Event()
+        hits = [0]
+        lock = threading.Lock()
+
+        def search_job(build_and_job):
+            build, job = build_and_job
+            try:
+                lines = self.jobs.iter_job_log(
+                    organization,
+                    pipeline or build["pipeline"]["slug"],
+                    build["number"],
+                    job["id"],
+                    lines=True,
+                    job_state=job.get("state"),
+                )
+                return list(
+                    self._search_lines(build, job, lines, regex, stop, hits, lock)
+                )
+            except requests.RequestException as error:
+                self.errors.append((build, job, error))
+                return []
+
+        searches = map_concurrently(search_job, jobs, self.workers, ordered=False)
+        try:
+            found = 0
+            for matches in searches:
+                for match in matches:
+                    yield match
+                    found += 1
+                    if self.max_hits is not None and found >= self.max_hits:
+                        return
+        finally:
+            stop.set()
+            searches.close()
+
+    def _search_lines(self, build, job, lines, regex, stop, hits, lock):
+        """
+        Match the lines of one log, keeping the context of every match
+
+        :return: Generator of LogMatch
+        """
+        before: Deque[str] = deque(maxlen=self.context)
+        waiting: List[LogMatch] = []
+        for line_number, line in enumerate(lines, 1):
+            if stop.is_set() and not waiting:
+                break
+            text = line.decode("utf-8", "replace").rstrip("\r\n")
+            for match in waiting:
+                match.after.append(text)
+            while waiting and len(waiting[0].after) >= self.context:
+                yield waiting.pop(0)
+            if regex.search(text):
+                with lock:
+                    hits[0] += 1
+                    if self.max_hits is not None and hits[0] >= self.max_hits:
+                        stop.set()
+                match = LogMatch(build, job, line_number, text, list(before), [])
+                if self.context:
+                    waiting.append(match)
+                else:
+                    yield match
+            before.append(text)
+        yield from waiting
+
+
+class LogNormaliser(object):
+    """
+    Cleans text logs chunk by chunk, removing ANSI escapes and Buildkite timestamp markers
+
+    Buildkite text logs start lines with `\\x1b_bk;t=<milliseconds>\\x07` markers and colour
+    them with ANSI escapes. Chunks are cut after their last complete line, and each run of
+    complete lines is cleaned with a single regular expression substitution, so the log is
+    never decoded and only a partial last line is ever held back.
+    """
+
+    def __init__(self, strip_ansi=True, timestamps="strip"):
+        """
+        Create class
+
+        :param strip_ansi: Bool to remove colours and other ANSI escapes (default: true)
+        :param timestamps: "strip" to remove timestamp markers, "keep" to leave them in,
+               "extract" to return them with each line from iter_lines (default: "strip")
+        """
+        if timestamps not in ("strip", "keep", "extract"):
+            raise ValueError("Unknown timestamps mode {}".format(timestamps))
+        self.strip_ansi = strip_ansi
+        self.timestamps = timestamps
+        self._pattern: Optional[Pattern[bytes]]
+        if strip_ansi and timestamps == "keep":
+            self._pattern = _ANSI
+        elif strip_ansi:
+            self._pattern = _ANSI_AND_MARKERS
+        elif timestamps == "keep":
+            self._pattern = None
+        else:
+            self._pattern = _MARKER
+
+    def normalise(self, chunks):
+        """
+        Clean a stream of log chunks
+
+        :param chunks: Iterable of bytes chunks
+        :return: Generator of cleaned bytes chunks, each ending a line but the last
+        """
+        for block in self._blocks(chunks):
+            if self._pattern is not None:
+                block = self._pattern.sub(b"", block)
+            if block:
+                yield block
+
+    def iter_lines(self, chunks):
+        """
+        Clean a stream of log chunks, line by line
+
+        :param chunks: Iterable of bytes chunks
+        :return: Generator of bytes lines ending with b"\\n", or of LogLine tuples with the
+                 timestamp of the line in milliseconds, None if it has none, when timestamps
+                 are extracted
+        """
+        if self.timestamps != "extract":
+            yield from iter_lines(self.normalise(chunks))
+            return
+        for block in self._blocks(chunks):
+            if self.strip_ansi:
+                block = _ANSI.sub(b"", block)
+            for match in _MARKED_LINE.finditer(block):
+                timestamp, line = match.groups()
+                if b"\x1b_" in line:
+                    line = _MARKER.sub(b"", line)
+                yield LogLine(int(timestamp) if timestamp else None, line)
+
+    @staticmethod
+    def _blocks(chunks):
+        """
+        Regroup chunks into runs of complete lines
+
+        :param chunks: Iterable of bytes chunks
+        :return: Generator of bytes, each ending with b"\\n" but the last
+        """
+        pending = []
+        for chunk in chunks:
+            end = chunk.rfind(b"\n") + 1
+            if not end:
+                pending.append(chunk)
+                continue
+            pending.append(chunk[:end])
+            yield b"".join(pending)
+            pending = [chunk[end:]] if end < len(chunk) else []
+        if pending:
+            yield b"".join(pending)
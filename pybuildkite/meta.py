@@ -24,4 +24,4 @@ class Meta(Client):
 
         :return: Returns meta information
         """
-        return self.client.get(self.path)
+        return self.client.get(self.path, cache_resource="meta")
@@ -0,0 +1,331 @@
+import datetime
+import json
+import sqlite3
+from itertools import islice
+
+from pybuildkite.builds import ACTIVE_STATES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pipelines (
+    organization TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    id TEXT,
+    name TEXT,
+    repository TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (organization, slug)
+);
+CREATE TABLE IF NOT EXISTS builds (
+    id TEXT PRIMARY KEY,
+    organization TEXT NOT NULL,
+    pipeline TEXT,
+    number INTEGER,
+    state TEXT,
+    branch TEXT,
+    commit_sha TEXT,
+    message TEXT,
+    created_at TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS builds_by_created_at ON builds (organization, created_at);
+CREATE INDEX IF NOT EXISTS builds_by_branch ON builds (organization, branch, created_at);
+CREATE INDEX IF NOT EXISTS builds_by_commit ON builds (commit_sha);
+CREATE INDEX IF NOT EXISTS builds_by_state ON builds (organization, state);
+CREATE INDEX IF NOT EXISTS builds_by_pipeline ON builds (organization, pipeline, number);
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    build_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    step_key TEXT,
+    state TEXT,
+    exit_status INTEGER,
+    created_at TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_build ON jobs (build_id, position);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state);
+CREATE TABLE IF NOT EXISTS sync_state (
+    organization TEXT PRIMARY KEY,
+    created_high_water TEXT,
+    last_sync TEXT
+);
+"""
+
+
+class BuildMirror(object):
+    """
+    Local SQLite mirror of an organization's builds, jobs and pipelines
+
+    The first sync downloads the builds created since a given date. Every later sync only asks
+    the API for builds created after the newest mirrored build, builds finished since the
+    previous sync and builds that are still active, and upserts them. Queries then run
+    against indexed local tables instead of the network.
+    """
+
+    def __init__(self, builds, path, organization, overlap=60, workers=None):
+        """
+        Create class
+
+        :param builds: Builds resource used to fetch builds
+        :param path: Path of the SQLite database, created if missing
+        :param organization: Organization slug
+        :param overlap: Seconds the sync windows are widened by to absorb clock skew (default: 60)
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        """
+        self.builds = builds
+        self.path = path
+        self.organization = organization
+        self.overlap = datetime.timedelta(seconds=overlap)
+        self.workers = workers
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """
+        Close the database
+        """
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def sync(self, since=None, batch_size=500):
+        """
+        Bring the mirror up to date
+
+        :param since: datetime.date to start the first sync from, None for the whole history
+        :param batch_size: Number of builds written per statement batch (default: 500)
+        :return: Number of builds written
+        """
+        started_at = datetime.datetime.now(datetime.timezone.utc)
+        created_high_water, last_sync = self._get_sync_state()
+
+        if created_high_water is None:
+            queries = [{"created_from": since}]
+        else:
+            queries = [
+                {"created_from": self._parse(created_high_water) - self.overlap},
+                {"finished_from": self._parse(last_sync) - self.overlap},
+                {"states": ACTIVE_STATES},
+            ]
+
+        written = 0
+        for filters in queries:
+            builds = self.builds.iter_all_for_org(
+                self.organization,
+                workers=self.workers,
+                include_retried_jobs=True,
+                **{key: value for key, value in filters.items() if value is not None},
+            )
+            while True:
+                batch = list(islice(builds, batch_size))
+                if not batch:
+                    break
+                with self.connection:
+                    self._write_builds(batch)
+                written += len(batch)
+
+        with self.connection:
+            newest = self.connection.execute(
+                "SELECT MAX(created_at) FROM builds WHERE organization = ?",
+                (self.organization,),
+            ).fetchone()[0]
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                (self.organization, newest, self._format(started_at)),
+            )
+        return written
+
+    def query_builds(
+        self,
+        pipeline=None,
+        branch=None,
+        commit=None,
+        states=None,
+        created_from=None,
+        created_to=None,
+        finished_from=None,
+        limit=None,
+        include_jobs=False,
+    ):
+        """
+        Query the mirrored builds, newest first
+
+        :param pipeline: Filters the results by pipeline slug
+        :param branch: Filters the results by the given branch or branches
+        :param commit: Filters the results by the full commit sha
+        :param states: Filters the results by build states [List of BuildState or str]
+        :param created_from: Filters the results by builds created on or after the given datetime.date
+        :param created_to: Filters the results by builds created before the given datetime.date
+        :param finished_from: Filters the results by builds finished on or after the given datetime.date
+        :param limit: Maximum number of builds to return, None for all of them
+        :param include_jobs: Bool to add the jobs of each build
+        :return: List of builds as returned by the API
+        """
+        conditions = ["organization = ?"]
+        parameters = [self.organization]
+        for column, value in (
+            ("pipeline", pipeline),
+            ("branch", branch),
+            ("commit_sha", commit),
+            ("state", states),
+        ):
+            if value is None:
+                continue
+            values = value if isinstance(value, (list, tuple)) else [value]
+            values = [getattr(item, "value", item) for item in values]
+            conditions.append("{} IN ({})".format(column, ", ".join("?" * len(values))))
+            parameters += values
+        for condition, value in (
+            ("created_at >= ?", created_from),
+            ("created_at < ?", created_to),
+            ("finished_at >= ?", finished_from),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(self._format(value))
+
+        sql = "SELECT id, data FROM builds WHERE {} ORDER BY created_at DESC".format(
+            " AND ".join(conditions)
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        rows = self.connection.execute(sql, parameters).fetchall()
+
+        builds = []
+        for build_id, data in rows:
+            build = json.loads(data)
+            if include_jobs:
+                build["jobs"] = self.get_jobs(build_id)
+            builds.append(build)
+        return builds
+
+    def get_jobs(self, build_id):
+        """
+        Get the mirrored jobs of a build
+
+        :param build_id: Build id
+        :return: List of jobs as returned by the API
+        """
+        rows = self.connection.execute(
+            "SELECT data FROM jobs WHERE build_id = ? ORDER BY position", (build_id,)
+        )
+        return [json.loads(data) for data, in rows]
+
+    def _get_sync_state(self):
+        """
+        Read the high-water marks of the previous sync
+
+        :return: Tuple of the newest build creation time and the previous sync time, or Nones
+        """
+        row = self.connection.execute(
+            "SELECT created_high_water, last_sync FROM sync_state WHERE organization = ?",
+            (self.organization,),
+        ).fetchone()
+        return row if row is not None else (None, None)
+
+    def _write_builds(self, builds):
+        """
+        Upsert builds with their jobs and pipelines
+
+        :param builds: List of builds as returned by the API
+        """
+        build_rows, job_rows, pipeline_rows = [], [], {}
+        for build in builds:
+            build = dict(build)
+            jobs = build.pop("jobs", None) or []
+            pipeline = build.get("pipeline") or {}
+            if pipeline.get("slug"):
+                pipeline_rows[pipeline["slug"]] = (
+                    self.organization,
+                    pipeline["slug"],
+                    pipeline.get("id"),
+                    pipeline.get("name"),
+                    pipeline.get("repository"),
+                    json.dumps(pipeline),
+                )
+            build_rows.append(
+                (
+                    build["id"],
+                    self.organization,
+                    pipeline.get("slug"),
+                    build.get("number"),
+                    build.get("state"),
+                    build.get("branch"),
+                    build.get("commit"),
+                    build.get("message"),
+                    build.get("created_at"),
+                    build.get("started_at"),
+                    build.get("finished_at"),
+                    json.dumps(build),
+                )
+            )
+            for position, job in enumerate(jobs):
+                job_rows.append(
+                    (
+                        job.get("id") or "{}/{}".format(build["id"], position),
+                        build["id"],
+                        position,
+                        job.get("name"),
+                        job.get("step_key"),
+                        job.get("state"),
+                        job.get("exit_status"),
+                        job.get("created_at"),
+                        job.get("started_at"),
+                        job.get("finished_at"),
+                        json.dumps(job),
+                    )
+                )
+
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO pipelines VALUES (?, ?, ?, ?, ?, ?)",
+            pipeline_rows.values(),
+        )
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO builds VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            build_rows,
+        )
+        self.connection.executemany(
+            "DELETE FROM jobs WHERE build_id = ?", [(row[0],) for row in build_rows]
+        )
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            job_rows,
+        )
+
+    @staticmethod
+    def _format(value):
+        """
+        Format a date like the timestamps of the API, so that they compare as strings
+
+        :param value: datetime.date, datetime.datetime (UTC if naive) or str
+        :return: str
+        """
+        if isinstance(value, str):
+            return value
+        if not isinstance(value, datetime.datetime):
+            value = datetime.datetime(value.year, value.month, value.day)
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc)
+        return value.strftime("%Y-%m-%dT%H:%M:%S.") + "%03dZ" % (
+            value.microsecond // 1000
+        )
+
+    @staticmethod
+    def _parse(value):
+        """
+        Parse a timestamp of the API
+
+        :param value: str
+        :return: naive UTC datetime.datetime
+        """
+        return datetime.datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
@@ -0,0 +1,319 @@
+from typing import Dict, Tuple
+
+MODELS: Dict[str, type] = {}
+
+
+class Nested(object):
+    """
+    Field holding a nested object or list of objects, converted to models on first access
+
+    Until it is read, the field keeps the decoded Json it was given, so objects that are
+    never looked at are never built.
+    """
+
+    def __init__(self, model, many=False):
+        """
+        Create class
+
+        :param model: Name of the Model class of the nested objects
+        :param many: Bool for a list of nested objects
+        """
+        self.model = model
+        self.many = many
+        self.name = ""
+        self.slot = ""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.slot = "_" + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot, None)
+        if value is None or getattr(instance, self.slot + "_loaded", True):
+            return value
+        model = MODELS[self.model]
+        if self.many:
+            value = [model(item) for item in value]
+        else:
+            value = model(value)
+        setattr(instance, self.slot, value)
+        setattr(instance, self.slot + "_loaded", True)
+        return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, value)
+        setattr(instance, self.slot + "_loaded", False)
+
+
+class ModelMeta(type):
+    """
+    Builds the __slots__ of a Model from its declared fields
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        fields = tuple(namespace.get("fields", ()))
+        nested = tuple(
+            key for key, value in namespace.items() if isinstance(value, Nested)
+        )
+        slots = list(namespace.get("__slots__", ()))
+        slots += [field for field in fields if field not in nested]
+        for field in nested:
+            slots += ["_" + field, "_" + field + "_loaded"]
+        namespace["__slots__"] = tuple(slots)
+        namespace["fields"] = fields
+        namespace["_field_set"] = frozenset(fields)
+        namespace["_nested"] = frozenset(nested)
+        cls = super().__new__(mcs, name, bases, namespace)
+        MODELS[name] = cls
+        return cls
+
+
+class Model(object, metaclass=ModelMeta):
+    """
+    Base class of the typed objects returned instead of dicts with as_model=True
+
+    Models use __slots__ instead of a __dict__ per object, and keep keys the API adds
+    that are not declared as fields in `extra`. Fields missing from the response are None.
+    """
+
+    __slots__ = ("extra",)
+    fields: Tuple[str, ...] = ()
+
+    def __init__(self, data):
+        """
+        Create class
+
+        :param data: Dictionary decoded from the API response
+        """
+        extra = None
+        fields = self._field_set
+        for key, value in data.items():
+            if key in fields:
+                setattr(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        self.extra = extra
+
+    def __getattr__(self, name):
+        if name in self._field_set:
+            return None
+        raise AttributeError("{} has no field {}".format(type(self).__name__, name))
+
+    def __getitem__(self, key):
+        """
+        Read a field like a dict key, to ease moving code from dicts to models
+        """
+        if key in self._field_set:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __reduce__(self):
+        return type(self), (self.to_dict(),)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        identifier = getattr(self, "number", None) or getattr(self, "id", None)
+        return "<{} {}>".format(type(self).__name__, identifier)
+
+    def to_dict(self):
+        """
+        Convert back to the dictionary returned by the API
+
+        :return: dict
+        """
+        data = dict(self.extra or {})
+        for field in self.fields:
+            name = "_" + field if field in self._nested else field
+            try:
+                value = object.__getattribute__(self, name)
+            except AttributeError:
+                continue
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif isinstance(value, list) and value and isinstance(value[0], Model):
+                value = [item.to_dict() for item in value]
+            data[field] = value
+        return data
+
+
+class Pipeline(Model):
+    """
+    A pipeline
+    """
+
+    fields = (
+        "id",
+        "graphql_id",
+        "url",
+        "web_url",
+        "name",
+        "description",
+        "slug",
+        "repository",
+        "cluster_id",
+        "branch_configuration",
+        "default_branch",
+        "skip_queued_branch_builds",
+        "skip_queued_branch_builds_filter",
+        "cancel_running_branch_builds",
+        "cancel_running_branch_builds_filter",
+        "provider",
+        "builds_url",
+        "badge_url",
+        "created_by",
+        "created_at",
+        "archived_at",
+        "scheduled_builds_count",
+        "running_builds_count",
+        "scheduled_jobs_count",
+        "running_jobs_count",
+        "waiting_jobs_count",
+        "visibility",
+        "tags",
+        "configuration",
+        "steps",
+        "env",
+    )
+
+
+class Agent(Model):
+    """
+    An agent, with the job it is running
+    """
+
+    fields = (
+        "id",
+        "graphql_id",
+        "url",
+        "web_url",
+        "name",
+        "connection_state",
+        "ip_address",
+        "hostname",
+        "user_agent",
+        "version",
+        "creator",
+        "created_at",
+        "job",
+        "last_job_finished_at",
+        "priority",
+        "meta_data",
+    )
+    job = Nested("Job")
+
+
+class Job(Model):
+    """
+    A job of a build, with the agent that ran it
+    """
+
+    fields = (
+        "id",
+        "graphql_id",
+        "type",
+        "name",
+        "label",
+        "step_key",
+        "priority",
+        "agent_query_rules",
+        "state",
+        "build_url",
+        "web_url",
+        "log_url",
+        "raw_log_url",
+        "artifacts_url",
+        "command",
+        "soft_failed",
+        "exit_status",
+        "artifact_paths",
+        "agent",
+        "created_at",
+        "scheduled_at",
+        "runnable_at",
+        "started_at",
+        "finished_at",
+        "retried",
+        "retried_in_job_id",
+        "retries_count",
+        "retry_type",
+        "parallel_group_index",
+        "parallel_group_total",
+        "matrix",
+        "cluster_id",
+        "cluster_queue_id",
+    )
+    agent = Nested("Agent")
+
+
+class Build(Model):
+    """
+    A build, with its pipeline and jobs
+    """
+
+    fields = (
+        "id",
+        "graphql_id",
+        "url",
+        "web_url",
+        "number",
+        "state",
+        "blocked",
+        "cancel_reason",
+        "message",
+        "commit",
+        "branch",
+        "tag",
+        "env",
+        "source",
+        "author",
+        "creator",
+        "created_at",
+        "scheduled_at",
+        "started_at",
+        "finished_at",
+        "meta_data",
+        "pull_request",
+        "rebuilt_from",
+        "pipeline",
+        "jobs",
+    )
+    pipeline = Nested("Pipeline")
+    jobs = Nested("Job", many=True)
+
+
+class Artifact(Model):
+    """
+    An artifact uploaded by a job
+    """
+
+    fields = (
+        "id",
+        "job_id",
+        "url",
+        "download_url",
+        "state",
+        "path",
+        "dirname",
+        "filename",
+        "mime_type",
+        "file_size",
+        "glob_path",
+        "original_path",
+        "sha1sum",
+    )
+
+
+class Annotation(Model):
+    """
+    An annotation of a build
+    """
+
+    fields = ("id", "context", "style", "body_html", "created_at", "updated_at")
@@ -1,4 +1,8 @@
+from functools import partial
+
 from pybuildkite.client import Client
+from pybuildkite.decorators import requires_sync_client
+from pybuildkite.pagination import iter_items
 
 
 class Organizations(Client):
@@ -29,6 +33,20 @@ class Organizations(Client):
             self.path, query_params=query_params, with_pagination=with_pagination
         )
 
+    @requires_sync_client
+    def iter_all(self, max_items=None, workers=None, ordered=True):
+        """
+        Lazily iterate over all of the user’s organizations, one page at a time.
+
+        :param max_items: Maximum number of organizations to return, None for all of them
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        :param ordered: Bool to keep page order when fetching concurrently
+        :return: Generator of organizations
+        """
+        return iter_items(
+            partial(self.list_all, with_pagination=True), max_items, workers, ordered
+        )
+
     def get_org(self, org_name):
         """
         Get an organization
@@ -36,4 +54,4 @@ class Organizations(Client):
         :param org_name: Organisation slug
         :return: Organisation
         """
-        return self.client.get(self.path + org_name)
+        return self.client.get(self.path + org_name, cache_resource="organizations")
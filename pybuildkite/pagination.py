@@ -0,0 +1,106 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
+
+def iter_items(fetch_page, max_items=None, workers=None, ordered=True):
+    """
+    Lazily iterate over the items of a paginated list endpoint
+
+    Pages are requested one at a time and only when the previous page has been consumed,
+    so at most one page is held in memory. Stopping the iteration stops the requests.
+
+    With workers > 1 the first page is read to learn the last page number from the Link
+    header, and the remaining pages are fetched concurrently. At most `workers` pages are
+    in flight or waiting to be consumed at any time.
+
+    :param fetch_page: Callable taking a page keyword argument and returning a paginated Response
+    :param max_items: Maximum number of items to yield, None for all of them
+    :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+    :param ordered: Bool to yield pages in page order rather than as they arrive (parallel only)
+    :return: Generator of items
+    """
+    if max_items is not None and max_items <= 0:
+        return
+    if workers is not None and workers > 1:
+        items = _iter_parallel(fetch_page, workers, ordered)
+    else:
+        items = _iter_sequential(fetch_page)
+    try:
+        yield from islice(items, max_items)
+    finally:
+        items.close()
+
+
+def _iter_sequential(fetch_page, page=1):
+    """
+    Iterate over pages by following the next page of each response
+
+    :param fetch_page: Callable taking a page keyword argument and returning a paginated Response
+    :param page: Page to start from
+    :return: Generator of items
+    """
+    while page:
+        response = fetch_page(page=page)
+        yield from response.body
+        page = response.next_page
+
+
+def _iter_parallel(fetch_page, workers, ordered):
+    """
+    Iterate over pages, fetching all pages after the first one concurrently
+
+    :param fetch_page: Callable taking a page keyword argument and returning a paginated Response
+    :param workers: Number of pages to fetch concurrently
+    :param ordered: Bool to yield pages in page order rather than as they arrive
+    :return: Generator of items
+    """
+    first = fetch_page(page=1)
+    yield from first.body
+    if not first.last_page:
+        if first.next_page:
+            yield from _iter_sequential(fetch_page, first.next_page)
+        return
+
+    pages = range(2, first.last_page + 1)
+    for response in map_concurrently(
+        lambda page: fetch_page(page=page), pages, workers, ordered
+    ):
+        yield from response.body
+
+
+def map_concurrently(func, iterable, workers, ordered=True):
+    """
+    Apply func to every element of iterable in a thread pool
+
+    At most `workers` calls are in flight or waiting to be consumed, so results are
+    produced only as fast as they are consumed. Closing the generator cancels the
+    calls that have not started yet.
+
+    :param func: Callable to apply
+    :param iterable: Arguments to call func with
+    :param workers: Number of concurrent calls
+    :param ordered: Bool to yield results in the order of iterable rather than as they complete
+    :return: Generator of results
+    """
+    arguments = iter(iterable)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque(
+        executor.submit(func, argument) for argument in islice(arguments, workers)
+    )
+    try:
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = next(future for future in pending if future in done)
+                pending.remove(future)
+            result = future.result()
+            for argument in islice(arguments, 1):
+                pending.append(executor.submit(func, argument))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -1,4 +1,9 @@
+from functools import partial
+
 from pybuildkite.client import Client
+from pybuildkite.decorators import requires_sync_client
+from pybuildkite.models import Pipeline
+from pybuildkite.pagination import iter_items
 
 
 class Pipelines(Client):
@@ -16,13 +21,17 @@ class Pipelines(Client):
         self.client = client
         self.path = base_url + "organizations/{}/pipelines/"
 
-    def list_pipelines(self, organization, page=0, with_pagination=False):
+    def list_pipelines(
+        self, organization, page=0, with_pagination=False, fields=None, as_model=False
+    ):
         """
         Returns a paginated list of an organization’s pipelines.
 
         :param organization: Organization slug
         :param page: Int to determine which page to read from (See Pagination in README)
         :param with_pagination: Bool to return a response with pagination attributes
+        :param fields: List of fields to keep, with dots for nested ones such as "provider.id", None for all
+        :param as_model: Bool to return Pipeline objects instead of dicts
         :return: Returns a paginated list of an organization’s pipelines.
         """
         query_params = {"page": page}
@@ -30,17 +39,59 @@ class Pipelines(Client):
             self.path.format(organization),
             query_params=query_params,
             with_pagination=with_pagination,
+            fields=fields,
+            model=Pipeline if as_model else None,
         )
 
-    def get_pipeline(self, organization, pipeline_name):
+    @requires_sync_client
+    def iter_pipelines(
+        self,
+        organization,
+        max_items=None,
+        workers=None,
+        ordered=True,
+        fields=None,
+        as_model=False,
+    ):
+        """
+        Lazily iterate over all of an organization’s pipelines, one page at a time.
+
+        :param organization: Organization slug
+        :param max_items: Maximum number of pipelines to return, None for all of them
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        :param ordered: Bool to keep page order when fetching concurrently
+        :param fields: List of fields to keep, with dots for nested ones such as "provider.id", None for all
+        :param as_model: Bool to return Pipeline objects instead of dicts
+        :return: Generator of pipelines
+        """
+        return iter_items(
+            partial(
+                self.list_pipelines,
+                organization,
+                with_pagination=True,
+                fields=fields,
+                as_model=as_model,
+            ),
+            max_items,
+            workers,
+            ordered,
+        )
+
+    def get_pipeline(self, organization, pipeline_name, fields=None, as_model=False):
         """
         Get a pipeline
 
         :param organization: Organization slug
         :param pipeline_name: Pipeline slug
+        :param fields: List of fields to keep, with dots for nested ones such as "provider.id", None for all
+        :param as_model: Bool to return a Pipeline object instead of a dict
         :return: A pipeline
         """
-        return self.client.get(self.path.format(organization) + pipeline_name)
+        return self.client.get(
+            self.path.format(organization) + pipeline_name,
+            fields=fields,
+            model=Pipeline if as_model else None,
+        )
 
     def create_pipeline(
         self,
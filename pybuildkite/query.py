@@ -0,0 +1,45 @@
+from enum import Enum
+from functools import lru_cache
+from urllib.parse import quote_plus
+
+
+def encode_query_params(query_params):
+    """
+    Build the query string of a request
+
+    Values are URL-encoded, lists and tuples become repeated `key[]=` parameters,
+    booleans become `true` or `false` and Enums are replaced by their value.
+    Parameters are encoded once per distinct key and value, so paging through the
+    same filters only encodes the page number again.
+
+    :param query_params: Dictionary of parameter name to value, in order
+    :return: Query string without the leading "?"
+    """
+    params = (
+        _encode_param(key, tuple(value) if isinstance(value, list) else value)
+        for key, value in query_params.items()
+    )
+    return "&".join(param for param in params if param)
+
+
+@lru_cache(maxsize=1024, typed=True)
+def _encode_param(key, value):
+    """
+    Encode one parameter
+
+    :param key: Parameter name
+    :param value: Hashable parameter value
+    :return: str
+    """
+    key = quote_plus(key, safe="[]")
+    if isinstance(value, tuple):
+        return "&".join("{}[]={}".format(key, _encode_value(item)) for item in value)
+    return "{}={}".format(key, _encode_value(value))
+
+
+def _encode_value(value):
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return quote_plus(str(value))
@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+
+class RateLimiter(object):
+    """
+    Paces requests to a budget of requests per minute
+
+    A token bucket holding up to `burst` requests that refills at the configured rate.
+    Every request reserves the next free slot, so concurrent callers are spread evenly
+    over time instead of all being released at once. Safe to share between threads.
+    """
+
+    def __init__(self, requests_per_minute, burst=1, clock=time.monotonic):
+        """
+        Create class
+
+        :param requests_per_minute: Sustained number of requests allowed per minute
+        :param burst: Number of requests that may be sent back to back after an idle period (default: 1)
+        :param clock: Function returning the current time in seconds
+        """
+        if requests_per_minute <= 0 or burst < 1:
+            raise ValueError(
+                "requests_per_minute must be positive and burst at least 1"
+            )
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.interval = 60.0 / requests_per_minute
+        self.clock = clock
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Reserve a slot for one request
+
+        :return: Seconds to wait before sending the request
+        """
+        with self._lock:
+            self._next_slot, delay = self._schedule(self._next_slot, self.clock())
+        return delay
+
+    def acquire(self):
+        """
+        Block until one request may be sent
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _schedule(self, next_slot, now):
+        """
+        Reserve a slot given the state of the bucket
+
+        :param next_slot: Time at which the bucket is full again after all reserved requests
+        :param now: Current time
+        :return: Tuple of the new next_slot and the seconds to wait
+        """
+        next_slot = max(next_slot, now)
+        delay = max(0.0, next_slot - (self.burst - 1) * self.interval - now)
+        return next_slot + self.interval, delay
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    RateLimiter whose budget is shared by all processes on a host
+
+    The bucket state lives in a small file that is locked while a slot is reserved,
+    so every process pointing at the same path shares one budget.
+    """
+
+    def __init__(self, path, requests_per_minute, burst=1):
+        """
+        Create class
+
+        :param path: Path of the file holding the shared state, created if missing
+        :param requests_per_minute: Sustained number of requests allowed per minute
+        :param burst: Number of requests that may be sent back to back after an idle period (default: 1)
+        """
+        if fcntl is None:  # pragma: no cover
+            raise OSError("FileRateLimiter requires fcntl, which is not available")
+        super().__init__(requests_per_minute, burst, clock=time.time)
+        self.path = path
+
+    def reserve(self):
+        """
+        Reserve a slot for one request in the shared budget
+
+        :return: Seconds to wait before sending the request
+        """
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                content = os.pread(fd, 64, 0)
+                next_slot = float(content) if content.strip() else 0.0
+                next_slot, delay = self._schedule(next_slot, self.clock())
+                data = repr(next_slot).encode()
+                os.ftruncate(fd, 0)
+                os.pwrite(fd, data, 0)
+            finally:
+                os.close(fd)
+        return delay
@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "DELETE"])
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+TOO_MANY_REQUESTS = 429
+
+
+class RetryBudget(object):
+    """
+    Limits the share of requests that may be retried
+
+    Every request deposits `token_ratio` tokens, up to `max_tokens`, and every retry
+    withdraws one. When the budget is empty, failures are raised instead of retried,
+    so an outage does not multiply the load on the API.
+    """
+
+    def __init__(self, max_tokens=100, token_ratio=0.1):
+        """
+        Create class
+
+        :param max_tokens: Maximum number of retries that can be saved up (default: 100)
+        :param token_ratio: Number of retries earned by each request (default: 0.1)
+        """
+        self.max_tokens = max_tokens
+        self.token_ratio = token_ratio
+        self.tokens = float(max_tokens)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        """
+        Record a request
+        """
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.token_ratio)
+
+    def withdraw(self):
+        """
+        Take a retry out of the budget
+
+        :return: true if the retry is allowed, otherwise false
+        """
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class RetryPolicy(object):
+    """
+    Decides which failed requests are retried and how long to wait before retrying
+
+    Requests with other methods than `methods`, such as the PUT of a rebuild, may have
+    been carried out when a 5xx status or a dropped connection came back, so they are
+    only retried on 429 Too Many Requests, which the API answers without acting. Waits
+    honour the Retry-After header and, once the rate limit is used up, the
+    RateLimit-Reset header. Otherwise waits grow exponentially with full jitter.
+    """
+
+    def __init__(
+        self,
+        max_retries=3,
+        backoff_factor=0.5,
+        max_backoff=30,
+        jitter=True,
+        methods=IDEMPOTENT_METHODS,
+        statuses=RETRY_STATUSES,
+        budget=None,
+    ):
+        """
+        Create class
+
+        :param max_retries: Maximum number of retries of a single request, 0 disables retries
+        :param backoff_factor: Wait in seconds before the first retry, doubled for every further retry
+        :param max_backoff: Maximum wait in seconds between retries, unless the API asks for longer
+        :param jitter: Bool to randomise waits so that clients don't retry in lockstep
+        :param methods: HTTP methods that are retried on any retried status or connection error,
+               the idempotent ones by default. Other methods are only retried on 429.
+        :param statuses: HTTP statuses that are retried
+        :param budget: RetryBudget shared by all requests of a client (default: a new RetryBudget)
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.methods = frozenset(method.upper() for method in methods)
+        self.statuses = frozenset(statuses)
+        self.budget = budget if budget is not None else RetryBudget()
+
+    def record_request(self):
+        """
+        Record a new request, which earns retries in the budget
+        """
+        self.budget.deposit()
+
+    def is_retryable(self, method, attempt, status_code=None):
+        """
+        Whether a failed attempt should be retried
+
+        A retry is taken out of the budget when this returns true.
+
+        :param method: HTTP method of the request
+        :param attempt: Number of retries already made
+        :param status_code: HTTP status of the response, None if the connection failed
+        :return: true or false
+        """
+        if attempt >= self.max_retries:
+            return False
+        if method.upper() not in self.methods and status_code != TOO_MANY_REQUESTS:
+            return False
+        if status_code is not None and status_code not in self.statuses:
+            return False
+        return self.budget.withdraw()
+
+    def get_delay(self, attempt, headers=None):
+        """
+        Seconds to wait before the next retry
+
+        :param attempt: Number of retries already made
+        :param headers: Headers of the failed response, if any
+        :return: seconds
+        """
+        delay = self._get_delay_from_headers(headers or {})
+        if delay is not None:
+            return delay
+        delay = min(self.max_backoff, self.backoff_factor * 2**attempt)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    @staticmethod
+    def _get_delay_from_headers(headers):
+        """
+        Seconds to wait as requested by the API, if it asked for any
+
+        :param headers: Response headers
+        :return: seconds or None
+        """
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after).timestamp()
+                except (TypeError, ValueError):
+                    return None
+                return max(0.0, retry_at - time.time())
+        if headers.get("RateLimit-Remaining") == "0":
+            try:
+                return max(0.0, float(headers.get("RateLimit-Reset")))
+            except (TypeError, ValueError):
+                return None
+        return None
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from typing import Any, Optional
+
+
+class _Call(object):
+    """
+    A call in flight and its outcome
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(object):
+    """
+    Runs only one call per key at a time, sharing its outcome with concurrent callers
+
+    Threads asking for a key while a call for it is in flight wait for that call and
+    receive its result or exception, instead of making the call themselves.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        Call func, unless a call for the same key is already in flight
+
+        :param key: Key identifying identical calls
+        :param func: Callable without arguments
+        :return: The result of the call, shared with every caller of the same flight
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight(object):
+    """
+    asyncio version of SingleFlight
+
+    The call runs in its own task, so it completes for the remaining waiters even if
+    the caller that started it is cancelled.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def do(self, key, func):
+        """
+        Await func(), unless a call for the same key is already in flight
+
+        :param key: Key identifying identical calls
+        :param func: Coroutine function without arguments
+        :return: The result of the call, shared with every caller of the same flight
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
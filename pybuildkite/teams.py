@@ -1,4 +1,9 @@
+from functools import partial
+from typing import Optional
+
 from pybuildkite.client import Client
+from pybuildkite.decorators import requires_sync_client
+from pybuildkite.pagination import iter_items
 
 
 class Teams(Client):
@@ -36,4 +41,33 @@ class Teams(Client):
             self.path.format(organization),
             query_params=query_parms,
             with_pagination=with_pagination,
+            cache_resource="teams",
+        )
+
+    @requires_sync_client
+    def iter_teams(
+        self,
+        organization: str,
+        user_id: Optional[str] = None,
+        max_items: Optional[int] = None,
+        workers: Optional[int] = None,
+        ordered: bool = True,
+    ):
+        """
+        Lazily iterate over all the teams for a given organization, one page at a time.
+
+        :param organization: organization slug
+        :param user_id: Filters the results to teams the given user is a member of
+        :param max_items: Maximum number of teams to return, None for all of them
+        :param workers: Number of pages to fetch concurrently, None to fetch them one after another
+        :param ordered: Bool to keep page order when fetching concurrently
+        :return: Generator of teams
+        """
+        return iter_items(
+            partial(
+                self.list_teams, organization, user_id=user_id, with_pagination=True
+            ),
+            max_items,
+            workers,
+            ordered,
         )
@@ -22,4 +22,4 @@ class Users(Client):
 
         :return: Returns current user
         """
-        return self.client.get(self.path)
+        return self.client.get(self.path, cache_resource="users")
@@ -0,0 +1,209 @@
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlparse
+
+from pybuildkite.builds import ACTIVE_STATES, TERMINAL_STATES
+from pybuildkite.exceptions import BuildWatchTimeout
+from pybuildkite.jobs import TERMINAL_JOB_STATE_VALUES
+
+TERMINAL_STATE_VALUES = frozenset(state.value for state in TERMINAL_STATES)
+
+FINISHED_JOB_STATES = TERMINAL_JOB_STATE_VALUES
+
+
+class BuildWatcher(object):
+    """
+    Tracks many builds until they finish, with as few requests as possible
+
+    Every poll makes one list request per pipeline for its active builds, instead of one
+    request per tracked build. Tracked builds missing from that list have left the active
+    states, and only those are fetched one by one, once, to read their final state.
+
+    The interval between polls shrinks to min_interval when a state changed or a build has
+    most of its jobs finished, and grows towards max_interval while nothing happens.
+    """
+
+    def __init__(
+        self,
+        builds,
+        on_transition=None,
+        min_interval=2,
+        max_interval=30,
+        backoff=1.5,
+        near_completion=0.8,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        """
+        Create class
+
+        :param builds: Builds resource used to poll builds
+        :param on_transition: Callable called with the build and its previous state on every state change
+        :param min_interval: Seconds between polls when builds are changing or about to finish (default: 2)
+        :param max_interval: Maximum seconds between polls when nothing changes (default: 30)
+        :param backoff: Factor the interval grows by after a poll without changes (default: 1.5)
+        :param near_completion: Fraction of finished jobs from which a build is about to finish (default: 0.8)
+        :param clock: Function returning the current time in seconds
+        :param sleep: Function sleeping for a number of seconds
+        """
+        self.builds = builds
+        self.on_transition = on_transition
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.near_completion = near_completion
+        self.clock = clock
+        self.sleep = sleep
+        self.interval = min_interval
+        self._tracked = {}
+
+    def add(self, organization, pipeline, number, state=None):
+        """
+        Start tracking a build
+
+        :param organization: Organization slug
+        :param pipeline: Pipeline slug
+        :param number: Build number
+        :param state: Last known state of the build, None if unknown
+        """
+        self._tracked[(organization, pipeline, int(number))] = {"state": state}
+
+    def add_build(self, build):
+        """
+        Start tracking a build returned by the API, such as the result of create_build
+
+        :param build: Build dictionary
+        """
+        organization, pipeline, number = self.build_key(build)
+        self.add(organization, pipeline, number, build.get("state"))
+
+    @staticmethod
+    def build_key(build):
+        """
+        Identify a build returned by the API
+
+        :param build: Build dictionary
+        :return: Tuple of organization slug, pipeline slug and build number
+        """
+        segments = urlparse(build["url"]).path.split("/")
+        organization = segments[segments.index("organizations") + 1]
+        pipeline = segments[segments.index("pipelines") + 1]
+        return organization, pipeline, int(build["number"])
+
+    @property
+    def pending(self):
+        """
+        Keys of the tracked builds that have not finished
+
+        :return: List of (organization, pipeline, number) tuples
+        """
+        return [
+            key
+            for key, tracked in self._tracked.items()
+            if tracked["state"] not in TERMINAL_STATE_VALUES
+        ]
+
+    @property
+    def results(self):
+        """
+        Latest known version of every tracked build
+
+        :return: Dictionary of (organization, pipeline, number) to build, None if not seen yet
+        """
+        return {key: tracked.get("build") for key, tracked in self._tracked.items()}
+
+    def poll(self):
+        """
+        Refresh the state of the pending builds once
+
+        :return: List of (build, previous_state) tuples for the builds whose state changed
+        """
+        pending = self.pending
+        pipelines: Dict[Tuple[str, str], List[int]] = {}
+        for organization, pipeline, number in pending:
+            pipelines.setdefault((organization, pipeline), []).append(number)
+
+        transitions = []
+        for (organization, pipeline), numbers in pipelines.items():
+            active = {}
+            for build in self.builds.iter_all_for_pipeline(
+                organization, pipeline, states=ACTIVE_STATES
+            ):
+                active[build["number"]] = build
+
+            for number in numbers:
+                build = active.get(number)
+                if build is None:
+                    build = self.builds.get_build_by_number(
+                        organization, pipeline, number
+                    )
+                transition = self._update((organization, pipeline, number), build)
+                if transition is not None:
+                    transitions.append(transition)
+
+        self._adapt_interval(transitions)
+        for build, previous_state in transitions:
+            if self.on_transition is not None:
+                self.on_transition(build, previous_state)
+        return transitions
+
+    def wait(self, timeout=None):
+        """
+        Poll until every tracked build has finished
+
+        :param timeout: Maximum seconds to wait, None to wait forever
+        :return: Dictionary of (organization, pipeline, number) to final build
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            self.poll()
+            if not self.pending:
+                return self.results
+            delay = self.interval
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    raise BuildWatchTimeout(
+                        "{} builds still running".format(len(self.pending))
+                    )
+                delay = min(delay, remaining)
+            self.sleep(delay)
+
+    def _update(self, key, build):
+        """
+        Record the latest version of a build
+
+        :return: (build, previous_state) if its state changed, otherwise None
+        """
+        tracked = self._tracked[key]
+        previous_state = tracked["state"]
+        tracked["build"] = build
+        tracked["state"] = build["state"]
+        if build["state"] != previous_state:
+            return build, previous_state
+        return None
+
+    def _adapt_interval(self, transitions):
+        """
+        Pick the interval before the next poll
+        """
+        if transitions or any(
+            self._is_near_completion(self._tracked[key].get("build"))
+            for key in self.pending
+        ):
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+    def _is_near_completion(self, build):
+        """
+        Whether most jobs of a build have finished
+
+        :param build: Build dictionary or None
+        :return: true or false
+        """
+        jobs = (build or {}).get("jobs") or []
+        if not jobs:
+            return False
+        finished = sum(1 for job in jobs if job.get("state") in FINISHED_JOB_STATES)
+        return finished >= self.near_completion * len(jobs)
@@ -0,0 +1,264 @@
+import hashlib
+import hmac
+import queue
+import threading
+import time
+from collections import namedtuple
+from fnmatch import fnmatchcase
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple, cast
+
+from pybuildkite.decoding import get_json_decoder
+from pybuildkite.exceptions import WebhookVerificationError
+
+WebhookEvent = namedtuple(
+    "WebhookEvent", ["name", "build", "job", "agent", "pipeline", "sender", "payload"]
+)
+
+
+class WebhookReceiver(object):
+    """
+    Embedded HTTP server receiving Buildkite webhooks
+
+    Requests are verified with the webhook token (X-Buildkite-Token) or signature secret
+    (X-Buildkite-Signature), and parsed into WebhookEvent tuples. The build, job, agent and
+    pipeline of an event are the same dictionaries the REST API returns. Events are passed
+    to callbacks and to queues subscribed to their name, such as "build.finished" or "job.*".
+    """
+
+    def __init__(
+        self,
+        token=None,
+        secret=None,
+        host="127.0.0.1",
+        port=0,
+        max_age=300,
+        json_decoder=None,
+        clock=time.time,
+    ):
+        """
+        Create class
+
+        :param token: Webhook token sent in X-Buildkite-Token
+        :param secret: Webhook secret used to sign X-Buildkite-Signature
+        :param host: Address to listen on (default: 127.0.0.1)
+        :param port: Port to listen on, 0 for any free port
+        :param max_age: Maximum age in seconds of a signed request, to refuse replays (default: 300)
+        :param json_decoder: "orjson", "msgspec", "json" or a decoding function, None for the fastest installed
+        :param clock: Function returning the current Unix time in seconds
+        """
+        if token is None and secret is None:
+            raise ValueError("A webhook token or secret is required")
+        self.token = token
+        self.secret = secret
+        self.host = host
+        self.port = port
+        self.max_age = max_age
+        self.json_decoder = get_json_decoder(json_decoder)
+        self.clock = clock
+        self.dropped = 0
+        self.callback_errors = 0
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._subscriptions = []
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        """
+        URL to configure as the webhook endpoint, once started
+
+        :return: str
+        """
+        if self.server is None:
+            raise RuntimeError("The webhook receiver is not started")
+        host, port = cast(Tuple[str, int], self.server.server_address[:2])
+        return "http://{}:{}/".format(host, port)
+
+    def start(self):
+        """
+        Start serving in a background thread
+        """
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop serving and close the listening socket
+        """
+        if self.server is not None and self._thread is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self._thread.join()
+            self.server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def subscribe(self, pattern="*", callback=None, maxsize=1000):
+        """
+        Subscribe to the events whose name matches a pattern
+
+        Callbacks run in the thread handling the request, so they should return quickly.
+        Exceptions they raise are counted in `callback_errors` rather than passed on, so
+        that other subscribers still receive the event and Buildkite does not send it
+        again. Without a callback, events are put in a queue. When it is full, new events are
+        dropped and counted in `dropped`.
+
+        :param pattern: Shell-style pattern of event names, such as "build.*" (default: all events)
+        :param callback: Callable taking a WebhookEvent, None to receive events in a queue
+        :param maxsize: Maximum number of events waiting in the queue (default: 1000)
+        :return: The subscription, a queue.Queue of WebhookEvent without callback
+        """
+        subscription = callback if callback is not None else queue.Queue(maxsize)
+        with self._lock:
+            self._subscriptions.append((pattern, subscription))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Stop delivering events to a subscription
+
+        :param subscription: Value returned by subscribe
+        """
+        with self._lock:
+            self._subscriptions = [
+                (pattern, existing)
+                for pattern, existing in self._subscriptions
+                if existing is not subscription
+            ]
+
+    def events(self, pattern="*", timeout=None):
+        """
+        Iterate over the events whose name matches a pattern as they arrive
+
+        The subscription starts when this is called, not when iteration starts, and
+        ends when the iterator is closed.
+
+        :param pattern: Shell-style pattern of event names (default: all events)
+        :param timeout: Seconds to wait for the next event before stopping, None to wait forever
+        :return: Generator of WebhookEvent
+        """
+        return self._iter_events(self.subscribe(pattern), timeout)
+
+    def _iter_events(self, subscription, timeout):
+        try:
+            while True:
+                try:
+                    yield subscription.get(timeout=timeout)
+                except queue.Empty:
+                    return
+        finally:
+            self.unsubscribe(subscription)
+
+    def handle(self, body, headers):
+        """
+        Verify, parse and deliver one webhook request
+
+        Useful to feed recorded payloads, or to plug the receiver into another web server.
+
+        :param body: bytes of the request body
+        :param headers: Mapping of the request headers
+        :return: WebhookEvent
+        """
+        self.verify(body, headers)
+        payload = self.json_decoder(body)
+        name = payload.get("event") or headers.get("X-Buildkite-Event")
+        event = WebhookEvent(
+            name,
+            payload.get("build"),
+            payload.get("job"),
+            payload.get("agent"),
+            payload.get("pipeline") or (payload.get("build") or {}).get("pipeline"),
+            payload.get("sender"),
+            payload,
+        )
+        self._deliver(event)
+        return event
+
+    def verify(self, body, headers):
+        """
+        Check the token or signature of a webhook request
+
+        :param body: bytes of the request body
+        :param headers: Mapping of the request headers
+        """
+        signature = headers.get("X-Buildkite-Signature")
+        if self.secret is not None and signature:
+            parts = dict(
+                part.split("=", 1) for part in signature.split(",") if "=" in part
+            )
+            timestamp = parts.get("timestamp", "")
+            expected = hmac.new(
+                self.secret.encode(),
+                timestamp.encode() + b"." + body,
+                hashlib.sha256,
+            ).hexdigest()
+            if not hmac.compare_digest(expected, parts.get("signature", "")):
+                raise WebhookVerificationError("Invalid webhook signature")
+            if not timestamp.isdigit() or (
+                abs(self.clock() - int(timestamp)) > self.max_age
+            ):
+                raise WebhookVerificationError("Webhook signature has expired")
+            return
+
+        token = headers.get("X-Buildkite-Token")
+        if self.token is not None and token:
+            if not hmac.compare_digest(self.token.encode(), token.encode()):
+                raise WebhookVerificationError("Invalid webhook token")
+            return
+        raise WebhookVerificationError("Webhook request is not authenticated")
+
+    def _deliver(self, event):
+        """
+        Pass an event to the matching subscriptions
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for pattern, subscription in subscriptions:
+            if not fnmatchcase(event.name or "", pattern):
+                continue
+            if callable(subscription):
+                try:
+                    subscription(event)
+                except Exception:
+                    with self._lock:
+                        self.callback_errors += 1
+                continue
+            try:
+                subscription.put_nowait(event)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+
+    def _handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length)
+                try:
+                    receiver.handle(body, self.headers)
+                    status = 200
+                except WebhookVerificationError:
+                    status = 401
+                except (ValueError, AttributeError):
+                    status = 400
+                except Exception:
+                    status = 500
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        return Handler
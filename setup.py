@@ -18,4 +18,9 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     keywords=["Buildkite", "Continuous Integration", "API", "CI", "wrapper", "python"],
     install_requires=["requests"],
+    extras_require={
+        "async": ["aiohttp>=3.8"],
+        "fast": ["orjson>=3.6"],
+        "zstd": ["zstandard>=0.15"],
+    },
 )
@@ -1,3 +1,9 @@
+import json
+import threading
+import time
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 from unittest.mock import Mock
 
@@ -8,3 +14,91 @@ def fake_client() -> Mock:
     Build a fake API client
     """
     return Mock(get=Mock())
+
+
+RecordedRequest = namedtuple("RecordedRequest", ["method", "path", "headers", "body"])
+
+
+class LocalServer:
+    """
+    A local stand-in for the Buildkite API
+
+    Routes map a path to a (status, headers, body) tuple or to a callable receiving
+    the recorded request and returning such a tuple. Every request is recorded.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.delay = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = "http://127.0.0.1:{}/".format(self.server.server_port)
+
+    def route(self, path, body=None, status=200, headers=None):
+        """
+        Register a static response, Json encoding dicts and lists
+        """
+        headers = dict(headers or {})
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+            headers.setdefault("Content-Type", "application/json")
+        self.routes[path] = (status, headers, body or b"")
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = RecordedRequest(
+                    self.command,
+                    self.path,
+                    self.headers,
+                    self.rfile.read(length) if length else b"",
+                )
+                with server.lock:
+                    server.requests.append(request)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    time.sleep(server.delay)
+                    route = server.routes.get(self.path.split("?")[0])
+                    if route is None:
+                        route = (404, {}, b"")
+                    elif callable(route):
+                        route = route(request)
+                    status, headers, body = route
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = _respond
+
+        return Handler
+
+
+@pytest.fixture
+def local_server():
+    """
+    Run a local HTTP server standing in for the Buildkite API
+    """
+    server = LocalServer()
+    thread = threading.Thread(target=server.server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
@@ -9,7 +9,7 @@ def test_get_access_token(fake_client):
     artifacts = AccessTokens(fake_client, "base")
     artifacts.get_token()
     url = "base/access-token"
-    fake_client.get.assert_called_with(url)
+    fake_client.get.assert_called_with(url, cache_resource="access_tokens")
 
 
 def test_revoke_access_token(fake_client):
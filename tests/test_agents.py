@@ -1,6 +1,7 @@
 import pytest
 
 from pybuildkite.agents import Agents
+from pybuildkite.client import Response
 
 
 def test_get_agent(fake_client):
@@ -9,7 +10,9 @@ def test_get_agent(fake_client):
     """
     agents = Agents(fake_client, "base")
     agents.get_agent("org_slug", "agent_id")
-    fake_client.get.assert_called_with(agents.path.format("org_slug") + "agent_id")
+    fake_client.get.assert_called_with(
+        agents.path.format("org_slug") + "agent_id", fields=None, model=None
+    )
 
 
 def test_stop_agent(fake_client):
@@ -27,4 +30,19 @@ def test_list_all_agents(fake_client):
         agents.path.format("org_slug"),
         {"name": None, "hostname": None, "version": None, "page": 0},
         with_pagination=False,
+        fields=None,
+        model=None,
+    )
+
+
+def test_iter_all_agents(fake_client):
+    fake_client.get.return_value = Response([{"id": "agent_id"}])
+    agents = Agents(fake_client, "base")
+    assert list(agents.iter_all("org_slug", hostname="host")) == [{"id": "agent_id"}]
+    fake_client.get.assert_called_with(
+        agents.path.format("org_slug"),
+        {"name": None, "hostname": "host", "version": None, "page": 1},
+        with_pagination=True,
+        fields=None,
+        model=None,
     )
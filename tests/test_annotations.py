@@ -10,4 +10,6 @@ def test_list_annotations(fake_client):
         annotations.path.format("org_slug", "pipeline_id", "build_number"),
         query_params={"page": 0},
         with_pagination=False,
+        fields=None,
+        model=None,
     )
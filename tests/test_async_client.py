@@ -0,0 +1,322 @@
+import asyncio
+import datetime
+import io
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+import aiohttp
+from pybuildkite.async_client import AsyncClient
+from pybuildkite.buildkite import AsyncBuildkite, Builds
+from pybuildkite.client import Response
+from pybuildkite.exceptions import NoAcccessTokenException
+from pybuildkite.jobs import LogFormat
+from pybuildkite.logs import LogNormaliser
+from pybuildkite.retry import RetryPolicy
+
+
+def async_buildkite(local_server, **kwargs):
+    buildkite = AsyncBuildkite(**kwargs)
+    buildkite.base_url = local_server.url
+    buildkite.set_access_token("FAKE-ACCESS-TOKEN")
+    return buildkite
+
+
+def test_async_buildkite_requires_token():
+    """
+    Test that the async facade protects resources like the sync one
+    """
+    with pytest.raises(NoAcccessTokenException):
+        AsyncBuildkite().builds()
+
+
+def test_async_buildkite_exposes_the_same_resources():
+    """
+    Test that resources are shared with the sync facade
+    """
+    buildkite = AsyncBuildkite()
+    buildkite.set_access_token("FAKE-ACCESS-TOKEN")
+    builds = buildkite.builds()
+    assert isinstance(builds, Builds)
+    assert isinstance(builds.client, AsyncClient)
+
+
+def test_async_get_returns_parsed_json(local_server):
+    """
+    Test that resource calls return awaitables resolving to parsed Json
+    """
+    local_server.route("/organizations/org/pipelines/pipe", {"slug": "pipe"})
+
+    async def run():
+        async with async_buildkite(local_server) as buildkite:
+            return await buildkite.pipelines().get_pipeline("org", "pipe")
+
+    assert asyncio.run(run()) == {"slug": "pipe"}
+    request = local_server.requests[0]
+    assert request.headers["Authorization"] == "Bearer FAKE-ACCESS-TOKEN"
+    assert request.path == "/organizations/org/pipelines/pipe?per_page=100"
+
+
+def test_async_pagination_and_query_params(local_server):
+    """
+    Test that query parameters are sent and pagination data is parsed
+    """
+    link = '<{0}builds?page=2&per_page=1>; rel="next", <{0}builds?page=3&per_page=1>; rel="last"'
+    local_server.route(
+        "/organizations/org/builds",
+        [{"number": 1}],
+        headers={"Link": link.format(local_server.url)},
+    )
+
+    async def run():
+        async with async_buildkite(local_server, per_page=1) as buildkite:
+            return await buildkite.builds().list_all_for_org(
+                "org", branch="main", with_pagination=True
+            )
+
+    response = asyncio.run(run())
+    assert isinstance(response, Response)
+    assert response.body == [{"number": 1}]
+    assert response.next_page == 2
+    assert response.last_page == 3
+    assert (
+        local_server.requests[0].path
+        == "/organizations/org/builds?branch=main&page=0&per_page=1"
+    )
+
+
+def test_async_post_and_delete(local_server):
+    """
+    Test that bodies are sent as Json and deletes return a bool
+    """
+    local_server.route("/organizations/org/pipelines/pipe/builds", {"number": 5})
+    local_server.route("/organizations/org/pipelines/pipe", status=204)
+
+    async def run():
+        async with async_buildkite(local_server) as buildkite:
+            build = await buildkite.builds().create_build("org", "pipe", "SHA", "main")
+            deleted = await buildkite.pipelines().delete_pipeline("org", "pipe")
+            return build, deleted
+
+    assert asyncio.run(run()) == ({"number": 5}, True)
+    assert local_server.requests[0].body == b'{"commit": "SHA", "branch": "main"}'
+
+
+def test_async_stream(local_server):
+    """
+    Test that a non-Json response can be streamed as bytes chunks
+    """
+    path = "/organizations/org/pipelines/pipe/builds/1/jobs/2/artifacts/3/download/"
+    local_server.route(
+        path, b"artifact content", headers={"Content-Type": "application/octet-stream"}
+    )
+
+    async def run():
+        async with async_buildkite(local_server) as buildkite:
+            stream = await buildkite.artifacts().download_artifact(
+                "org", "pipe", 1, 2, 3, as_stream=True
+            )
+            return b"".join([chunk async for chunk in stream])
+
+    assert asyncio.run(run()) == b"artifact content"
+
+
+def test_async_errors_are_raised(local_server):
+    """
+    Test that error statuses raise
+    """
+
+    async def run():
+        async with async_buildkite(local_server) as buildkite:
+            await buildkite.pipelines().get_pipeline("org", "missing")
+
+    with pytest.raises(aiohttp.ClientResponseError, match="^404,"):
+        asyncio.run(run())
+
+
+def test_async_concurrency_is_bounded(local_server):
+    """
+    Test that no more than max_concurrency requests are in flight
+    """
+    local_server.route("/meta", {"webhook_ips": []})
+    local_server.delay = 0.05
+
+    async def run():
+        async with async_buildkite(local_server, max_concurrency=2) as buildkite:
+            meta = buildkite.meta()
+            return await asyncio.gather(
+                *[meta.get_meta_information() for _ in range(6)]
+            )
+
+    assert asyncio.run(run()) == [{"webhook_ips": []}] * 6
+    assert local_server.max_in_flight == 2
+
+
+def test_async_streams_hold_their_concurrency_slot(local_server):
+    """
+    Test that a streamed response counts as in flight until it is exhausted
+    """
+    path = "/organizations/org/pipelines/pipe/builds/1/jobs/2/artifacts/3/download/"
+    local_server.route(
+        path, b"artifact content", headers={"Content-Type": "application/octet-stream"}
+    )
+
+    async def run():
+        async with async_buildkite(local_server, max_concurrency=1) as buildkite:
+            stream = await buildkite.artifacts().download_artifact(
+                "org", "pipe", 1, 2, 3, as_stream=True
+            )
+            locked_while_streaming = buildkite.client._semaphore.locked()
+            content = b"".join([chunk async for chunk in stream])
+            return content, locked_while_streaming, buildkite.client._semaphore.locked()
+
+    assert asyncio.run(run()) == (b"artifact content", True, False)
+
+
+def test_async_get_response(local_server):
+    """
+    Test that get_response returns the status, headers and bytes of a response
+    """
+    local_server.route(
+        "/log", b"log", status=206, headers={"Content-Range": "bytes 3-5/6"}
+    )
+
+    async def run():
+        async with async_buildkite(local_server) as buildkite:
+            return await buildkite.client.get_response(local_server.url + "log")
+
+    response = asyncio.run(run())
+    assert (response.body, response.status_code) == (b"log", 206)
+    assert response.headers["Content-Range"] == "bytes 3-5/6"
+
+
+def test_async_buildkite_requires_async_with():
+    """
+    Test that the sync context manager protocol is rejected
+    """
+    with pytest.raises(TypeError):
+        with AsyncBuildkite():
+            pass
+
+
+def test_async_requests_are_retried(local_server):
+    """
+    Test that the async client applies the retry policy
+    """
+    calls = []
+
+    def respond(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return 503, {}, b""
+        return 200, {"Content-Type": "application/json"}, b"{}"
+
+    local_server.routes["/meta"] = respond
+
+    async def run():
+        async with async_buildkite(
+            local_server, retry_policy=RetryPolicy(backoff_factor=0)
+        ) as buildkite:
+            return await buildkite.meta().get_meta_information()
+
+    assert asyncio.run(run()) == {}
+    assert len(calls) == 2
+
+
+def test_async_stream_json_items(local_server):
+    """
+    Test that a Json list can be streamed item by item
+    """
+    link = '<{}builds?page=2&per_page=100>; rel="next"'.format(local_server.url)
+    local_server.route(
+        "/organizations/org/builds",
+        [{"number": 2}, {"number": 1}],
+        headers={"Link": link},
+    )
+
+    async def run():
+        async with async_buildkite(local_server) as buildkite:
+            builds = buildkite.builds()
+            items = await builds.list_all_for_org("org", as_stream=True)
+            response = await builds.list_all_for_org(
+                "org", with_pagination=True, as_stream=True
+            )
+            return (
+                [build async for build in items],
+                [build async for build in response.body],
+                response.next_page,
+            )
+
+    numbers = [{"number": 2}, {"number": 1}]
+    assert asyncio.run(run()) == (numbers, numbers, 2)
+
+
+@pytest.mark.parametrize(
+    "resource, method, args",
+    [
+        ("agents", "iter_all", ("org",)),
+        ("annotations", "iter_annotations", ("org", "pipe", 1)),
+        ("artifacts", "iter_artifacts_for_build", ("org", "pipe", 1)),
+        ("artifacts", "iter_artifacts_for_job", ("org", "pipe", 1, "job")),
+        ("emojis", "iter_emojis", ("org",)),
+        ("organizations", "iter_all", ()),
+        ("pipelines", "iter_pipelines", ("org",)),
+        ("teams", "iter_teams", ("org",)),
+        ("builds", "iter_all", ()),
+        ("builds", "iter_all_for_org", ("org",)),
+        ("builds", "iter_all_for_pipeline", ("org", "pipe")),
+        ("builds", "scan_all_for_org", ("org", datetime.date(2023, 1, 1))),
+        ("builds", "wait_for_build", ("org", "pipe", 1)),
+        ("builds", "watch_builds", ([("org", "pipe", 1)],)),
+        ("builds", "create_builds", ([],)),
+        ("builds", "cancel_matching", ("org",)),
+        ("builds", "rebuild_matching", ("org",)),
+        ("jobs", "iter_job_log", ("org", "pipe", 1, "job")),
+        ("jobs", "follow_job_log", ("org", "pipe", 1, "job")),
+        ("jobs", "get_job_state", ("org", "pipe", 1, "job")),
+    ],
+)
+def test_async_buildkite_rejects_sync_only_helpers(resource, method, args):
+    """
+    Test that helpers reading responses themselves raise a clear error
+    """
+    buildkite = AsyncBuildkite()
+    buildkite.set_access_token("FAKE-ACCESS-TOKEN")
+    helper = getattr(getattr(buildkite, resource)(), method)
+    with pytest.raises(TypeError, match="synchronous Buildkite client"):
+        helper(*args)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"write_to": io.BytesIO()}, {"normaliser": LogNormaliser()}],
+)
+def test_async_job_log_rejects_writing_and_normalising(options):
+    """
+    Test that logs are only written or normalised with the sync client
+    """
+    buildkite = AsyncBuildkite()
+    buildkite.set_access_token("FAKE-ACCESS-TOKEN")
+    with pytest.raises(TypeError, match="synchronous Buildkite client"):
+        buildkite.jobs().get_job_log("org", "pipe", 1, "job", **options)
+
+
+def test_async_job_log_stream(local_server):
+    """
+    Test that a job log can be streamed with the async client
+    """
+    local_server.route(
+        "/organizations/org/pipelines/pipe/builds/1/jobs/job/log",
+        b"log output",
+        headers={"Content-Type": "text/plain"},
+    )
+
+    async def run():
+        async with async_buildkite(local_server) as buildkite:
+            chunks = await buildkite.jobs().get_job_log(
+                "org", "pipe", 1, "job", LogFormat.TEXT, as_stream=True
+            )
+            return b"".join([chunk async for chunk in chunks])
+
+    assert asyncio.run(run()) == b"log output"
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 from pybuildkite.buildkite import (
     Buildkite,
@@ -14,6 +16,7 @@ from pybuildkite.buildkite import (
     Meta,
 )
 from pybuildkite.exceptions import NoAcccessTokenException
+from pybuildkite.logs import LogCache, LogSearch
 
 
 def test_access_token_not_set_raises_exception():
@@ -52,6 +55,46 @@ def test_buildkite_default_per_page():
     assert buildkite.client.per_page == 100
 
 
+def test_buildkite_pool_settings_are_passed_to_client():
+    """
+    Test that the connection pool settings are passed to the client
+    """
+    buildkite = Buildkite(pool_maxsize=32, keep_alive=False)
+    assert buildkite.client.pool_maxsize == 32
+    assert buildkite.client.keep_alive is False
+
+
+def test_resources_share_the_client():
+    """
+    Test that every resource shares the connection pool of the Buildkite client
+    """
+    buildkite = Buildkite()
+    buildkite.set_access_token("FAKE-ACCESS-TOKEN")
+    assert buildkite.builds().client is buildkite.client
+    assert buildkite.jobs().client.session is buildkite.client.session
+
+
+def test_jobs_use_the_log_cache(tmp_path):
+    """
+    Test that the log cache given to the Buildkite object is used by its job resources
+    """
+    log_cache = LogCache(str(tmp_path))
+    buildkite = Buildkite(log_cache=log_cache)
+    buildkite.set_access_token("FAKE-ACCESS-TOKEN")
+    assert buildkite.jobs().log_cache is log_cache
+
+
+def test_buildkite_closes_client_on_exit():
+    """
+    Test that the Buildkite object closes its client when used as a context manager
+    """
+    with patch("pybuildkite.client.Client.close") as close:
+        with Buildkite() as buildkite:
+            assert isinstance(buildkite, Buildkite)
+
+    close.assert_called_once_with()
+
+
 @pytest.mark.parametrize(
     "function, expected_type",
     [
@@ -66,6 +109,7 @@ def test_buildkite_default_per_page():
         (Buildkite().annotations, Annotations),
         (Buildkite().organizations, Organizations),
         (Buildkite().meta, Meta),
+        (Buildkite().log_search, LogSearch),
     ],
 )
 def test_eval(function, expected_type):
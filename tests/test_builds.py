@@ -1,8 +1,11 @@
 import datetime
+import time
 
 import pytest
 
 from pybuildkite.builds import Builds, BuildState
+from pybuildkite.client import Response
+from pybuildkite.query import encode_query_params
 from pybuildkite.exceptions import (
     BuildStateNotAList,
     NotValidBuildState,
@@ -20,13 +23,16 @@ def test_list_all_builds_single_build_state(fake_client):
             "created_from": None,
             "created_to": None,
             "finished_from": None,
-            "state": "state=running",
+            "state": "running",
             "branch": None,
             "commit": None,
             "include_retried_jobs": None,
             "page": 0,
         },
         with_pagination=False,
+        as_stream=False,
+        fields=None,
+        model=None,
     )
 
 
@@ -40,13 +46,16 @@ def test_list_all_builds_multiple_build_states(fake_client):
             "created_from": None,
             "created_to": None,
             "finished_from": None,
-            "state": "state[]=running&state[]=finished",
+            "state": ["running", "finished"],
             "branch": None,
             "commit": None,
             "include_retried_jobs": None,
             "page": 0,
         },
         with_pagination=False,
+        as_stream=False,
+        fields=None,
+        model=None,
     )
 
 
@@ -107,6 +116,9 @@ def test_list_all_builds_for_org(fake_client):
             "page": 0,
         },
         with_pagination=False,
+        as_stream=False,
+        fields=None,
+        model=None,
     )
 
 
@@ -127,6 +139,9 @@ def test_list_all_for_pipeline(fake_client):
             "page": 0,
         },
         with_pagination=False,
+        as_stream=False,
+        fields=None,
+        model=None,
     )
 
 
@@ -136,6 +151,8 @@ def test_get_build_by_number(fake_client):
     fake_client.get.assert_called_with(
         builds.path_for_build_number.format("org_slug", "pipeline_id", "build_number"),
         query_params={"include_retried_jobs": None},
+        fields=None,
+        model=None,
     )
 
 
@@ -147,6 +164,8 @@ def test_get_build_by_number_with_retried_jobs(fake_client):
     fake_client.get.assert_called_with(
         builds.path_for_build_number.format("org_slug", "pipeline_id", "build_number"),
         query_params={"include_retried_jobs": True},
+        fields=None,
+        model=None,
     )
 
 
@@ -225,7 +244,7 @@ def test_multi_branch(fake_client):
     )
 
     args = fake_client.get.call_args[0][1]
-    assert args["branch"] == "branch[]=main&branch[]=master"
+    assert args["branch"] == ["main", "master"]
 
 
 def test_single_branch(fake_client):
@@ -235,7 +254,7 @@ def test_single_branch(fake_client):
     builds.list_all_for_pipeline(organization="org", pipeline="pipe", branch="main")
 
     args = fake_client.get.call_args[0][1]
-    assert args["branch"] == "branch=main"
+    assert args["branch"] == "main"
 
 
 def test_branch_with_special_characters(fake_client):
@@ -244,4 +263,176 @@ def test_branch_with_special_characters(fake_client):
     builds.list_all_for_pipeline(organization="org", pipeline="pipe", branch=branch_name)
     args = fake_client.get.call_args[0][1]
     # '#' should be encoded as '%23'
-    assert args["branch"] == "branch=feature%23123"
+    assert "branch=feature%23123" in encode_query_params(args)
+
+
+def test_iter_all_for_org(fake_client):
+    first_page = Response([{"number": 2}])
+    first_page.next_page = 2
+    fake_client.get.side_effect = [first_page, Response([{"number": 1}])]
+    builds = Builds(fake_client, "https://api.buildkite.com/v2/")
+
+    result = builds.iter_all_for_org("org_slug", branch="main")
+
+    assert list(result) == [{"number": 2}, {"number": 1}]
+    path, query_params = fake_client.get.call_args[0]
+    assert path == builds.path_by_org.format("org_slug")
+    assert query_params["page"] == 2
+    assert query_params["branch"] == "main"
+    assert fake_client.get.call_args[1] == {
+        "with_pagination": True,
+        "as_stream": False,
+        "fields": None,
+        "model": None,
+    }
+
+
+def test_scan_all_for_org_merges_windows_newest_first(fake_client):
+    created = {
+        "2023-01-03T00:00:00Z": [{"id": "c", "number": 3}],
+        "2023-01-02T00:00:00Z": [{"id": "b", "number": 2}, {"id": "b", "number": 2}],
+        "2023-01-01T00:00:00Z": [{"id": "b", "number": 2}, {"id": "a", "number": 1}],
+    }
+
+    def get(path, query_params, **kwargs):
+        return Response(created[query_params["created_from"]])
+
+    fake_client.get.side_effect = get
+    builds = Builds(fake_client, "https://api.buildkite.com/v2/")
+
+    result = builds.scan_all_for_org(
+        "org_slug",
+        datetime.date(2023, 1, 1),
+        datetime.date(2023, 1, 4),
+        branch="main",
+    )
+
+    assert [build["number"] for build in result] == [3, 2, 1]
+    windows = sorted(
+        (call[0][1]["created_from"], call[0][1]["created_to"])
+        for call in fake_client.get.call_args_list
+    )
+    assert windows == [
+        ("2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"),
+        ("2023-01-02T00:00:00Z", "2023-01-03T00:00:00Z"),
+        ("2023-01-03T00:00:00Z", "2023-01-04T00:00:00Z"),
+    ]
+    assert fake_client.get.call_args[0][1]["branch"] == "main"
+
+
+def test_scan_all_for_org_scans_up_to_now_in_utc(fake_client, monkeypatch):
+    monkeypatch.setenv("TZ", "America/Los_Angeles")
+    time.tzset()
+    try:
+        fake_client.get.return_value = Response([])
+        builds = Builds(fake_client, "https://api.buildkite.com/v2/")
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+        list(
+            builds.scan_all_for_org(
+                "org_slug",
+                now - datetime.timedelta(hours=12),
+                window=datetime.timedelta(days=1),
+            )
+        )
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    created_to = datetime.datetime.strptime(
+        fake_client.get.call_args[0][1]["created_to"], "%Y-%m-%dT%H:%M:%SZ"
+    )
+    assert abs(created_to - now) < datetime.timedelta(minutes=1)
+
+
+def test_scan_all_for_org_converts_aware_bounds_to_utc(fake_client):
+    fake_client.get.return_value = Response([])
+    builds = Builds(fake_client, "https://api.buildkite.com/v2/")
+    pacific = datetime.timezone(datetime.timedelta(hours=-8))
+
+    list(
+        builds.scan_all_for_org(
+            "org_slug",
+            datetime.datetime(2023, 1, 1, 16, tzinfo=pacific),
+            datetime.datetime(2023, 1, 2, 16, tzinfo=pacific),
+        )
+    )
+
+    query_params = fake_client.get.call_args[0][1]
+    assert query_params["created_from"] == "2023-01-02T00:00:00Z"
+    assert query_params["created_to"] == "2023-01-03T00:00:00Z"
+
+
+def test_scan_all_for_org_limits_and_validates(fake_client):
+    fake_client.get.return_value = Response([{"id": "a"}, {"id": "b"}])
+    builds = Builds(fake_client, "https://api.buildkite.com/v2/")
+    start = datetime.datetime(2023, 1, 1)
+    end = datetime.datetime(2023, 1, 1, 12)
+
+    result = builds.scan_all_for_org(
+        "org_slug", start, end, window=datetime.timedelta(hours=5), max_items=3
+    )
+    assert len(list(result)) == 3
+
+    with pytest.raises(NotValidDateTime):
+        builds.scan_all_for_org("org_slug", "2023-01-01")
+    with pytest.raises(ValueError):
+        builds.scan_all_for_org("org_slug", start, window=datetime.timedelta(0))
+
+
+def test_cancel_matching_lists_before_cancelling(fake_client):
+    fake_client.get.return_value = Response(
+        [
+            {"number": 2, "pipeline": {"slug": "a"}},
+            {"number": 1, "pipeline": {"slug": "b"}},
+        ]
+    )
+    fake_client.put.side_effect = [{"state": "canceling"}, ValueError("422")]
+    builds = Builds(fake_client, "https://api.buildkite.com/v2/")
+    progress = []
+
+    dry_run = builds.cancel_matching("org_slug", branch="feature", dry_run=True)
+    assert [build["number"] for build in dry_run] == [2, 1]
+    fake_client.put.assert_not_called()
+
+    results = builds.cancel_matching(
+        "org_slug",
+        branch="feature",
+        workers=1,
+        on_progress=lambda done, total, result: progress.append((done, total)),
+    )
+
+    assert fake_client.get.call_args[0][1]["state"] == [
+        "scheduled",
+        "running",
+        "failing",
+    ]
+    assert [call[0][0] for call in fake_client.put.call_args_list] == [
+        builds.path_for_build_number.format("org_slug", "a", 2) + "/cancel",
+        builds.path_for_build_number.format("org_slug", "b", 1) + "/cancel",
+    ]
+    assert results[0].result == {"state": "canceling"}
+    assert isinstance(results[1].error, ValueError)
+    assert progress == [(1, 2), (2, 2)]
+
+
+def test_rebuild_matching_for_pipeline(fake_client):
+    fake_client.get.return_value = Response([{"number": 7}])
+    builds = Builds(fake_client, "https://api.buildkite.com/v2/")
+
+    results = builds.rebuild_matching(
+        "org_slug", "pipeline_id", states=[BuildState.FAILED], fields=["state"]
+    )
+
+    assert fake_client.get.call_args[0][0] == builds.path_by_pipeline.format(
+        "org_slug", "pipeline_id"
+    )
+    assert fake_client.get.call_args[1]["fields"] == [
+        "state",
+        "number",
+        "pipeline.slug",
+    ]
+    fake_client.put.assert_called_once_with(
+        builds.path_for_build_number.format("org_slug", "pipeline_id", 7) + "/rebuild"
+    )
+    assert results[0].ok
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import requests
+
+from pybuildkite.builds import Builds
+from pybuildkite.bulk import BulkResult, run_bulk
+
+
+def http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.HTTPError(response=response)
+
+
+def test_run_bulk_keeps_order_and_collects_errors():
+    def func(item):
+        if item == 2:
+            raise ValueError("bad item")
+        return item * 10
+
+    results = run_bulk(func, [1, 2, 3], workers=3)
+
+    assert [result.item for result in results] == [1, 2, 3]
+    assert results[0] == BulkResult(1, 10, None)
+    assert results[0].ok
+    assert not results[1].ok
+    assert isinstance(results[1].error, ValueError)
+    assert results[2].result == 30
+
+
+def test_run_bulk_runs_items_concurrently():
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def func(item):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return item
+
+    results = run_bulk(func, range(8), workers=4)
+
+    assert [result.result for result in results] == list(range(8))
+    assert peak[0] == 4
+
+
+def test_run_bulk_reports_progress():
+    progress = []
+
+    run_bulk(
+        lambda item: item, ["a", "b"], on_progress=lambda *args: progress.append(args)
+    )
+
+    assert progress == [
+        (1, 2, BulkResult("a", "a", None)),
+        (2, 2, BulkResult("b", "b", None)),
+    ]
+
+
+def test_create_builds(fake_client):
+    fake_client.post.side_effect = [{"number": 1}, http_error(422)]
+    builds = Builds(fake_client, "https://api.buildkite.com/v2/")
+
+    results = builds.create_builds(
+        [
+            {"organization": "org", "pipeline": "a", "commit": "sha", "branch": "main"},
+            {"organization": "org", "pipeline": "b", "commit": "sha", "branch": "main"},
+        ],
+        workers=1,
+    )
+
+    assert results[0].result == {"number": 1}
+    assert results[1].error.response.status_code == 422
+    assert fake_client.post.call_args_list[1][0][0] == (
+        "https://api.buildkite.com/v2/organizations/org/pipelines/b/builds"
+    )
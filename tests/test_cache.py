@@ -0,0 +1,238 @@
+import asyncio
+
+import pytest
+
+from pybuildkite.buildkite import Buildkite
+from pybuildkite.cache import (
+    CachedResponse,
+    DiskHTTPCache,
+    HTTPCache,
+    MemoryHTTPCache,
+    ResponseCache,
+)
+from pybuildkite.client import Client, Response
+
+
+def etag_route(body, etag='"v1"', link=None):
+    """
+    Answer 304 when the request carries the current ETag
+    """
+
+    def respond(request):
+        if request.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b""
+        headers = {"Content-Type": "application/json", "ETag": etag}
+        if link:
+            headers["Link"] = link
+        return 200, headers, body
+
+    return respond
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryHTTPCache(max_entries=2)
+    cache.set("a", CachedResponse('"a"', None, 1, None))
+    cache.set("b", CachedResponse('"b"', None, 2, None))
+    assert cache.get("a").body == 1
+    cache.set("c", CachedResponse('"c"', None, 3, None))
+    assert cache.get("b") is None
+    assert cache.get("a").body == 1
+    assert len(cache) == 2
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = DiskHTTPCache(str(tmp_path / "cache"))
+    cached_response = CachedResponse(
+        '"v1"', "Wed, 21 Oct 2015 07:28:00 GMT", {"a": [1]}, None
+    )
+    cache.set("key", cached_response)
+    assert DiskHTTPCache(str(tmp_path / "cache")).get("key") == cached_response
+    assert cache.get("other") is None
+
+
+def test_validators_are_added_to_a_copy_of_the_headers():
+    headers = {"Accept": "application/json"}
+    cached_response = CachedResponse('"v1"', "yesterday", None, None)
+    assert MemoryHTTPCache.add_validators(headers, cached_response) == {
+        "Accept": "application/json",
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "yesterday",
+    }
+    assert headers == {"Accept": "application/json"}
+    assert MemoryHTTPCache.add_validators(headers, None) == headers
+
+
+@pytest.mark.parametrize("make_cache", [MemoryHTTPCache, DiskHTTPCache])
+def test_client_reuses_body_on_not_modified(local_server, tmp_path, make_cache):
+    cache = make_cache(str(tmp_path)) if make_cache is DiskHTTPCache else make_cache()
+    local_server.routes["/pipeline"] = etag_route(b'{"slug": "pipe"}')
+    client = Client(http_cache=cache)
+    client.set_client_access_token("TOKEN")
+
+    assert client.get(local_server.url + "pipeline") == {"slug": "pipe"}
+    assert client.get(local_server.url + "pipeline") == {"slug": "pipe"}
+
+    assert "If-None-Match" not in local_server.requests[0].headers
+    assert local_server.requests[1].headers["If-None-Match"] == '"v1"'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_keeps_pagination_data(local_server):
+    link = '<{}builds?page=2&per_page=100>; rel="next"'.format(local_server.url)
+    local_server.routes["/builds"] = etag_route(b"[1]", link=link)
+    client = Client(http_cache=MemoryHTTPCache())
+
+    client.get(local_server.url + "builds", with_pagination=True)
+    response = client.get(local_server.url + "builds", with_pagination=True)
+
+    assert isinstance(response, Response)
+    assert response.body == [1]
+    assert response.next_page == 2
+
+
+def test_cache_entries_are_per_query_and_token(local_server):
+    local_server.routes["/builds"] = etag_route(b"[1]")
+    cache = MemoryHTTPCache()
+    client = Client(http_cache=cache)
+
+    client.get(local_server.url + "builds", {"page": 1})
+    client.get(local_server.url + "builds", {"page": 2})
+    client.set_client_access_token("OTHER")
+    client.get(local_server.url + "builds", {"page": 1})
+
+    assert len(cache) == 3
+    assert cache.hits == 0
+
+
+def test_responses_without_validators_are_not_cached(local_server):
+    local_server.route("/meta", {"webhook_ips": []})
+    cache = MemoryHTTPCache()
+    client = Client(http_cache=cache)
+    client.get(local_server.url + "meta")
+    assert len(cache) == 0
+
+
+def test_async_client_reuses_body_on_not_modified(local_server):
+    pytest.importorskip("aiohttp")
+    from pybuildkite.async_client import AsyncClient
+
+    local_server.routes["/pipeline"] = etag_route(b'{"slug": "pipe"}')
+    cache = MemoryHTTPCache()
+
+    async def run():
+        async with AsyncClient(http_cache=cache) as client:
+            await client.get(local_server.url + "pipeline")
+            return await client.get(local_server.url + "pipeline")
+
+    assert asyncio.run(run()) == {"slug": "pipe"}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_response_cache_expires_entries_per_resource():
+    clock = FakeClock()
+    cache = ResponseCache(ttls={"teams": 10}, ttl=100, clock=clock)
+    cache.set("teams", CachedResponse(None, None, ["team"], None), "teams", "url/teams")
+    cache.set("other", CachedResponse(None, None, ["x"], None), "other", "url/other")
+    clock.now = 9
+    assert cache.get("teams").body == ["team"]
+    clock.now = 10
+    assert cache.get("teams") is None
+    assert cache.get("other").body == ["x"]
+    assert len(cache) == 1
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    for key in ["a", "b"]:
+        cache.set(key, CachedResponse(None, None, key, None), "meta", key)
+    cache.get("a")
+    cache.set("c", CachedResponse(None, None, "c", None), "meta", "c")
+    assert cache.get("b") is None
+    assert cache.get("a").body == "a"
+
+
+def test_response_cache_invalidation():
+    cache = ResponseCache()
+    cache.set("1", CachedResponse(None, None, 1, None), "teams", "org/teams")
+    cache.set("2", CachedResponse(None, None, 2, None), "emojis", "org/emojis")
+    cache.set("3", CachedResponse(None, None, 3, None), "users", "user")
+    cache.set("4", CachedResponse(None, None, 4, None), "emojis", "org-2/emojis")
+    cache.invalidate("teams")
+    assert cache.get("1") is None
+    cache.invalidate_url("org/")
+    assert cache.get("2") is None
+    assert cache.get("3").body == 3
+    assert cache.get("4").body == 4
+    cache.invalidate_url("user")
+    assert cache.get("3") is None
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_cached_resources_make_no_request(local_server):
+    local_server.route("/access-token", {"uuid": "token"})
+    buildkite = Buildkite(response_cache=ResponseCache())
+    buildkite.base_url = local_server.url
+    buildkite.set_access_token("TOKEN")
+
+    assert buildkite.access_tokens().get_token() == {"uuid": "token"}
+    assert buildkite.access_tokens().get_token() == {"uuid": "token"}
+    assert len(local_server.requests) == 1
+
+    buildkite.invalidate_cache("access_tokens")
+    buildkite.access_tokens().get_token()
+    assert len(local_server.requests) == 2
+
+
+def test_writes_invalidate_cached_urls(local_server):
+    local_server.routes["/access-token"] = lambda request: (
+        (204, {}, b"")
+        if request.method == "DELETE"
+        else (200, {"Content-Type": "application/json"}, b"{}")
+    )
+    buildkite = Buildkite(response_cache=ResponseCache())
+    buildkite.base_url = local_server.url
+    buildkite.set_access_token("TOKEN")
+
+    buildkite.access_tokens().get_token()
+    buildkite.access_tokens().revoke_token()
+    buildkite.access_tokens().get_token()
+    assert [request.method for request in local_server.requests] == [
+        "GET",
+        "DELETE",
+        "GET",
+    ]
+
+
+def test_uncached_resources_skip_the_response_cache(local_server):
+    local_server.route("/organizations/org/pipelines/pipe", {"slug": "pipe"})
+    cache = ResponseCache()
+    buildkite = Buildkite(response_cache=cache)
+    buildkite.base_url = local_server.url
+    buildkite.set_access_token("TOKEN")
+
+    buildkite.pipelines().get_pipeline("org", "pipe")
+    buildkite.pipelines().get_pipeline("org", "pipe")
+    assert len(local_server.requests) == 2
+    assert len(cache) == 0
+
+
+def test_only_cached_resources_take_the_cache_path():
+    client = Client(response_cache=ResponseCache())
+    assert not client._is_cacheable("GET", {}, False, None)
+    assert client._is_cacheable("GET", {}, False, "meta")
+    client = Client(http_cache=MemoryHTTPCache())
+    assert client._is_cacheable("GET", {}, False, None)
+
+
+def test_http_cache_is_abstract():
+    with pytest.raises(TypeError):
+        HTTPCache()  # type: ignore[abstract]
@@ -2,6 +2,7 @@ from unittest.mock import patch
 
 import pytest
 
+from pybuildkite.cache import ResponseCache
 from pybuildkite.client import Client, Response
 
 
@@ -25,7 +26,7 @@ class TestClient:
         """
         client = Client(per_page=50)
         assert client.per_page == 50
-        
+
         # Test default value
         client_default = Client()
         assert client_default.per_page == 100
@@ -36,8 +37,8 @@ class TestClient:
         """
         fake_client = Client(per_page=25)
 
-        with patch("requests.request") as request:
-            request.return_value.json.return_value = {}
+        with patch("requests.Session.request") as request:
+            request.return_value.content = b"{}"
 
             fake_client.request("GET", "http://www.google.com/")
 
@@ -50,6 +51,49 @@ class TestClient:
             stream=False,
         )
 
+    def test_session_is_pooled(self):
+        """
+        Test that the client mounts a connection pool with the given limits
+        """
+        client = Client(pool_connections=4, pool_maxsize=20, pool_block=True)
+        adapter = client.session.get_adapter("https://api.buildkite.com/v2/")
+
+        assert adapter._pool_connections == 4
+        assert adapter._pool_maxsize == 20
+        assert adapter._pool_block is True
+        assert client.session.headers["Connection"] == "keep-alive"
+
+    def test_session_without_keep_alive(self):
+        """
+        Test that connections are closed after each request when keep alive is disabled
+        """
+        client = Client(keep_alive=False)
+        assert client.session.headers["Connection"] == "close"
+
+    def test_requests_reuse_the_same_session(self):
+        """
+        Test that consecutive requests go through the same session
+        """
+        client = Client()
+
+        with patch.object(client.session, "request") as request:
+            request.return_value.content = b"{}"
+
+            client.request("GET", "http://www.google.com/")
+            client.request("GET", "http://www.google.com/")
+
+        assert request.call_count == 2
+
+    def test_client_closes_session_on_exit(self):
+        """
+        Test that the client can be used as a context manager
+        """
+        with patch("requests.Session.close") as close:
+            with Client() as client:
+                assert isinstance(client, Client)
+
+        close.assert_called_once_with()
+
     def test_clean_query_params(self):
         """
         Test that params with None are cleaned
@@ -121,8 +165,8 @@ class TestClientRequest:
         """
         fake_client = Client()
 
-        with patch("requests.request") as request:
-            request.return_value.json.return_value = {}
+        with patch("requests.Session.request") as request:
+            request.return_value.content = b"{}"
 
             fake_client.request("GET", "http://www.google.com/")
 
@@ -141,7 +185,7 @@ class TestClientRequest:
         """
         fake_client = Client()
 
-        with patch("requests.request") as request:
+        with patch("requests.Session.request") as request:
             request.return_value.content = b"response text"
 
             resp = fake_client.request(
@@ -169,7 +213,7 @@ class TestClientRequest:
         """
         fake_client = Client()
 
-        with patch("requests.request") as request:
+        with patch("requests.Session.request") as request:
             request.return_value.iter_content.return_value = [
                 b"response",
                 b" ",
@@ -205,8 +249,8 @@ class TestClientRequest:
         """
         fake_client = Client()
 
-        with patch("requests.request") as request:
-            request.return_value.json.return_value = {"key": "value"}
+        with patch("requests.Session.request") as request:
+            request.return_value.content = b'{"key": "value"}'
 
             resp = fake_client.request(
                 "GET", "http://www.google.com/", headers={"Accept": "application/json"}
@@ -231,8 +275,8 @@ class TestClientRequest:
         """
         fake_client = Client()
 
-        with patch("requests.request") as request:
-            request.return_value.json.return_value = {"key": "value"}
+        with patch("requests.Session.request") as request:
+            request.return_value.content = b'{"key": "value"}'
 
             resp = fake_client.request("GET", "http://www.google.com/")
 
@@ -256,8 +300,8 @@ class TestClientRequest:
         fake_client = Client()
         fake_client.set_client_access_token("ABCDEF1234")
 
-        with patch("requests.request") as request:
-            request.return_value.json.return_value = {"key": "value"}
+        with patch("requests.Session.request") as request:
+            request.return_value.content = b'{"key": "value"}'
 
             resp = fake_client.request("GET", "http://www.google.com/")
 
@@ -272,3 +316,32 @@ class TestClientRequest:
         )
 
         assert resp == {"key": "value"}
+
+    def test_get_response_should_return_the_status_headers_and_bytes(self):
+        """
+        Test that get_response returns the whole response, bypassing the caches
+        """
+        fake_client = Client(response_cache=ResponseCache())
+
+        with patch("requests.Session.request") as request:
+            request.return_value.status_code = 206
+            request.return_value.headers = {"Content-Range": "bytes 5-9/10"}
+            request.return_value.content = b"range"
+
+            resp = fake_client.get_response(
+                "http://www.google.com/", headers={"Range": "bytes=5-"}
+            )
+
+        request.assert_called_once_with(
+            "GET",
+            "http://www.google.com/",
+            headers={"Range": "bytes=5-"},
+            json=None,
+            params=b"per_page=100",
+            stream=False,
+        )
+        assert (resp.body, resp.status_code, resp.headers) == (
+            b"range",
+            206,
+            {"Content-Range": "bytes 5-9/10"},
+        )
@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+from pybuildkite.client import Client
+from pybuildkite.decoding import (
+    DECODERS,
+    JsonArrayParser,
+    get_json_decoder,
+    get_projection,
+    iter_json_array,
+)
+from pybuildkite.models import Build
+
+
+@pytest.mark.parametrize("backend", list(DECODERS))
+def test_backends_decode_the_same(backend):
+    data = b'[{"number": 1, "jobs": [{"state": "passed", "exit_status": 0}], "blocked": false}]'
+    assert get_json_decoder(backend)(data) == json.loads(data)
+
+
+def test_fastest_installed_backend_is_the_default():
+    assert get_json_decoder() is next(iter(DECODERS.values()))
+    assert "json" in DECODERS
+
+
+def test_custom_decoder_and_unknown_backend():
+    decoder = lambda data: "decoded"
+    assert get_json_decoder(decoder) is decoder
+    with pytest.raises(ValueError):
+        get_json_decoder("simdjson")
+
+
+def test_client_decodes_with_the_configured_backend(local_server):
+    local_server.route("/meta", {"webhook_ips": ["1.2.3.4"]})
+    decoded = []
+
+    def decoder(data):
+        decoded.append(data)
+        return json.loads(data)
+
+    client = Client(json_decoder=decoder)
+    assert client.get(local_server.url + "meta") == {"webhook_ips": ["1.2.3.4"]}
+    assert client.get(local_server.url + "meta", with_pagination=True).body == {
+        "webhook_ips": ["1.2.3.4"]
+    }
+    assert len(decoded) == 2
+    assert Client(json_decoder="json").json_decoder is json.loads
+
+
+def test_json_array_items_are_decoded_whatever_the_chunking():
+    document = [
+        {"message": 'quotes \\" and brackets ]}[{, inside strings', "jobs": [{}]},
+        2,
+        "s,]",
+        [],
+        None,
+        "é\\\\",
+    ]
+    data = json.dumps(document, ensure_ascii=False).encode()
+    for size in range(1, len(data) + 1):
+        chunks = [data[i : i + size] for i in range(0, len(data), size)]
+        assert list(iter_json_array(chunks)) == document
+
+
+def test_json_array_parser_only_keeps_the_current_item():
+    parser = JsonArrayParser()
+    assert parser.feed(b'[{"number": 1}, {"number": 2}, {"num') == [
+        {"number": 1},
+        {"number": 2},
+    ]
+    assert len(parser._buffer) < 10
+    assert parser.feed(b'ber": 3}]') == [{"number": 3}]
+    assert parser.close() == []
+
+
+def test_json_values_other_than_arrays_are_decoded_whole():
+    assert list(iter_json_array([b' {"message": ', b'"Not Found"}'])) == [
+        {"message": "Not Found"}
+    ]
+    assert list(iter_json_array([b" [ ] "])) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[{"number": 1}, {']))
+
+
+def test_client_streams_json_items(local_server):
+    builds = [{"number": number, "jobs": [{"id": "x" * 100}]} for number in range(50)]
+    link = '<{}builds?page=2&per_page=100>; rel="next"'.format(local_server.url)
+    local_server.route("/builds", builds, headers={"Link": link})
+    client = Client()
+
+    items = client.get(local_server.url + "builds", as_stream=True)
+    assert next(items) == builds[0]
+    assert list(items) == builds[1:]
+
+    response = client.get(
+        local_server.url + "builds", with_pagination=True, as_stream=True
+    )
+    assert response.next_page == 2
+    assert list(response.body) == builds
+
+
+BUILD: dict = {
+    "number": 1,
+    "state": "passed",
+    "pipeline": {"slug": "pipe", "repository": "git@github.com:org/repo.git"},
+    "jobs": [{"id": "a", "state": "passed", "command": "make"}, {"id": "b"}],
+    "creator": {"name": "Keith"},
+}
+
+
+def test_projection_keeps_listed_paths_only():
+    project = get_projection(["number", "pipeline.slug", "jobs.state", "missing"])
+    assert project(BUILD) == {
+        "number": 1,
+        "pipeline": {"slug": "pipe"},
+        "jobs": [{"state": "passed"}, {}],
+    }
+    assert "command" in BUILD["jobs"][0]
+    assert get_projection(["pipeline", "pipeline.slug"])(BUILD) == {
+        "pipeline": BUILD["pipeline"]
+    }
+
+
+def test_client_projects_fields(local_server):
+    local_server.route("/builds", [BUILD, BUILD])
+    client = Client()
+    url = local_server.url + "builds"
+
+    assert (
+        client.get(url, fields=["number", "pipeline.slug"])
+        == [{"number": 1, "pipeline": {"slug": "pipe"}}] * 2
+    )
+    response = client.get(
+        url, with_pagination=True, as_stream=True, fields=["state"], model=Build
+    )
+    builds = list(response.body)
+    assert builds == [Build({"state": "passed"})] * 2
+    assert builds[0].jobs is None
@@ -1,6 +1,9 @@
 import pytest
+import requests
 
-from pybuildkite.jobs import Jobs, LogFormat
+from pybuildkite.client import Client, Response
+from pybuildkite.jobs import Jobs, JobState, LogFormat
+from pybuildkite.logs import LogCache, LogNormaliser
 
 
 def test_job_logs_can_be_requested_in_a_default_format(fake_client):
@@ -10,7 +13,9 @@ def test_job_logs_can_be_requested_in_a_default_format(fake_client):
     jobs = Jobs(fake_client, "base")
     jobs.get_job_log("org_slug", "pipe_slug", "build_no", 123)
     url = "base/organizations/org_slug/pipelines/pipe_slug/builds/build_no/jobs/123/log"
-    fake_client.get.assert_called_with(url, headers={"Accept": "text/html"})
+    fake_client.get.assert_called_with(
+        url, headers={"Accept": "text/html"}, as_stream=False
+    )
 
 
 def test_job_logs_can_be_requested_in_a_user_specified_format(fake_client):
@@ -20,7 +25,9 @@ def test_job_logs_can_be_requested_in_a_user_specified_format(fake_client):
     jobs = Jobs(fake_client, "base")
     jobs.get_job_log("org_slug", "pipe_slug", "build_no", 123, "some/thing")
     url = "base/organizations/org_slug/pipelines/pipe_slug/builds/build_no/jobs/123/log"
-    fake_client.get.assert_called_with(url, headers={"Accept": "some/thing"})
+    fake_client.get.assert_called_with(
+        url, headers={"Accept": "some/thing"}, as_stream=False
+    )
 
 
 def test_job_logs_can_be_requested_in_a_predefined_format(fake_client):
@@ -30,7 +37,43 @@ def test_job_logs_can_be_requested_in_a_predefined_format(fake_client):
     jobs = Jobs(fake_client, "base")
     jobs.get_job_log("org_slug", "pipe_slug", "build_no", 123, LogFormat.TEXT)
     url = "base/organizations/org_slug/pipelines/pipe_slug/builds/build_no/jobs/123/log"
-    fake_client.get.assert_called_with(url, headers={"Accept": "text/plain"})
+    fake_client.get.assert_called_with(
+        url, headers={"Accept": "text/plain"}, as_stream=False
+    )
+
+
+def test_json_job_logs_are_returned_parsed(fake_client):
+    """
+    Test JSON job logs are returned parsed
+    """
+    fake_client.get.return_value = {"output": "log"}
+    jobs = Jobs(fake_client, "base")
+
+    log = jobs.get_job_log("org_slug", "pipe_slug", "build_no", 123, LogFormat.JSON)
+
+    assert log == {"output": "log"}
+    fake_client.get.assert_called_with(
+        jobs.path.format("org_slug", "pipe_slug", "build_no", 123) + "/log",
+        headers={"Accept": "application/json"},
+        as_stream=False,
+    )
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"as_stream": True}, {"write_to": "log.json"}, {"normaliser": LogNormaliser()}],
+)
+def test_json_job_logs_cannot_be_streamed(fake_client, options):
+    """
+    Test JSON job logs can't be streamed, written or normalised
+    """
+    jobs = Jobs(fake_client, "base")
+
+    with pytest.raises(ValueError):
+        jobs.get_job_log(
+            "org_slug", "pipe_slug", "build_no", 123, LogFormat.JSON, **options
+        )
+    fake_client.get.assert_not_called()
 
 
 def test_log_format_can_be_nicely_printed_like_a_string():
@@ -71,3 +114,153 @@ def test_delete_job_log(fake_client):
     fake_client.delete.assert_called_with(
         jobs.path.format("org_slug", "pipe_slug", "build_no", 123) + "/log"
     )
+
+
+def test_deleting_a_job_log_removes_it_from_the_log_cache(fake_client, tmp_path):
+    log_cache = LogCache(str(tmp_path))
+    for log_format in ("text/plain", "text/html"):
+        b"".join(log_cache.store("org", "pipe", 1, 123, log_format, [b"log"]))
+    b"".join(log_cache.store("org", "pipe", 1, 124, "text/plain", [b"other"]))
+    jobs = Jobs(fake_client, "base", log_cache=log_cache)
+
+    jobs.delete_job_log("org", "pipe", 1, 123)
+
+    assert log_cache.get("org", "pipe", 1, 123, "text/plain") is None
+    assert log_cache.get("org", "pipe", 1, 123, "text/html") is None
+    assert log_cache.get("org", "pipe", 1, 124, "text/plain") == b"other"
+
+
+def test_job_log_stays_cached_when_the_delete_fails(fake_client, tmp_path):
+    log_cache = LogCache(str(tmp_path))
+    b"".join(log_cache.store("org", "pipe", 1, 123, "text/plain", [b"log"]))
+    fake_client.delete.side_effect = requests.HTTPError("403")
+    jobs = Jobs(fake_client, "base", log_cache=log_cache)
+
+    with pytest.raises(requests.HTTPError):
+        jobs.delete_job_log("org", "pipe", 1, 123)
+
+    assert log_cache.get("org", "pipe", 1, 123, "text/plain") == b"log"
+
+
+def test_job_log_can_be_streamed(fake_client):
+    fake_client.get.return_value = iter([b"first line\nsec", b"ond line\n", b"last"])
+    jobs = Jobs(fake_client, "base")
+
+    lines = jobs.iter_job_log("org_slug", "pipe_slug", "build_no", 123, lines=True)
+
+    assert list(lines) == [b"first line\n", b"second line\n", b"last"]
+    fake_client.get.assert_called_with(
+        jobs.path.format("org_slug", "pipe_slug", "build_no", 123) + "/log",
+        headers={"Accept": "text/plain"},
+        as_stream=True,
+    )
+
+
+def test_job_log_can_be_written_to_a_file(local_server, tmp_path):
+    log = b"".join(b"line %d\n" % number for number in range(10000))
+    local_server.route(
+        "/organizations/org/pipelines/pipe/builds/1/jobs/123/log",
+        log,
+        headers={"Content-Type": "text/plain"},
+    )
+    jobs = Jobs(Client(), local_server.url)
+
+    written = jobs.get_job_log(
+        "org", "pipe", 1, 123, LogFormat.TEXT, write_to=tmp_path / "job.log"
+    )
+
+    assert written == len(log)
+    assert (tmp_path / "job.log").read_bytes() == log
+
+
+def test_get_job_state(fake_client):
+    fake_client.get.return_value = {
+        "jobs": [{"id": 122}, {"id": 123, "state": "passed"}]
+    }
+    jobs = Jobs(fake_client, "base")
+
+    assert jobs.get_job_state("org_slug", "pipe_slug", "build_no", 123) == "passed"
+    assert jobs.get_job_state("org_slug", "pipe_slug", "build_no", 124) is None
+    fake_client.get.assert_called_with(
+        "base/organizations/org_slug/pipelines/pipe_slug/builds/build_no",
+        query_params={"include_retried_jobs": True},
+        fields=["jobs.id", "jobs.state"],
+    )
+
+
+def test_follow_job_log_in_lines(fake_client):
+    fake_client.get_response.side_effect = [
+        Response(b"first\nsec", 200, {}),
+        Response(b"first\nsecond\n", 200, {}),
+        Response(b"first\nsecond\n", 200, {}),
+        Response(b"first\nsecond\n", 200, {}),
+    ]
+    fake_client.get.return_value = {"jobs": [{"id": 123, "state": "failed"}]}
+    jobs = Jobs(fake_client, "base")
+
+    lines = jobs.follow_job_log(
+        "org_slug", "pipe_slug", "build_no", 123, lines=True, sleep=lambda _: None
+    )
+
+    assert list(lines) == [b"first\n", b"second\n"]
+    fake_client.get_response.assert_called_with(
+        "base/organizations/org_slug/pipelines/pipe_slug/builds/build_no/jobs/123/log",
+        headers={"Accept": "text/plain", "Range": "bytes=13-"},
+    )
+
+
+def test_logs_of_finished_jobs_are_cached(fake_client, tmp_path):
+    fake_client.get.side_effect = [
+        {"jobs": [{"id": 123, "state": "running"}]},
+        b"partial log",
+        {"jobs": [{"id": 123, "state": "passed"}]},
+        iter([b"full ", b"log"]),
+    ]
+    jobs = Jobs(fake_client, "base", log_cache=LogCache(str(tmp_path)))
+
+    assert jobs.get_job_log("org", "pipe", 1, 123) == b"partial log"
+    assert jobs.get_job_log("org", "pipe", 1, 123) == b"full log"
+    assert jobs.get_job_log("org", "pipe", 1, 123) == b"full log"
+    assert list(jobs.get_job_log("org", "pipe", 1, 123, as_stream=True)) == [
+        b"full log"
+    ]
+    jobs.get_job_log("org", "pipe", 1, 123, write_to=tmp_path / "job.log")
+
+    assert (tmp_path / "job.log").read_bytes() == b"full log"
+    assert fake_client.get.call_count == 4
+
+
+def test_known_job_states_are_not_looked_up_before_caching(fake_client, tmp_path):
+    fake_client.get.side_effect = [b"running log", iter([b"full log"])]
+    jobs = Jobs(fake_client, "base", log_cache=LogCache(str(tmp_path)))
+
+    assert jobs.get_job_log("org", "pipe", 1, 123, job_state="running") == (
+        b"running log"
+    )
+    lines = jobs.iter_job_log("org", "pipe", 1, 123, job_state=JobState.PASSED)
+    assert list(lines) == [b"full log"]
+    assert jobs.get_job_log("org", "pipe", 1, 123, LogFormat.TEXT) == b"full log"
+    assert fake_client.get.call_count == 2
+
+
+def test_job_log_can_be_normalised(fake_client):
+    fake_client.get.side_effect = lambda *args, **kwargs: iter(
+        [b"\x1b_bk;t=1700000000123\x07\x1b[31mfailed\x1b[0m\n", b"done\n"]
+    )
+    jobs = Jobs(fake_client, "base")
+
+    log = jobs.get_job_log(
+        "org", "pipe", 1, 123, LogFormat.TEXT, normaliser=LogNormaliser()
+    )
+    lines = jobs.iter_job_log(
+        "org",
+        "pipe",
+        1,
+        123,
+        lines=True,
+        normaliser=LogNormaliser(timestamps="extract"),
+    )
+
+    assert log == b"failed\ndone\n"
+    assert list(lines) == [(1700000000123, b"failed\n"), (None, b"done\n")]
+    assert fake_client.get.call_args[1]["as_stream"] is True
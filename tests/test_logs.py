@@ -0,0 +1,280 @@
+import io
+import json
+import os
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from pybuildkite.client import Client, Response
+from pybuildkite.jobs import Jobs
+from pybuildkite.logs import (
+    SEARCH_FIELDS,
+    LogCache,
+    LogFollower,
+    LogLine,
+    LogNormaliser,
+    LogSearch,
+    iter_lines,
+    write_chunks,
+)
+
+
+@pytest.mark.parametrize(
+    "chunks, expected",
+    [
+        ([], []),
+        ([b"a\nb\n"], [b"a\n", b"b\n"]),
+        ([b"a", b"b", b"c\n", b"d"], [b"abc\n", b"d"]),
+        ([b"\n\n", b"", b"a\r\n"], [b"\n", b"\n", b"a\r\n"]),
+    ],
+)
+def test_iter_lines(chunks, expected):
+    assert list(iter_lines(chunks)) == expected
+
+
+def test_write_chunks_to_a_file_object():
+    file = io.BytesIO()
+    assert write_chunks([b"ab", b"c"], file) == 3
+    assert file.getvalue() == b"abc"
+
+
+class GrowingLog:
+    """
+    Log of a running job, growing by one part per request
+    """
+
+    def __init__(self, parts, honour_range=True):
+        self.parts = list(parts)
+        self.log = b""
+        self.honour_range = honour_range
+        self.state = "running"
+
+    def __call__(self, request):
+        if self.parts:
+            self.log += self.parts.pop(0)
+        if not self.parts:
+            self.state = "passed"
+        headers = {"Content-Type": "text/plain"}
+        ranged = request.headers.get("Range")
+        if ranged is None or not self.honour_range:
+            return 200, headers, self.log
+        start = int(ranged[len("bytes=") : -1])
+        if start >= len(self.log):
+            return 416, headers, b""
+        headers["Content-Range"] = "bytes {}-{}/{}".format(
+            start, len(self.log) - 1, len(self.log)
+        )
+        return 206, headers, self.log[start:]
+
+
+@pytest.mark.parametrize("honour_range", [True, False])
+def test_log_follower_returns_only_new_bytes(local_server, honour_range):
+    log = GrowingLog([b"one\n", b"", b"two\nthr", b"ee\n"], honour_range)
+    local_server.routes["/organizations/org/pipelines/pipe/builds/1/jobs/j1/log"] = log
+    local_server.routes["/organizations/org/pipelines/pipe/builds/1"] = lambda _: (
+        200,
+        {"Content-Type": "application/json"},
+        json.dumps({"jobs": [{"id": "j1", "state": log.state}]}).encode(),
+    )
+    sleeps: list = []
+    follower = LogFollower(
+        Jobs(Client(), local_server.url), "org", "pipe", 1, "j1", sleep=sleeps.append
+    )
+
+    assert list(follower.follow()) == [b"one\n", b"two\nthr", b"ee\n"]
+    assert follower.finished
+    assert follower.offset == len(log.log)
+    if honour_range:
+        assert follower.bytes_received == len(log.log)
+    assert sleeps == [1, 1.5, 1, 1]
+
+
+def test_log_follower_checks_the_job_state_only_without_new_bytes():
+    jobs = Mock(path="jobs/{}/{}/{}/{}")
+    jobs.get_job_state.return_value = "passed"
+    jobs.client.get_response.side_effect = [
+        Response(b"a\nb", 200, {}),
+        Response(b"a\nb", 200, {}),
+        Response(b"a\nb\nc\n", 200, {}),
+    ]
+
+    follower = LogFollower(jobs, "org", "pipe", 1, "j1", sleep=Mock())
+
+    assert list(iter_lines(follower.follow())) == [b"a\n", b"b\n", b"c\n"]
+    jobs.get_job_state.assert_called_once_with("org", "pipe", 1, "j1")
+
+
+@pytest.fixture(params=["gzip", "zstd"])
+def compression(request):
+    if request.param == "zstd":
+        pytest.importorskip("zstandard")
+    return request.param
+
+
+def test_log_cache_round_trip(tmp_path, compression):
+    cache = LogCache(str(tmp_path), compression=compression)
+    log = b"".join(b"step %d passed\n" % number for number in range(5000))
+    key = ("org", "pipe", 1, "j1", "text/plain")
+
+    assert cache.get(*key) is None
+    assert b"".join(cache.store(*key, [log[:100], log[100:]])) == log
+
+    assert cache.get(*key) == log
+    assert cache.get("org", "pipe", 1, "j1", "text/html") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 1
+    assert cache.size < len(log) / 4
+
+
+def test_log_cache_streams_logs(tmp_path, compression):
+    cache = LogCache(str(tmp_path), compression=compression)
+    log = os.urandom(50000)
+    key = ("org", "pipe", 1, "j1", "text/plain")
+    b"".join(cache.store(*key, [log]))
+
+    chunks = cache.iter_chunks(*key, chunk_size=16384)
+    assert next(chunks) == log[:16384]
+    chunks.close()
+
+    assert [len(chunk) for chunk in cache.iter_chunks(*key, chunk_size=16384)] == [
+        16384,
+        16384,
+        16384,
+        848,
+    ]
+    assert cache.iter_chunks("org", "pipe", 1, "j2", "text/plain") is None
+
+
+def test_log_cache_drops_incomplete_logs(tmp_path):
+    cache = LogCache(str(tmp_path), compression="gzip")
+    chunks = cache.store("org", "pipe", 1, "j1", "text/plain", [b"a", b"b"])
+
+    assert next(chunks) == b"a"
+    chunks.close()
+
+    assert cache.get("org", "pipe", 1, "j1", "text/plain") is None
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_log_cache_evicts_least_recently_used(tmp_path):
+    cache = LogCache(str(tmp_path), compression="gzip")
+    for job in ("j1", "j2", "j3"):
+        list(cache.store("org", "pipe", 1, job, "text/plain", [os.urandom(1000)]))
+    for age, job in enumerate(("j3", "j1", "j2")):
+        os.utime(cache._path("org", "pipe", 1, job, "text/plain"), (age, age))
+    cache.get("org", "pipe", 1, "j3", "text/plain")
+
+    cache.max_size = cache.size - 1
+    cache._evict()
+
+    assert cache.get("org", "pipe", 1, "j1", "text/plain") is None
+    assert cache.get("org", "pipe", 1, "j2", "text/plain") is not None
+    assert cache.get("org", "pipe", 1, "j3", "text/plain") is not None
+
+
+def test_log_cache_rejects_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        LogCache(str(tmp_path), compression="lz4")
+
+
+def search_fixture(logs):
+    builds = Mock()
+    builds.iter_all_for_org.return_value = [
+        {
+            "number": number,
+            "pipeline": {"slug": "pipe"},
+            "jobs": [{"id": job, "type": "script", "state": "passed"} for job in jobs]
+            + [{"type": "waiter"}],
+        }
+        for number, jobs in ((2, ["j3"]), (1, ["j1", "j2"]))
+    ]
+    jobs = Mock()
+    jobs.iter_job_log.side_effect = lambda org, pipeline, build, job, **options: iter(
+        logs[job]
+    )
+    return builds, jobs
+
+
+def test_log_search_returns_matches_with_context():
+    builds, jobs = search_fixture(
+        {
+            "j1": [b"setup\n", b"Error: one\n", b"retry\n", b"Error: two\n"],
+            "j2": [b"all good\n"],
+            "j3": [b"Error: three\r\n", b"teardown\n"],
+        }
+    )
+    search = LogSearch(builds, jobs, workers=2, context=1)
+
+    matches = list(search.search("org", r"Error: \w+", branch="main"))
+
+    assert sorted((m.build["number"], m.job["id"], m.line_number) for m in matches) == [
+        (1, "j1", 2),
+        (1, "j1", 4),
+        (2, "j3", 1),
+    ]
+    first = next(m for m in matches if m.line_number == 2)
+    assert (first.before, first.line, first.after) == (
+        ["setup"],
+        "Error: one",
+        ["retry"],
+    )
+    builds.iter_all_for_org.assert_called_once_with(
+        "org", branch="main", fields=SEARCH_FIELDS
+    )
+    jobs.iter_job_log.assert_any_call(
+        "org", "pipe", 1, "j1", lines=True, job_state="passed"
+    )
+
+
+def test_log_search_stops_after_max_hits_and_records_errors():
+    failing = requests.HTTPError("404")
+    builds, jobs = search_fixture({"j1": [b"hit\n"] * 1000, "j2": [b"hit\n"]})
+    jobs.iter_job_log.side_effect = [failing, iter([b"hit\n"] * 1000), iter([b"hit\n"])]
+    search = LogSearch(builds, jobs, workers=1, max_hits=3)
+
+    matches = list(search.search("org", "hit"))
+
+    assert [match.line_number for match in matches] == [1, 2, 3]
+    assert search.errors == [
+        (
+            builds.iter_all_for_org.return_value[0],
+            {"id": "j3", "type": "script", "state": "passed"},
+            failing,
+        )
+    ]
+
+
+RAW_LOG = (
+    b"\x1b_bk;t=1700000000123\x07\x1b[1;32mStep\x1b[0m started\n"
+    b"\x1b_bk;t=1700000000456\x07\x1b]1339;url=https://example.com\x07link\x1b(B\n"
+    b"no marker\r\n"
+    b"\x1b_bk;t=1700000000789\x07last"
+)
+
+
+@pytest.mark.parametrize("split", range(0, len(RAW_LOG), 7))
+def test_log_normaliser_is_independent_of_chunking(split):
+    chunks = [RAW_LOG[:split], RAW_LOG[split:]]
+
+    assert b"".join(LogNormaliser().normalise(chunks)) == (
+        b"Step started\nlink\nno marker\r\nlast"
+    )
+    assert list(LogNormaliser(timestamps="extract").iter_lines(chunks)) == [
+        LogLine(1700000000123, b"Step started\n"),
+        LogLine(1700000000456, b"link\n"),
+        LogLine(None, b"no marker\r\n"),
+        LogLine(1700000000789, b"last"),
+    ]
+
+
+def test_log_normaliser_can_keep_markers_or_colours():
+    kept = b"".join(LogNormaliser(timestamps="keep").normalise([RAW_LOG]))
+    assert kept.startswith(b"\x1b_bk;t=1700000000123\x07Step started\n")
+
+    coloured = b"".join(LogNormaliser(strip_ansi=False).normalise([RAW_LOG]))
+    assert coloured.startswith(b"\x1b[1;32mStep\x1b[0m started\n")
+    assert b"bk;t=" not in coloured
+
+    with pytest.raises(ValueError):
+        LogNormaliser(timestamps="drop")
@@ -7,4 +7,4 @@ def test_get_meta_information(fake_client):
     """
     meta = Meta(fake_client, "https://api.buildkite.com/v2/")
     meta.get_meta_information()
-    fake_client.get.assert_called_with(meta.path)
+    fake_client.get.assert_called_with(meta.path, cache_resource="meta")
@@ -0,0 +1,97 @@
+import datetime
+
+from unittest.mock import Mock
+
+from pybuildkite.builds import BuildState
+from pybuildkite.mirror import ACTIVE_STATES, BuildMirror
+
+
+def build(number, state, created_at, finished_at=None, branch="main"):
+    return {
+        "id": "build-{}".format(number),
+        "number": number,
+        "state": state,
+        "branch": branch,
+        "commit": "sha{}".format(number),
+        "created_at": created_at,
+        "finished_at": finished_at,
+        "pipeline": {"id": "pipe-id", "slug": "pipe", "name": "Pipe"},
+        "jobs": [
+            {"id": "job-{}-a".format(number), "state": state, "name": "a"},
+            {"id": "job-{}-b".format(number), "state": state, "name": "b"},
+        ],
+    }
+
+
+def test_first_sync_then_incremental_sync(tmp_path):
+    builds = Mock()
+    builds.iter_all_for_org.return_value = iter(
+        [
+            build(2, "running", "2023-01-02T10:00:00.000Z"),
+            build(1, "passed", "2023-01-01T10:00:00.000Z", "2023-01-01T10:05:00.000Z"),
+        ]
+    )
+    mirror = BuildMirror(builds, str(tmp_path / "builds.db"), "org")
+
+    assert mirror.sync(since=datetime.date(2023, 1, 1)) == 2
+    builds.iter_all_for_org.assert_called_once_with(
+        "org",
+        workers=None,
+        include_retried_jobs=True,
+        created_from=datetime.date(2023, 1, 1),
+    )
+    assert [b["number"] for b in mirror.query_builds()] == [2, 1]
+
+    finished = build(
+        2, "failed", "2023-01-02T10:00:00.000Z", "2023-01-02T10:09:00.000Z"
+    )
+    builds.iter_all_for_org.reset_mock()
+    builds.iter_all_for_org.side_effect = [
+        iter([build(3, "scheduled", "2023-01-03T10:00:00.000Z"), finished]),
+        iter([finished]),
+        iter([build(3, "scheduled", "2023-01-03T10:00:00.000Z")]),
+    ]
+    assert mirror.sync() == 4
+
+    created_from, finished_from, active = [
+        call[1] for call in builds.iter_all_for_org.call_args_list
+    ]
+    assert created_from["created_from"] == datetime.datetime(2023, 1, 2, 9, 59)
+    assert "finished_from" in finished_from
+    assert active["states"] == ACTIVE_STATES
+    assert [(b["number"], b["state"]) for b in mirror.query_builds()] == [
+        (3, "scheduled"),
+        (2, "failed"),
+        (1, "passed"),
+    ]
+    assert [job["state"] for job in mirror.get_jobs("build-2")] == ["failed"] * 2
+    mirror.close()
+
+
+def test_queries_use_local_tables(tmp_path):
+    builds = Mock()
+    builds.iter_all_for_org.return_value = iter(
+        [
+            build(3, "failed", "2023-01-03T10:00:00.000Z", branch="feature"),
+            build(2, "passed", "2023-01-02T10:00:00.000Z", "2023-01-02T11:00:00.000Z"),
+            build(1, "failed", "2023-01-01T10:00:00.000Z", "2023-01-01T11:00:00.000Z"),
+        ]
+    )
+    with BuildMirror(builds, str(tmp_path / "builds.db"), "org") as mirror:
+        mirror.sync()
+
+        def numbers(**filters):
+            return [b["number"] for b in mirror.query_builds(**filters)]
+
+        assert numbers(branch="main") == [2, 1]
+        assert numbers(branch=["main", "feature"], limit=1) == [3]
+        assert numbers(commit="sha2") == [2]
+        assert numbers(states=[BuildState.FAILED]) == [3, 1]
+        assert numbers(created_from=datetime.date(2023, 1, 2)) == [3, 2]
+        assert numbers(created_to=datetime.datetime(2023, 1, 2, 10)) == [1]
+        assert numbers(finished_from=datetime.date(2023, 1, 2)) == [2]
+        assert numbers(pipeline="other") == []
+
+        with_jobs = mirror.query_builds(commit="sha1", include_jobs=True)[0]
+        assert [job["name"] for job in with_jobs["jobs"]] == ["a", "b"]
+        assert "jobs" not in mirror.query_builds(commit="sha1")[0]
@@ -0,0 +1,82 @@
+import pickle
+
+import pytest
+
+from pybuildkite.builds import Builds
+from pybuildkite.client import Client, Response
+from pybuildkite.decoding import map_items
+from pybuildkite.models import Agent, Build, Job, Pipeline
+
+BUILD = {
+    "number": 3,
+    "state": "passed",
+    "pipeline": {"slug": "pipe"},
+    "jobs": [{"id": "job", "state": "passed", "agent": {"name": "agent"}}],
+    "new_field": True,
+}
+
+
+def test_models_have_no_instance_dict():
+    build = Build(BUILD)
+    with pytest.raises(AttributeError):
+        build.__dict__
+    assert "number" in Build.__slots__
+
+
+def test_fields_extra_and_missing_fields():
+    build = Build(BUILD)
+    assert build.number == 3
+    assert build["state"] == "passed"
+    assert build.finished_at is None
+    assert build.extra == {"new_field": True}
+    assert build["new_field"] is True
+    with pytest.raises(AttributeError):
+        build.not_a_field
+    with pytest.raises(KeyError):
+        build["not_a_field"]
+
+
+def test_nested_objects_are_converted_on_first_access():
+    build = Build(BUILD)
+    assert build._jobs is BUILD["jobs"]
+
+    jobs = build.jobs
+    assert isinstance(jobs[0], Job)
+    assert build.jobs is jobs
+    assert isinstance(jobs[0].agent, Agent)
+    assert jobs[0].agent.name == "agent"
+    assert isinstance(build.pipeline, Pipeline)
+    assert build.pipeline.slug == "pipe"
+
+
+def test_to_dict_round_trip():
+    build = Build(BUILD)
+    assert build.to_dict() == BUILD
+    build.jobs
+    assert build.to_dict() == BUILD
+    assert pickle.loads(pickle.dumps(build)) == build
+
+
+def test_map_items_converts_lists_and_iterators():
+    assert map_items([BUILD], Build) == [Build(BUILD)]
+    assert list(map_items(iter([BUILD]), Build)) == [Build(BUILD)]
+    assert map_items(True, Build) is True
+
+
+def test_resources_ask_the_client_for_models(fake_client):
+    builds = Builds(fake_client, "https://api.buildkite.com/v2/")
+    builds.list_all_for_org("org_slug", as_model=True)
+    assert fake_client.get.call_args[1]["model"] is Build
+
+
+def test_client_returns_models(local_server):
+    local_server.route("/builds", [BUILD])
+    client = Client(coalesce_requests=True)
+    url = local_server.url + "builds"
+
+    assert client.get(url, model=Build) == [Build(BUILD)]
+    response = client.get(url, with_pagination=True, model=Build)
+    assert isinstance(response, Response)
+    assert response.body == [Build(BUILD)]
+    streamed = client.get(url, with_pagination=True, as_stream=True, model=Build)
+    assert list(streamed.body) == [Build(BUILD)]
@@ -40,4 +40,6 @@ def test_get_org(fake_client):
     """
     org = Organizations(fake_client, "https://api.buildkite.com/v2/")
     org.get_org("Test_org")
-    fake_client.get.assert_called_with(org.path + "Test_org")
+    fake_client.get.assert_called_with(
+        org.path + "Test_org", cache_resource="organizations"
+    )
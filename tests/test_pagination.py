@@ -0,0 +1,140 @@
+import threading
+import time
+from unittest.mock import Mock
+
+from pybuildkite.client import Response
+from pybuildkite.pagination import iter_items, map_concurrently
+
+
+def page(body, next_page=None, last_page=None):
+    response = Response(body)
+    response.next_page = next_page
+    response.last_page = last_page
+    return response
+
+
+class FakePages:
+    """
+    Serve `count` pages of two items each, recording concurrency
+    """
+
+    def __init__(self, count, delays=None):
+        self.count = count
+        self.delays = delays or {}
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, page):
+        with self.lock:
+            self.requested.append(page)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delays.get(page, 0.01))
+        with self.lock:
+            self.in_flight -= 1
+        response = Response([page * 10 + 1, page * 10 + 2])
+        response.next_page = page + 1 if page < self.count else None
+        response.last_page = self.count if page < self.count else None
+        return response
+
+
+def test_iter_items_follows_next_page():
+    """
+    Test that all pages are read in order until there is no next page
+    """
+    fetch_page = Mock(side_effect=[page([1, 2], 2), page([3, 4], 3), page([5])])
+    assert list(iter_items(fetch_page)) == [1, 2, 3, 4, 5]
+    assert [call.kwargs["page"] for call in fetch_page.call_args_list] == [1, 2, 3]
+
+
+def test_iter_items_is_lazy():
+    """
+    Test that pages are only fetched when their items are needed
+    """
+    fetch_page = Mock(side_effect=[page([1, 2], 2), page([3, 4])])
+    items = iter_items(fetch_page)
+    fetch_page.assert_not_called()
+    assert next(items) == 1
+    assert next(items) == 2
+    assert fetch_page.call_count == 1
+    assert next(items) == 3
+    assert fetch_page.call_count == 2
+
+
+def test_iter_items_stops_at_max_items():
+    """
+    Test that no further pages are fetched after max_items is reached
+    """
+    fetch_page = Mock(side_effect=[page([1, 2], 2), page([3, 4], 3), page([5])])
+    assert list(iter_items(fetch_page, max_items=3)) == [1, 2, 3]
+    assert fetch_page.call_count == 2
+
+
+def test_iter_items_with_no_items():
+    """
+    Test empty results and a non-positive max_items
+    """
+    assert list(iter_items(Mock(return_value=page([])))) == []
+    fetch_page = Mock()
+    assert list(iter_items(fetch_page, max_items=0)) == []
+    fetch_page.assert_not_called()
+
+
+def test_parallel_pages_are_yielded_in_order():
+    """
+    Test that pages fetched concurrently are yielded in page order
+    """
+    pages = FakePages(6, delays={2: 0.1})
+    items = list(iter_items(pages, workers=3))
+    assert items == [11, 12, 21, 22, 31, 32, 41, 42, 51, 52, 61, 62]
+    assert pages.requested[0] == 1
+    assert sorted(pages.requested) == [1, 2, 3, 4, 5, 6]
+    assert 1 < pages.max_in_flight <= 3
+
+
+def test_parallel_pages_as_they_arrive():
+    """
+    Test that unordered fan-out yields fast pages before slow ones
+    """
+    pages = FakePages(4, delays={2: 0.2})
+    items = list(iter_items(pages, workers=3, ordered=False))
+    assert items[:2] == [11, 12]
+    assert items[-2:] == [21, 22]
+    assert sorted(items) == [11, 12, 21, 22, 31, 32, 41, 42]
+
+
+def test_parallel_pages_stop_at_max_items():
+    """
+    Test that the fan-out stops requesting pages once max_items is reached
+    """
+    pages = FakePages(50)
+    assert list(iter_items(pages, max_items=5, workers=2)) == [11, 12, 21, 22, 31]
+    time.sleep(0.05)
+    assert len(pages.requested) <= 5
+
+
+def test_parallel_pages_without_last_page():
+    """
+    Test that pages are followed sequentially when the last page is unknown
+    """
+    fetch_page = Mock(side_effect=[page([1], next_page=2), page([2])])
+    assert list(iter_items(fetch_page, workers=4)) == [1, 2]
+
+
+def test_map_concurrently_bounds_in_flight_calls():
+    """
+    Test that no more than `workers` calls are started ahead of the consumer
+    """
+    started = []
+
+    def double(x):
+        started.append(x)
+        return x * 2
+
+    results = map_concurrently(double, range(10), 2)
+    assert next(results) == 0
+    time.sleep(0.05)
+    assert len(started) <= 3
+    assert list(results) == [2, 4, 6, 8, 10, 12, 14, 16, 18]
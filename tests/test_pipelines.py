@@ -1,3 +1,4 @@
+from pybuildkite.client import Response
 from pybuildkite.pipelines import PipelineException, Pipelines
 
 import pytest
@@ -22,6 +23,8 @@ def test_list_pipelines(fake_client):
         pipelines.path.format("Test_org"),
         query_params={"page": 0},
         with_pagination=False,
+        fields=None,
+        model=None,
     )
 
 
@@ -32,7 +35,7 @@ def test_get_pipeline(fake_client):
     pipeline = Pipelines(fake_client, "https://api.buildkite.com/v2/")
     pipeline.get_pipeline("Test_org", "Test_pipeline")
     fake_client.get.assert_called_with(
-        pipeline.path.format("Test_org") + "Test_pipeline"
+        pipeline.path.format("Test_org") + "Test_pipeline", fields=None, model=None
     )
 
 
@@ -333,3 +336,19 @@ def test_unarchive_pipeline(fake_client):
     fake_client.post.assert_called_with(
         pipeline.path.format("test_org") + "test_pipeline" + "/unarchive"
     )
+
+
+def test_iter_pipelines(fake_client):
+    """
+    Test organization class 'iter_pipelines()' Method
+    """
+    fake_client.get.return_value = Response([{"slug": "a"}, {"slug": "b"}])
+    pipelines = Pipelines(fake_client, "https://api.buildkite.com/v2/")
+    assert list(pipelines.iter_pipelines("Test_org", max_items=1)) == [{"slug": "a"}]
+    fake_client.get.assert_called_once_with(
+        pipelines.path.format("Test_org"),
+        query_params={"page": 1},
+        with_pagination=True,
+        fields=None,
+        model=None,
+    )
@@ -0,0 +1,28 @@
+import pytest
+
+from pybuildkite.builds import BuildState
+from pybuildkite.query import encode_query_params
+
+
+@pytest.mark.parametrize(
+    "query_params, expected",
+    [
+        ({}, ""),
+        ({"page": 2, "per_page": "100"}, "page=2&per_page=100"),
+        ({"state": "running"}, "state=running"),
+        ({"state": ["running", "scheduled"]}, "state[]=running&state[]=scheduled"),
+        ({"branch": ("main", "release/1.0")}, "branch[]=main&branch[]=release%2F1.0"),
+        ({"state": [BuildState.FAILED]}, "state[]=failed"),
+        ({"include_retried_jobs": True}, "include_retried_jobs=true"),
+        ({"creator": "a b&c=d"}, "creator=a+b%26c%3Dd"),
+        ({"meta_data[release name]": "v1#2"}, "meta_data[release+name]=v1%232"),
+        ({"state": [], "page": 1}, "page=1"),
+    ],
+)
+def test_encode_query_params(query_params, expected):
+    assert encode_query_params(query_params) == expected
+
+
+def test_encode_query_params_does_not_mix_bools_and_ints():
+    assert encode_query_params({"page": 1}) == "page=1"
+    assert encode_query_params({"page": True}) == "page=true"
@@ -0,0 +1,79 @@
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from pybuildkite.buildkite import Buildkite
+from pybuildkite.client import Client
+from pybuildkite.ratelimit import FileRateLimiter, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_requests_are_spaced_by_the_rate():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=120, clock=clock)
+    assert [limiter.reserve() for _ in range(4)] == [0, 0.5, 1.0, 1.5]
+
+
+def test_burst_is_allowed_after_idle_time():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=60, burst=3, clock=clock)
+    assert [limiter.reserve() for _ in range(4)] == [0, 0, 0, 1.0]
+    clock.now += 10
+    assert [limiter.reserve() for _ in range(4)] == [0, 0, 0, 1.0]
+
+
+def test_invalid_rates_are_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+    with pytest.raises(ValueError):
+        RateLimiter(60, burst=0)
+
+
+def test_reservations_are_shared_between_threads():
+    limiter = RateLimiter(requests_per_minute=600, clock=FakeClock())
+    delays = []
+
+    def reserve():
+        for _ in range(10):
+            delays.append(limiter.reserve())
+
+    threads = [threading.Thread(target=reserve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(round(delay, 6) for delay in delays) == [
+        round(0.1 * slot, 6) for slot in range(40)
+    ]
+
+
+def test_file_limiter_shares_the_budget(tmp_path):
+    path = str(tmp_path / "budget")
+    first = FileRateLimiter(path, requests_per_minute=60)
+    second = FileRateLimiter(path, requests_per_minute=60)
+    first.clock = second.clock = FakeClock()
+    delays = [first.reserve(), second.reserve(), first.reserve()]
+    assert delays == [0, 1.0, 2.0]
+
+
+def test_client_paces_every_attempt():
+    limiter = Mock()
+    client = Client(rate_limiter=limiter)
+    with patch.object(client.session, "request") as request:
+        request.return_value.content = b"{}"
+        client.get("http://www.google.com/")
+        client.get("http://www.google.com/")
+    assert limiter.acquire.call_count == 2
+
+
+def test_buildkite_passes_the_limiter_to_its_client():
+    limiter = RateLimiter(requests_per_minute=200)
+    assert Buildkite(rate_limiter=limiter).client.rate_limiter is limiter
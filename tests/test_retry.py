@@ -0,0 +1,128 @@
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from pybuildkite.client import Client
+from pybuildkite.retry import RetryBudget, RetryPolicy
+
+
+def test_delay_grows_exponentially_without_jitter():
+    policy = RetryPolicy(backoff_factor=0.5, max_backoff=3, jitter=False)
+    assert [policy.get_delay(attempt) for attempt in range(4)] == [0.5, 1, 2, 3]
+
+
+def test_delay_with_jitter_stays_under_backoff():
+    policy = RetryPolicy(backoff_factor=1)
+    for _ in range(20):
+        assert 0 <= policy.get_delay(2) <= 4
+
+
+@pytest.mark.parametrize(
+    "headers,expected_delay",
+    [
+        ({"Retry-After": "7"}, 7),
+        ({"RateLimit-Remaining": "0", "RateLimit-Reset": "12"}, 12),
+        ({"RateLimit-Remaining": "5", "RateLimit-Reset": "12"}, 0.5),
+        ({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0),
+    ],
+)
+def test_delay_honours_rate_limit_headers(headers, expected_delay):
+    policy = RetryPolicy(backoff_factor=0.5, jitter=False)
+    assert policy.get_delay(0, headers) == expected_delay
+
+
+def test_only_idempotent_methods_are_retried_by_default():
+    policy = RetryPolicy()
+    assert policy.is_retryable("GET", 0, 503)
+    assert policy.is_retryable("DELETE", 0)
+    assert not policy.is_retryable("PUT", 0, 503)
+    assert not policy.is_retryable("PUT", 0)
+    assert not policy.is_retryable("POST", 0, 503)
+    assert not policy.is_retryable("PATCH", 0)
+
+
+def test_every_method_is_retried_on_429():
+    policy = RetryPolicy()
+    assert policy.is_retryable("PUT", 0, 429)
+    assert policy.is_retryable("POST", 0, 429)
+    assert not RetryPolicy(statuses=[503]).is_retryable("POST", 0, 429)
+
+
+def test_retryable_statuses_and_attempts():
+    policy = RetryPolicy(max_retries=2)
+    assert not policy.is_retryable("GET", 0, 404)
+    assert not policy.is_retryable("GET", 0, 200)
+    assert policy.is_retryable("GET", 1, 500)
+    assert not policy.is_retryable("GET", 2, 500)
+    assert not RetryPolicy(max_retries=0).is_retryable("GET", 0, 500)
+
+
+def test_retry_budget_is_earned_by_requests():
+    budget = RetryBudget(max_tokens=2, token_ratio=0.5)
+    policy = RetryPolicy(budget=budget)
+    assert policy.is_retryable("GET", 0, 503)
+    assert policy.is_retryable("GET", 0, 503)
+    assert not policy.is_retryable("GET", 0, 503)
+    policy.record_request()
+    policy.record_request()
+    assert policy.is_retryable("GET", 0, 503)
+    for _ in range(10):
+        policy.record_request()
+    assert budget.tokens == 2
+
+
+def flaky_route(failures, status=503, headers=None):
+    """
+    Respond with an error status `failures` times, then with Json
+    """
+    calls = []
+
+    def respond(request):
+        calls.append(request)
+        if len(calls) <= failures:
+            return status, headers or {}, b""
+        return 200, {"Content-Type": "application/json"}, b'{"ok": true}'
+
+    return respond
+
+
+def test_client_retries_failed_requests(local_server):
+    local_server.routes["/meta"] = flaky_route(2)
+    client = Client(retry_policy=RetryPolicy(backoff_factor=0))
+    assert client.get(local_server.url + "meta") == {"ok": True}
+    assert len(local_server.requests) == 3
+
+
+def test_client_waits_as_told_by_the_api(local_server):
+    local_server.routes["/meta"] = flaky_route(1, 429, {"Retry-After": "2"})
+    client = Client()
+    with patch("pybuildkite.client.time") as time:
+        assert client.get(local_server.url + "meta") == {"ok": True}
+    time.sleep.assert_called_once_with(2.0)
+
+
+def test_client_raises_when_retries_are_exhausted(local_server):
+    local_server.routes["/meta"] = flaky_route(5)
+    client = Client(retry_policy=RetryPolicy(max_retries=2, backoff_factor=0))
+    with pytest.raises(requests.HTTPError):
+        client.get(local_server.url + "meta")
+    assert len(local_server.requests) == 3
+
+
+def test_client_does_not_retry_posts(local_server):
+    local_server.routes["/builds"] = flaky_route(1)
+    client = Client(retry_policy=RetryPolicy(backoff_factor=0))
+    with pytest.raises(requests.HTTPError):
+        client.post(local_server.url + "builds", body={"commit": "SHA"})
+    assert len(local_server.requests) == 1
+
+
+def test_client_retries_connection_errors():
+    client = Client(retry_policy=RetryPolicy(backoff_factor=0))
+    with patch.object(
+        client.session, "request", side_effect=requests.ConnectionError
+    ) as request:
+        with pytest.raises(requests.ConnectionError):
+            client.get("http://www.google.com/")
+    assert request.call_count == 4
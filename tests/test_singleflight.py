@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from pybuildkite.client import Client
+from pybuildkite.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def run_in_threads(func, count):
+    results: list = [None] * count
+
+    def run(index):
+        try:
+            results[index] = func()
+        except Exception as error:
+            results[index] = error
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_flight():
+    single_flight = SingleFlight()
+    calls = []
+
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"number": 1}
+
+    results = run_in_threads(lambda: single_flight.do("key", slow_call), 5)
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_errors_are_shared_and_keys_are_released():
+    single_flight = SingleFlight()
+
+    def failing_call():
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    results = run_in_threads(lambda: single_flight.do("key", failing_call), 3)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert single_flight.do("key", lambda: "next") == "next"
+
+
+def test_async_concurrent_calls_share_one_flight():
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def slow_call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def run():
+        first = await asyncio.gather(
+            *[single_flight.do("key", slow_call) for _ in range(5)]
+        )
+        second = await single_flight.do("key", slow_call)
+        return first, second
+
+    assert asyncio.run(run()) == ([1] * 5, 2)
+
+
+def test_client_coalesces_identical_gets(local_server):
+    local_server.route("/builds/1", {"number": 1})
+    local_server.route("/builds/2", {"number": 2})
+    local_server.delay = 0.1
+    client = Client(coalesce_requests=True)
+
+    results = run_in_threads(lambda: client.get(local_server.url + "builds/1"), 5)
+    assert results == [{"number": 1}] * 5
+    assert len(local_server.requests) == 1
+
+    run_in_threads(lambda: client.get(local_server.url + "builds/2"), 2)
+    assert len(local_server.requests) == 2
+
+
+def test_client_does_not_coalesce_by_default(local_server):
+    local_server.route("/builds/1", {"number": 1})
+    local_server.delay = 0.05
+    client = Client()
+    run_in_threads(lambda: client.get(local_server.url + "builds/1"), 3)
+    assert len(local_server.requests) == 3
+
+
+def test_client_does_not_coalesce_different_accept_headers(local_server):
+    local_server.route("/log", b"log", headers={"Content-Type": "text/plain"})
+    local_server.delay = 0.1
+    client = Client(coalesce_requests=True)
+
+    def get_log(accept):
+        return lambda: client.get(local_server.url + "log", headers={"Accept": accept})
+
+    threads = [
+        threading.Thread(target=get_log(accept))
+        for accept in ["text/plain", "text/html", "text/plain"]
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(local_server.requests) == 2
+
+
+def test_client_does_not_coalesce_different_range_headers(local_server):
+    local_server.route("/log", b"log", headers={"Content-Type": "text/plain"})
+    local_server.delay = 0.1
+    client = Client(coalesce_requests=True)
+
+    def get_log(headers):
+        return lambda: client.get(local_server.url + "log", headers=headers)
+
+    threads = [
+        threading.Thread(target=get_log(headers))
+        for headers in [
+            {"Accept": "text/plain"},
+            {"Accept": "text/plain", "Range": "bytes=10-"},
+            {"Accept": "text/plain", "Range": "bytes=20-"},
+        ]
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(local_server.requests) == 3
+
+
+def test_client_shares_errors_between_waiters(local_server):
+    local_server.delay = 0.1
+    client = Client(coalesce_requests=True)
+    results = run_in_threads(lambda: client.get(local_server.url + "missing"), 3)
+    assert all(isinstance(result, requests.HTTPError) for result in results)
+    assert len(local_server.requests) == 1
+
+
+def test_async_client_coalesces_identical_gets(local_server):
+    pytest.importorskip("aiohttp")
+    from pybuildkite.async_client import AsyncClient
+
+    local_server.route("/builds/1", {"number": 1})
+    local_server.delay = 0.1
+
+    async def run():
+        async with AsyncClient(coalesce_requests=True) as client:
+            return await asyncio.gather(
+                *[client.get(local_server.url + "builds/1") for _ in range(5)]
+            )
+
+    assert asyncio.run(run()) == [{"number": 1}] * 5
+    assert len(local_server.requests) == 1
@@ -22,6 +22,7 @@ def test_list_teams_with_no_user_id(fake_client):
         teams.path.format("test_org"),
         query_params={"page": 0, "user_id": None},
         with_pagination=False,
+        cache_resource="teams",
     )
 
 
@@ -35,4 +36,5 @@ def test_list_teams_with_user_id(fake_client):
         teams.path.format("test_org", "test_user"),
         query_params={"page": 0, "user_id": "test_user"},
         with_pagination=False,
+        cache_resource="teams",
     )
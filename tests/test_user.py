@@ -9,4 +9,4 @@ def test_get_current_user(fake_client):
     """
     users = Users(fake_client, "https://api.buildkite.com/v2/")
     users.get_current_user()
-    fake_client.get.assert_called_with(users.path)
+    fake_client.get.assert_called_with(users.path, cache_resource="users")
@@ -0,0 +1,113 @@
+from unittest.mock import Mock
+
+import pytest
+
+from pybuildkite.builds import ACTIVE_STATES, Builds
+from pybuildkite.client import Response
+from pybuildkite.exceptions import BuildWatchTimeout
+from pybuildkite.watch import BuildWatcher
+
+URL = "https://api.buildkite.com/v2/organizations/org/pipelines/{}/builds/{}"
+
+
+def build(pipeline, number, state, jobs=()):
+    return {
+        "url": URL.format(pipeline, number),
+        "number": number,
+        "state": state,
+        "jobs": [{"state": job} for job in jobs],
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_watcher_batches_builds_per_pipeline():
+    builds = Mock()
+    builds.iter_all_for_pipeline.side_effect = [
+        [
+            build("a", 1, "running"),
+            build("a", 2, "scheduled"),
+            build("a", 9, "running"),
+        ],
+        [build("b", 5, "running")],
+        [build("a", 2, "running", ["passed", "passed", "running"])],
+        [],
+        [],
+    ]
+    builds.get_build_by_number.side_effect = [
+        build("a", 1, "passed"),
+        build("b", 5, "canceled"),
+        build("a", 2, "failed"),
+    ]
+    transitions = []
+    clock = FakeClock()
+    watcher = BuildWatcher(
+        builds,
+        on_transition=lambda b, previous: transitions.append(
+            (b["number"], previous, b["state"])
+        ),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    watcher.add_build(build("a", 1, "scheduled"))
+    watcher.add_build(build("a", 2, "scheduled"))
+    watcher.add("org", "b", 5)
+
+    results = watcher.wait()
+
+    assert {key: b["state"] for key, b in results.items()} == {
+        ("org", "a", 1): "passed",
+        ("org", "a", 2): "failed",
+        ("org", "b", 5): "canceled",
+    }
+    assert transitions == [
+        (1, "scheduled", "running"),
+        (5, None, "running"),
+        (1, "running", "passed"),
+        (2, "scheduled", "running"),
+        (5, "running", "canceled"),
+        (2, "running", "failed"),
+    ]
+    assert builds.iter_all_for_pipeline.call_count == 5
+    builds.iter_all_for_pipeline.assert_called_with("org", "a", states=ACTIVE_STATES)
+    assert builds.get_build_by_number.call_count == 3
+
+
+def test_watcher_slows_down_when_idle_and_times_out():
+    builds = Mock()
+    builds.iter_all_for_pipeline.return_value = [build("a", 1, "running")]
+    clock = FakeClock()
+    watcher = BuildWatcher(
+        builds, min_interval=2, max_interval=5, clock=clock, sleep=clock.sleep
+    )
+    watcher.add("org", "a", 1, "running")
+
+    with pytest.raises(BuildWatchTimeout):
+        watcher.wait(timeout=15)
+    assert clock.sleeps[:4] == [3.0, 4.5, 5, 2.5]
+
+    builds.iter_all_for_pipeline.return_value = [
+        build("a", 1, "running", ["passed"] * 4 + ["running"])
+    ]
+    watcher.poll()
+    assert watcher.interval == 2
+
+
+def test_wait_for_build(fake_client):
+    fake_client.get.side_effect = [
+        Response([]),
+        {"number": 7, "state": "passed", "url": URL.format("pipe", 7)},
+    ]
+    builds = Builds(fake_client, "https://api.buildkite.com/v2/")
+    assert builds.wait_for_build("org", "pipe", 7)["state"] == "passed"
@@ -0,0 +1,124 @@
+import hashlib
+import hmac
+import json
+
+import pytest
+import requests
+
+from pybuildkite.exceptions import WebhookVerificationError
+from pybuildkite.webhooks import WebhookReceiver
+
+BUILD_FINISHED = {
+    "event": "build.finished",
+    "build": {"number": 5, "state": "passed", "pipeline": {"slug": "pipe"}},
+    "sender": {"name": "Keith"},
+}
+JOB_STARTED = {
+    "event": "job.started",
+    "job": {"id": "job", "state": "running"},
+    "build": {"number": 5},
+    "pipeline": {"slug": "pipe"},
+}
+
+
+def sign(secret, body, timestamp):
+    signature = hmac.new(
+        secret.encode(), str(timestamp).encode() + b"." + body, hashlib.sha256
+    ).hexdigest()
+    return "timestamp={},signature={}".format(timestamp, signature)
+
+
+def test_handle_parses_events_like_the_rest_api():
+    receiver = WebhookReceiver(token="secret-token")
+    event = receiver.handle(
+        json.dumps(BUILD_FINISHED).encode(), {"X-Buildkite-Token": "secret-token"}
+    )
+    assert event.name == "build.finished"
+    assert event.build == BUILD_FINISHED["build"]
+    assert event.pipeline == {"slug": "pipe"}
+    assert event.job is None
+    assert event.sender == {"name": "Keith"}
+
+
+def test_token_and_signature_verification():
+    body = json.dumps(BUILD_FINISHED).encode()
+    receiver = WebhookReceiver(token="token", secret="secret", clock=lambda: 1000)
+
+    receiver.verify(body, {"X-Buildkite-Token": "token"})
+    receiver.verify(body, {"X-Buildkite-Signature": sign("secret", body, 990)})
+    for headers in (
+        {},
+        {"X-Buildkite-Token": "wrong"},
+        {"X-Buildkite-Signature": sign("wrong", body, 990)},
+        {"X-Buildkite-Signature": sign("secret", body + b" ", 990)},
+        {"X-Buildkite-Signature": sign("secret", body, 100)},
+    ):
+        with pytest.raises(WebhookVerificationError):
+            receiver.verify(body, headers)
+    with pytest.raises(ValueError):
+        WebhookReceiver()
+
+
+def test_subscriptions_filter_events():
+    receiver = WebhookReceiver(token="token")
+    headers = {"X-Buildkite-Token": "token"}
+    builds = receiver.subscribe("build.*")
+    everything = receiver.subscribe(maxsize=1)
+    jobs: list = []
+    receiver.subscribe("job.*", callback=jobs.append)
+
+    receiver.handle(json.dumps(BUILD_FINISHED).encode(), headers)
+    receiver.handle(json.dumps(JOB_STARTED).encode(), headers)
+
+    assert builds.get_nowait().name == "build.finished"
+    assert builds.empty()
+    assert [event.job["id"] for event in jobs] == ["job"]
+    assert everything.qsize() == 1
+    assert receiver.dropped == 1
+
+    receiver.unsubscribe(builds)
+    receiver.handle(json.dumps(BUILD_FINISHED).encode(), headers)
+    assert builds.empty()
+
+
+def test_failing_callbacks_do_not_stop_delivery():
+    def fail(event):
+        raise RuntimeError("callback bug")
+
+    receiver = WebhookReceiver(token="token")
+    receiver.subscribe(callback=fail)
+    events: list = []
+    receiver.subscribe(callback=events.append)
+
+    with WebhookReceiver(token="token") as server:
+        server.subscribe(callback=fail)
+        response = requests.post(
+            server.url,
+            data=json.dumps(BUILD_FINISHED),
+            headers={"X-Buildkite-Token": "token"},
+        )
+    receiver.handle(json.dumps(BUILD_FINISHED).encode(), {"X-Buildkite-Token": "token"})
+
+    assert response.status_code == 200
+    assert server.callback_errors == 1
+    assert [event.name for event in events] == ["build.finished"]
+    assert receiver.callback_errors == 1
+
+
+def test_receiver_serves_http():
+    with WebhookReceiver(token="token") as receiver:
+        events = receiver.events("build.*", timeout=5)
+        response = requests.post(
+            receiver.url,
+            data=json.dumps(BUILD_FINISHED),
+            headers={"X-Buildkite-Token": "token"},
+        )
+        assert response.status_code == 200
+        assert next(events).build["number"] == 5
+        events.close()
+
+        assert requests.post(receiver.url, data="{}").status_code == 401
+        bad_json = requests.post(
+            receiver.url, data="not json", headers={"X-Buildkite-Token": "token"}
+        )
+        assert bad_json.status_code == 400